@@ -0,0 +1,56 @@
+"""Add document search vector
+
+Revision ID: 69a9eca7591c
+Revises: fef72d51b89e
+Create Date: 2026-10-19 11:02:17.804413
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '69a9eca7591c'
+down_revision = 'fef72d51b89e'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('document', sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True))
+
+    # Title matches weigh more than description matches
+    op.execute("""
+        CREATE FUNCTION document_search_vector_update() RETURNS trigger AS $$
+        BEGIN
+            NEW.search_vector :=
+                setweight(to_tsvector('spanish', coalesce(NEW.title, '')), 'A') ||
+                setweight(to_tsvector('spanish', coalesce(NEW.description, '')), 'B');
+            RETURN NEW;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER document_search_vector_update
+        BEFORE INSERT OR UPDATE OF title, description ON document
+        FOR EACH ROW EXECUTE FUNCTION document_search_vector_update()
+    """)
+
+    # Fill the existing rows, the trigger takes care of new ones
+    op.execute("""
+        UPDATE document SET search_vector =
+            setweight(to_tsvector('spanish', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('spanish', coalesce(description, '')), 'B')
+    """)
+    op.create_index(
+        'ix_document_search_vector', 'document', ['search_vector'],
+        postgresql_using='gin',
+    )
+
+
+def downgrade():
+    op.drop_index('ix_document_search_vector', table_name='document')
+    op.execute("DROP TRIGGER document_search_vector_update ON document")
+    op.execute("DROP FUNCTION document_search_vector_update()")
+    op.drop_column('document', 'search_vector')
@@ -0,0 +1,37 @@
+"""Create chunk table
+
+Revision ID: b313bb7635f6
+Revises: 69a9eca7591c
+Create Date: 2026-10-19 15:40:08.219733
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'b313bb7635f6'
+down_revision = '69a9eca7591c'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        'chunk',
+        sa.Column('id', sa.String(), nullable=False),
+        sa.Column('doc_hash', sa.String(), nullable=True),
+        sa.Column('text', sa.String(), nullable=False),
+        sa.Column('metadata', postgresql.JSONB(), nullable=False),
+        sa.Column('indexed_at', sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index('ix_chunk_doc_hash', 'chunk', ['doc_hash'])
+    op.create_index('ix_chunk_indexed_at', 'chunk', ['indexed_at'])
+
+
+def downgrade():
+    op.drop_index('ix_chunk_indexed_at', table_name='chunk')
+    op.drop_index('ix_chunk_doc_hash', table_name='chunk')
+    op.drop_table('chunk')
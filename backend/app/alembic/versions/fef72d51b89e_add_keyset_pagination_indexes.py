@@ -0,0 +1,47 @@
+"""Add keyset pagination indexes
+
+Revision ID: fef72d51b89e
+Revises: 2c831af36926
+Create Date: 2026-10-19 10:12:41.530218
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'fef72d51b89e'
+down_revision = '2c831af36926'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Each sort order is paginated on (column, id); these replace the single
+    # column indexes, which they cover
+    op.drop_index('ix_document_title', table_name='document')
+    op.drop_index('ix_document_uploaded_at', table_name='document')
+    op.drop_index('ix_document_updated_at', table_name='document')
+    op.create_index('ix_document_title_id', 'document', ['title', 'id'])
+    op.create_index('ix_document_uploaded_at_id', 'document', ['uploaded_at', 'id'])
+    op.create_index('ix_document_updated_at_id', 'document', ['updated_at', 'id'])
+
+    # Title prefix filters (LIKE 'prefix%') under any collation
+    op.create_index(
+        'ix_document_title_prefix', 'document', ['title'],
+        postgresql_ops={'title': 'varchar_pattern_ops'},
+    )
+
+    # Tag filters look documents up by tag; the primary key starts with document_id
+    op.create_index('ix_document_tags_tag_id', 'document_tags', ['tag_id', 'document_id'])
+
+
+def downgrade():
+    op.drop_index('ix_document_tags_tag_id', table_name='document_tags')
+    op.drop_index('ix_document_title_prefix', table_name='document')
+    op.drop_index('ix_document_updated_at_id', table_name='document')
+    op.drop_index('ix_document_uploaded_at_id', table_name='document')
+    op.drop_index('ix_document_title_id', table_name='document')
+    op.create_index('ix_document_updated_at', 'document', ['updated_at'], unique=False)
+    op.create_index('ix_document_uploaded_at', 'document', ['uploaded_at'], unique=False)
+    op.create_index('ix_document_title', 'document', ['title'], unique=False)
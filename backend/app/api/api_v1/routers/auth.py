@@ -9,11 +9,24 @@ from app.core.auth import authenticate_user, sign_up_new_user
 auth_router = r = APIRouter()
 
 
+def hashing_busy_exception():
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many login attempts, try again shortly",
+        headers={"Retry-After": "1"},
+    )
+
+
 @r.post("/token")
 async def login(
     db=Depends(get_db), form_data: OAuth2PasswordRequestForm = Depends()
 ):
-    user = authenticate_user(db, form_data.username, form_data.password)
+    try:
+        user = await authenticate_user(
+            db, form_data.username, form_data.password
+        )
+    except security.PasswordHashingBusy:
+        raise hashing_busy_exception()
     if not user:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -40,7 +53,12 @@ async def login(
 async def signup(
     db=Depends(get_db), form_data: OAuth2PasswordRequestForm = Depends()
 ):
-    user = sign_up_new_user(db, form_data.username, form_data.password)
+    try:
+        user = await sign_up_new_user(
+            db, form_data.username, form_data.password
+        )
+    except security.PasswordHashingBusy:
+        raise hashing_busy_exception()
     if not user:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
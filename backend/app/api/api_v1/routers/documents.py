@@ -1,47 +1,128 @@
 from fastapi import APIRouter, Request, Depends
-from fastapi import Body, Response, encoders
+from fastapi import Body, Query, Response, encoders
 import typing as t
+from datetime import datetime
 from app.db.session import get_db
+from app.db.crud.pagination import MAX_PAGE_SIZE, react_admin_params
+from app.core.responses import fast_response
 from app.db.crud.document_crud import (
     get_documents,
     get_document,
     get_document_by_hash,
+    delete_document_by_hash,
+    search_documents,
     create_document,
     delete_document,
     edit_document,
     add_tags_to_document,
     remove_document_tag,
 )
-from app.db.schemas import DocumentCreate, DocumentEdit, Document, DocumentOut
+from app.db.schemas import (
+    DocumentCreate,
+    DocumentEdit,
+    Document,
+    DocumentOut,
+    DocumentSearchResult,
+)
+from app.db.crud.chunk_crud import delete_chunks
 from app.core.auth import get_current_active_user, get_current_active_superuser
+from app.core.retrieval import Retriever, get_retriever
 
 
 documents_router = r = APIRouter()
 
+# Fields react-admin may send in `filter`, with the JSON type of their value
+DOCUMENT_FILTER_TYPES = {"title": str, "tag": str, "document_type": str}
+
 @r.get(
     "/documents",
     response_model=t.List[Document],
     response_model_exclude_none=True,
 )
-async def documents_list(
+def documents_list(
+    request: Request,
     response: Response,
+    title: str = Query(None, description="Title prefix"),
+    tag: str = Query(None, description="Tag name"),
+    document_type: str = Query(None, alias="type"),
+    uploaded_after: datetime = None,
+    uploaded_before: datetime = None,
+    updated_after: datetime = None,
+    updated_before: datetime = None,
+    sort: str = Query(
+        "-updated_at",
+        description="updated_at, uploaded_at, title or id, prefixed with - for descending order",
+    ),
+    cursor: str = Query(None, description="X-Next-Cursor of the previous page"),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    count: str = Query("auto", regex="^(auto|exact|none)$"),
+    fast: bool = Query(
+        False,
+        description="Serialize plain rows with orjson and compress large pages, skipping response model validation",
+    ),
+    range_: str = Query(None, alias="range", description="react-admin's [start, end]"),
+    filter_: str = Query(None, alias="filter", description="react-admin's JSON filters"),
     db=Depends(get_db),
     current_user=Depends(get_current_active_superuser),
 ):
     """
-    Get all documents
+    Get a page of documents
     """
-    documents = get_documents(db)
-    # This is necessary for react-admin to work
-    response.headers["Content-Range"] = f"0-9/{len(documents)}"
-    return documents
+    sort, offset, range_limit, filters = react_admin_params(
+        sort, range_, filter_, DOCUMENT_FILTER_TYPES
+    )
+    page = get_documents(
+        db,
+        title=filters.get("title", title),
+        tag=filters.get("tag", tag),
+        document_type=filters.get("document_type", document_type),
+        uploaded_after=uploaded_after,
+        uploaded_before=uploaded_before,
+        updated_after=updated_after,
+        updated_before=updated_before,
+        sort=sort,
+        cursor=cursor,
+        limit=range_limit or limit,
+        count=count,
+        offset=offset,
+        as_rows=fast,
+    )
+    # Content-Range is necessary for react-admin to work
+    if fast:
+        return fast_response(request, page.items, page.headers("documents"))
+    response.headers.update(page.headers("documents"))
+    return page.items
+
+@r.get(
+    "/documents/search",
+    response_model=t.List[DocumentSearchResult],
+    response_model_exclude_none=True,
+)
+def documents_search(
+    response: Response,
+    q: str = Query(
+        ...,
+        min_length=1,
+        description='Words to find in titles and descriptions, "quoted phrases", OR and -excluded words',
+    ),
+    offset: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=MAX_PAGE_SIZE),
+    db=Depends(get_db),
+    current_user=Depends(get_current_active_user),
+):
+    """
+    Search documents by title and description, best matches first
+    """
+    page = search_documents(db, q, offset=offset, limit=limit)
+    response.headers.update(page.headers("documents"))
+    return page.items
 
 @r.get(
     "/document/{document_id}",
     response_model=Document,
     response_model_exclude_none=True,
 )
-async def document_details(
+def document_details(
     request: Request,
     document_id: int,
     db=Depends(get_db),
@@ -57,7 +138,7 @@ async def document_details(
     "/document/hash/{doc_hash}",
     response_model_exclude_none=True,
 )
-async def document_hash_exist(
+def document_hash_exist(
     request: Request,
     doc_hash: str,
     db=Depends(get_db),
@@ -75,7 +156,7 @@ async def document_hash_exist(
     response_model=Document,
     response_model_exclude_none=True,
 )
-async def document_edit_by_hash(
+def document_edit_by_hash(
     request: Request,
     doc_hash: str,
     document: DocumentEdit,
@@ -88,12 +169,31 @@ async def document_edit_by_hash(
     document_db = get_document_by_hash(db, doc_hash)
     return edit_document(db, document_db.id, document)
 
+@r.delete(
+    "/document/hash/{doc_hash}",
+    response_model=Document,
+    response_model_exclude_none=True,
+)
+def document_delete_by_hash(
+    request: Request,
+    doc_hash: str,
+    db=Depends(get_db),
+    retriever: Retriever = Depends(get_retriever),
+    current_user=Depends(get_current_active_superuser),
+):
+    """
+    Delete a document by hash, along with its chunks
+    """
+    document = delete_document_by_hash(db, doc_hash)
+    retriever.remove_chunks(delete_chunks(db, doc_hash))
+    return document
+
 @r.post(
     "/documents", 
     response_model=Document, 
     response_model_exclude_none=True
 )
-async def document_create(
+def document_create(
     request: Request,
     document: DocumentCreate,
     db=Depends(get_db),
@@ -109,7 +209,7 @@ async def document_create(
     response_model=Document,
     response_model_exclude_none=True,
 )
-async def document_edit(
+def document_edit(
     request: Request,
     document_id: int,
     document: DocumentEdit,
@@ -126,7 +226,7 @@ async def document_edit(
     response_model=Document,
     response_model_exclude_none=True,
 )
-async def document_delete(
+def document_delete(
     request: Request,
     document_id: int,
     db=Depends(get_db),
@@ -142,7 +242,7 @@ async def document_delete(
     response_model=Document,
     response_model_exclude_none=True,
 )
-async def document_add_tag(
+def document_add_tag(
     request: Request,
     document_id: int,
     tags_names: t.List[str] = Body(
@@ -163,7 +263,7 @@ async def document_add_tag(
     response_model=Document,
     response_model_exclude_none=True,
 )
-async def document_remove_tag(
+def document_remove_tag(
     request: Request,
     document_id: int,
     tags_names: t.List[str] = Body(
@@ -0,0 +1,39 @@
+import secrets
+
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import PlainTextResponse
+
+from app.core import config, metrics, security
+from app.core.auth import get_current_user
+from app.db.session import get_db
+
+metrics_router = r = APIRouter()
+
+
+def metrics_reader(
+    db=Depends(get_db), token: str = Depends(security.oauth2_scheme)
+):
+    """
+    Lets in the METRICS_TOKEN bearer, when set, and active superusers.
+    """
+    if config.METRICS_TOKEN and secrets.compare_digest(
+        token.encode(), config.METRICS_TOKEN.encode()
+    ):
+        return
+    user = get_current_user(db, token)
+    if not user.is_active or not user.is_superuser:
+        raise HTTPException(
+            status_code=403, detail="The user doesn't have enough privileges"
+        )
+
+
+@r.get(
+    "/metrics",
+    response_class=PlainTextResponse,
+    dependencies=[Depends(metrics_reader)],
+)
+async def metrics_text():
+    """
+    Prometheus metrics of this process
+    """
+    return metrics.render()
@@ -0,0 +1,42 @@
+from fastapi import APIRouter, Depends, Response
+import typing as t
+
+from app.db.session import get_db
+from app.db.schemas import ChunkIn, ChunksIndexed, QueryRequest, QueryResponse
+from app.core.retrieval import Retriever, StageTimer, get_retriever
+from app.core.auth import get_current_active_superuser
+
+query_router = r = APIRouter()
+
+
+@r.post("/query", response_model=QueryResponse, response_model_exclude_none=True)
+def query(
+    response: Response,
+    body: QueryRequest,
+    db=Depends(get_db),
+    retriever: Retriever = Depends(get_retriever),
+):
+    """
+    Find the document chunks closest to a question, best first
+    """
+    timer = StageTimer()
+    chunks = retriever.query(
+        db, body.question, body.top_k, timer, mode=body.mode
+    )
+    response.headers["Server-Timing"] = timer.server_timing()
+    return QueryResponse(
+        question=body.question, chunks=chunks, timings=timer.milliseconds()
+    )
+
+
+@r.post("/chunks", response_model=ChunksIndexed)
+def chunks_ingest(
+    chunks: t.List[ChunkIn],
+    db=Depends(get_db),
+    retriever: Retriever = Depends(get_retriever),
+    current_user=Depends(get_current_active_superuser),
+):
+    """
+    Store chunk texts for lexical search, replacing chunks with the same id
+    """
+    return ChunksIndexed(indexed=retriever.ingest(db, chunks))
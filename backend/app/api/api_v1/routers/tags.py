@@ -1,7 +1,9 @@
-from fastapi import APIRouter, Request, Depends, Response, encoders
+from fastapi import APIRouter, Request, Depends, Query, Response, encoders
 import typing as t
 
 from app.db.session import get_db
+from app.db.crud.pagination import MAX_PAGE_SIZE, react_admin_params
+from app.core.responses import fast_response
 from app.db.crud.tag_crud import (
     get_tags,
     get_tag,
@@ -14,30 +16,63 @@ from app.core.auth import get_current_active_user, get_current_active_superuser
 
 tags_router = r = APIRouter()
 
+# Fields react-admin may send in `filter`, with the JSON type of their value
+TAG_FILTER_TYPES = {"name": str, "is_active": bool}
+
 @r.get(
     "/tags",
     response_model=t.List[Tag],
     response_model_exclude_none=True,
 )
-async def tags_list(
+def tags_list(
+    request: Request,
     response: Response,
+    name: str = Query(None, description="Name prefix"),
+    is_active: bool = None,
+    sort: str = Query(
+        "id", description="name or id, prefixed with - for descending order"
+    ),
+    cursor: str = Query(None, description="X-Next-Cursor of the previous page"),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    count: str = Query("auto", regex="^(auto|exact|none)$"),
+    fast: bool = Query(
+        False,
+        description="Serialize plain rows with orjson and compress large pages, skipping response model validation",
+    ),
+    range_: str = Query(None, alias="range", description="react-admin's [start, end]"),
+    filter_: str = Query(None, alias="filter", description="react-admin's JSON filters"),
     db=Depends(get_db),
     current_user=Depends(get_current_active_superuser),
 ):
     """
-    Get all tags
+    Get a page of tags
     """
-    tags = get_tags(db)
-    # This is necessary for react-admin to work
-    response.headers["Content-Range"] = f"0-9/{len(tags)}"
-    return tags
+    sort, offset, range_limit, filters = react_admin_params(
+        sort, range_, filter_, TAG_FILTER_TYPES
+    )
+    page = get_tags(
+        db,
+        name=filters.get("name", name),
+        is_active=filters.get("is_active", is_active),
+        sort=sort,
+        cursor=cursor,
+        limit=range_limit or limit,
+        count=count,
+        offset=offset,
+        as_rows=fast,
+    )
+    # Content-Range is necessary for react-admin to work
+    if fast:
+        return fast_response(request, page.items, page.headers("tags"))
+    response.headers.update(page.headers("tags"))
+    return page.items
 
 @r.get(
     "/tag/{tag_id}",
     response_model=Tag,
     response_model_exclude_none=True,
 )
-async def tag_details(
+def tag_details(
     request: Request,
     tag_id: int,
     db=Depends(get_db),
@@ -54,7 +89,7 @@ async def tag_details(
     response_model=Tag, 
     response_model_exclude_none=True
 )
-async def tag_create(
+def tag_create(
     request: Request,
     tag: TagCreate,
     db=Depends(get_db),
@@ -70,7 +105,7 @@ async def tag_create(
     response_model=Tag, 
     response_model_exclude_none=True
 )
-async def tag_edit(
+def tag_edit(
     request: Request,
     tag_id: int,
     tag: TagEdit,
@@ -87,7 +122,7 @@ async def tag_edit(
     response_model=Tag, 
     response_model_exclude_none=True
 )
-async def tag_delete(
+def tag_delete(
     request: Request,
     tag_id: int,
     db=Depends(get_db),
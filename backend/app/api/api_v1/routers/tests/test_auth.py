@@ -17,8 +17,8 @@ def test_login(client, test_user, monkeypatch):
 
 
 def test_signup(client, monkeypatch):
-    def get_password_hash_mock(first: str, second: str):
-        return True
+    def get_password_hash_mock(password: str):
+        return "supersecrethash"
 
     monkeypatch.setattr(security, "get_password_hash", get_password_hash_mock)
 
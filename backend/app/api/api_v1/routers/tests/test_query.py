@@ -0,0 +1,288 @@
+import threading
+
+import pytest
+
+from app.core import config, retrieval
+from app.core.embeddings import HashingEmbedder
+from app.core.retrieval import (
+    RETRIEVAL_STAGE_SECONDS,
+    Retriever,
+    get_retriever,
+    reciprocal_rank_fusion,
+)
+from app.core.vector_store import Hit
+from app.core.vector_store import LocalVectorStore
+from app.db import models
+from app.db.schemas import ChunkIn
+from app.main import app
+
+CHUNKS = [
+    ("hash-1", "Las losas de hormigón armado deben curarse durante siete días"),
+    ("hash-1", "El acero de refuerzo se inspecciona antes del hormigonado"),
+    ("hash-2", "La aislación térmica de muros se verifica con ensayos"),
+    ("hash-unknown", "Las losas de hormigón se cubren con polietileno"),
+]
+
+
+@pytest.fixture
+def retriever():
+    embedder = HashingEmbedder(256)
+    store = LocalVectorStore()
+    store.upsert(
+        [
+            {
+                "id": f"doc_{doc_hash}_chunk_{i}",
+                "values": embedder.embed(text),
+                "metadata": {"doc_hash": doc_hash, "text": text, "page_number": i + 1},
+            }
+            for i, (doc_hash, text) in enumerate(CHUNKS)
+        ],
+        namespace="test",
+    )
+    retriever = Retriever(embedder, store, namespace="test")
+    app.dependency_overrides[get_retriever] = lambda: retriever
+    yield retriever
+    app.dependency_overrides.pop(get_retriever)
+
+
+def test_query(
+    client, test_db, test_user, user_token_headers, retriever, count_queries
+):
+    tag = models.Tag(name="normas")
+    for doc_hash in ("hash-1", "hash-2"):
+        document = models.Document(
+            doc_hash=doc_hash, title=f"Documento {doc_hash}", user_id=test_user.id
+        )
+        document.tags.append(tag)
+        test_db.add(document)
+    test_db.commit()
+    client.get("/api/v1/users/me", headers=user_token_headers)
+    joins = RETRIEVAL_STAGE_SECONDS.count(stage="join")
+
+    test_db.expire_all()
+    count_queries.clear()
+    response = client.post(
+        "/api/v1/query",
+        json={
+            "question": "curado de losas de hormigón armado",
+            "top_k": 3,
+            "mode": "vector",
+        },
+        headers=user_token_headers,
+    )
+    assert response.status_code == 200
+    chunks = response.json()["chunks"]
+
+    assert [chunk["rank"] for chunk in chunks] == [1, 2, 3]
+    assert chunks[0]["text"] == CHUNKS[0][1]
+    assert chunks[0]["page_number"] == 1
+    assert chunks[0]["document"]["title"] == "Documento hash-1"
+    assert chunks[0]["document"]["tags"][0]["name"] == "normas"
+    assert chunks[0]["score"] >= chunks[1]["score"] >= chunks[2]["score"]
+    # Chunks of documents the backend does not know come without one
+    unknown = [c for c in chunks if c["id"].startswith("doc_hash-unknown")]
+    assert unknown and "document" not in unknown[0]
+
+    # Documents and tags come from a single query
+    assert len(count_queries) == 1
+    assert set(response.json()["timings"]) == {"embed", "search", "join"}
+    assert "join;dur=" in response.headers["Server-Timing"]
+    assert RETRIEVAL_STAGE_SECONDS.count(stage="join") == joins + 1
+
+
+def test_query_without_vector_store_config(
+    client, user_token_headers, monkeypatch
+):
+    monkeypatch.setattr(retrieval, "_retriever", None)
+    monkeypatch.setattr(config, "VECTOR_STORE", "pinecone")
+    monkeypatch.setattr(config, "PINECONE_API_KEY", "key")
+    monkeypatch.setattr(config, "PINECONE_INDEX_HOST", None)
+
+    response = client.post(
+        "/api/v1/query", json={"question": "losas"}, headers=user_token_headers
+    )
+    assert response.status_code == 503
+    assert "PINECONE_INDEX_HOST" in response.json()["detail"]
+
+
+def test_query_validation(client, user_token_headers, retriever):
+    for body in (
+        {"question": ""},
+        {"question": "losas", "top_k": 0},
+        {"question": "losas", "mode": "fuzzy"},
+    ):
+        response = client.post(
+            "/api/v1/query", json=body, headers=user_token_headers
+        )
+        assert response.status_code == 422
+
+
+def test_reciprocal_rank_fusion():
+    def hits(*ids):
+        return [Hit(id, 1.0, {}) for id in ids]
+
+    fused = reciprocal_rank_fusion(
+        {"vector": hits("a", "b", "c"), "lexical": hits("c", "d")}, k=60
+    )
+
+    # "c" is in both lists, which outweighs being first in only one
+    # Ties keep the order the hits were first seen in
+    assert [hit.hit.id for hit in fused] == ["c", "a", "b", "d"]
+    assert fused[0].ranks == {"vector": 3, "lexical": 1}
+    assert fused[0].score == pytest.approx(1 / 63 + 1 / 61)
+
+
+def test_ingested_chunks_are_found_by_code(
+    client, superuser_token_headers, user_token_headers, retriever
+):
+    chunks = [
+        {
+            "id": "norma-851",
+            "text": "Los muros deben cumplir la NCh 851 en su cláusula 5.2.3",
+            "metadata": {"doc_hash": "hash-3", "page_number": 12},
+        },
+        {
+            "id": "norma-853",
+            "text": "La transmitancia térmica se calcula según NCh853",
+            "metadata": {"doc_hash": "hash-3"},
+        },
+    ]
+    for chunk in chunks:
+        # The local store keeps the vectors sent along
+        chunk["values"] = retriever.embedder.embed(chunk["text"])
+    response = client.post(
+        "/api/v1/chunks", json=chunks, headers=superuser_token_headers
+    )
+    assert response.json() == {"indexed": 2}
+
+    for question, expected in (
+        ("requisitos de la NCh851", "norma-851"),
+        ("cláusula 5.2.3", "norma-851"),
+        ("NCh853", "norma-853"),
+    ):
+        response = client.post(
+            "/api/v1/query",
+            json={"question": question, "top_k": 3, "mode": "hybrid"},
+            headers=user_token_headers,
+        )
+        chunks = response.json()["chunks"]
+        assert chunks[0]["id"] == expected
+        assert chunks[0]["lexical_rank"] == 1
+    assert set(response.json()["timings"]) == {
+        "embed",
+        "search",
+        "lexical",
+        "fuse",
+        "join",
+    }
+
+
+def test_lexical_index_is_loaded_from_the_database(
+    client,
+    test_db,
+    superuser_token_headers,
+    user_token_headers,
+    retriever,
+    monkeypatch,
+):
+    chunk = {
+        "id": "norma-851",
+        "text": "Los muros deben cumplir la NCh 851 en su cláusula 5.2.3",
+        "metadata": {"doc_hash": "hash-3"},
+    }
+    client.post("/api/v1/chunks", json=[chunk], headers=superuser_token_headers)
+
+    # Another worker, or this one after a restart, starts with an empty index
+    restarted = Retriever(retriever.embedder, retriever.store, namespace="test")
+    app.dependency_overrides[get_retriever] = lambda: restarted
+    response = client.post(
+        "/api/v1/query",
+        json={"question": "NCh851", "mode": "lexical"},
+        headers=user_token_headers,
+    )
+    assert [c["id"] for c in response.json()["chunks"]] == ["norma-851"]
+
+    # Chunks another worker stores later are picked up once the sync
+    # interval has passed
+    monkeypatch.setattr(config, "LEXICAL_SYNC_INTERVAL", 60)
+    chunk["text"] = "Los muros deben cumplir la NCh 853"
+    retriever.ingest(test_db, [ChunkIn(**chunk)])
+    response = client.post(
+        "/api/v1/query",
+        json={"question": "NCh853", "mode": "lexical"},
+        headers=user_token_headers,
+    )
+    assert chunk["text"] not in [c["text"] for c in response.json()["chunks"]]
+
+    monkeypatch.setattr(config, "LEXICAL_SYNC_INTERVAL", 0)
+    response = client.post(
+        "/api/v1/query",
+        json={"question": "NCh853", "mode": "lexical"},
+        headers=user_token_headers,
+    )
+    assert response.json()["chunks"][0]["text"] == chunk["text"]
+
+
+def test_query_defaults_to_hybrid(client, user_token_headers, retriever):
+    response = client.post(
+        "/api/v1/query", json={"question": "losas"}, headers=user_token_headers
+    )
+    assert response.status_code == 200
+    assert {"lexical", "fuse"} <= set(response.json()["timings"])
+
+
+def test_chunks_ingest_requires_superuser(client, user_token_headers, retriever):
+    response = client.post(
+        "/api/v1/chunks",
+        json=[{"id": "norma-851", "text": "NCh 851"}],
+        headers=user_token_headers,
+    )
+    assert response.status_code == 403
+
+
+def test_hybrid_searches_run_concurrently(
+    client, user_token_headers, retriever, monkeypatch
+):
+    # Each leg waits for the other one: run one after the other, the first
+    # leg times out on the barrier and the query fails
+    both_running = threading.Barrier(2, timeout=5)
+    embed, search = retriever.embedder.embed, retriever.lexical_index.search
+
+    def meeting_embed(text):
+        both_running.wait()
+        return embed(text)
+
+    def meeting_search(query, top_k):
+        both_running.wait()
+        return search(query, top_k)
+
+    monkeypatch.setattr(retriever.embedder, "embed", meeting_embed)
+    monkeypatch.setattr(retriever.lexical_index, "search", meeting_search)
+
+    response = client.post(
+        "/api/v1/query",
+        json={"question": "losas", "mode": "hybrid"},
+        headers=user_token_headers,
+    )
+    assert response.status_code == 200
+    assert not both_running.broken
+
+
+def test_deleted_document_chunks_leave_the_lexical_index(
+    client, test_db, test_user, superuser_token_headers, retriever
+):
+    test_db.add(models.Document(doc_hash="hash-3", title="NCh 851", user_id=test_user.id))
+    test_db.commit()
+    chunk = ChunkIn(id="norma-851", text="NCh 851", metadata={"doc_hash": "hash-3"})
+    retriever.ingest(test_db, [chunk])
+    # A worker that loaded the chunk before it was deleted elsewhere
+    other = Retriever(retriever.embedder, retriever.store, namespace="test")
+    other.sync_lexical_index(test_db)
+
+    response = client.delete(
+        "/api/v1/document/hash/hash-3", headers=superuser_token_headers
+    )
+    assert response.status_code == 200
+    assert retriever.lexical_index.search("NCh851", 5) == []
+    other.sync_lexical_index(test_db)
+    assert other.lexical_index.search("NCh851", 5) == []
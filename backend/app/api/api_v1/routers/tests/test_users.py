@@ -1,3 +1,4 @@
+from app.core import auth
 from app.db import models
 
 
@@ -108,3 +109,144 @@ def test_unauthorized_routes(client, user_token_headers):
     assert response.status_code == 403
     response = client.get("/api/v1/users/123", headers=user_token_headers)
     assert response.status_code == 403
+
+
+def test_current_user_is_cached(client, user_token_headers, monkeypatch):
+    lookups = []
+    get_user_by_email = auth.get_user_by_email
+
+    def counting_get_user_by_email(db, email):
+        lookups.append(email)
+        return get_user_by_email(db, email)
+
+    monkeypatch.setattr(auth, "get_user_by_email", counting_get_user_by_email)
+
+    for _ in range(3):
+        response = client.get("/api/v1/users/me", headers=user_token_headers)
+        assert response.status_code == 200
+    assert len(lookups) == 1
+
+
+def test_edit_user_invalidates_cached_user(
+    client, test_user, user_token_headers, superuser_token_headers
+):
+    response = client.get("/api/v1/users/me", headers=user_token_headers)
+    assert response.status_code == 200
+
+    response = client.put(
+        f"/api/v1/users/{test_user.id}",
+        json={"email": test_user.email, "is_active": False},
+        headers=superuser_token_headers,
+    )
+    assert response.status_code == 200
+
+    response = client.get("/api/v1/users/me", headers=user_token_headers)
+    assert response.status_code == 400
+
+
+def test_delete_user_invalidates_cached_user(
+    client, test_user, user_token_headers, superuser_token_headers
+):
+    response = client.get("/api/v1/users/me", headers=user_token_headers)
+    assert response.status_code == 200
+
+    response = client.delete(
+        f"/api/v1/users/{test_user.id}", headers=superuser_token_headers
+    )
+    assert response.status_code == 200
+
+    response = client.get("/api/v1/users/me", headers=user_token_headers)
+    assert response.status_code == 401
+
+
+def test_get_users_pages(client, test_db, test_superuser, superuser_token_headers):
+    for email in ("c@email.com", "a@email.com", "b@email.com"):
+        test_db.add(models.User(email=email, hashed_password="hash"))
+    test_db.commit()
+
+    response = client.get(
+        "/api/v1/users",
+        params={"sort": "email", "limit": 2},
+        headers=superuser_token_headers,
+    )
+    assert response.status_code == 200
+    assert [user["email"] for user in response.json()] == [
+        "a@email.com",
+        "b@email.com",
+    ]
+    assert response.headers["X-Total-Count"] == "4"
+    assert response.headers["Content-Range"] == "users 0-1/4"
+
+    response = client.get(
+        "/api/v1/users",
+        params={
+            "sort": "email",
+            "limit": 2,
+            "cursor": response.headers["X-Next-Cursor"],
+        },
+        headers=superuser_token_headers,
+    )
+    assert [user["email"] for user in response.json()] == [
+        "c@email.com",
+        test_superuser.email,
+    ]
+    assert "X-Next-Cursor" not in response.headers
+
+
+def test_get_users_filtered(client, test_db, superuser_token_headers):
+    test_db.add(models.User(email="a_b@email.com", hashed_password="hash"))
+    test_db.add(models.User(email="axb@email.com", hashed_password="hash"))
+    test_db.commit()
+
+    # The underscore is not a wildcard
+    response = client.get(
+        "/api/v1/users",
+        params={"email": "a_"},
+        headers=superuser_token_headers,
+    )
+    assert [user["email"] for user in response.json()] == ["a_b@email.com"]
+    assert response.headers["X-Total-Count"] == "1"
+
+
+def test_get_users_react_admin(client, test_db, superuser_token_headers):
+    for email in ("c@email.com", "a@email.com", "b@email.com"):
+        test_db.add(models.User(email=email, hashed_password="hash"))
+    test_db.commit()
+
+    # The query string of react-admin's simple REST client
+    response = client.get(
+        '/api/v1/users?sort=["email","ASC"]&range=[0,1]&filter={}',
+        headers=superuser_token_headers,
+    )
+    assert response.status_code == 200
+    assert [user["email"] for user in response.json()] == [
+        "a@email.com",
+        "b@email.com",
+    ]
+    assert response.headers["Content-Range"] == "users 0-1/4"
+
+    response = client.get(
+        '/api/v1/users?sort=["email","ASC"]&range=[2,3]&filter={}',
+        headers=superuser_token_headers,
+    )
+    assert [user["email"] for user in response.json()][0] == "c@email.com"
+    assert response.headers["Content-Range"] == "users 2-3/4"
+
+    response = client.get(
+        '/api/v1/users?sort=["id","ASC"]&range=[0,9]'
+        '&filter={"email":"b","is_superuser":false}',
+        headers=superuser_token_headers,
+    )
+    assert [user["email"] for user in response.json()] == ["b@email.com"]
+    assert response.headers["Content-Range"] == "users 0-0/1"
+
+    for query in (
+        'sort=["id","UP"]',
+        "range=[9,0]",
+        'filter={"hashed_password":"hash"}',
+        'filter={"is_active":"yes"}',
+    ):
+        response = client.get(
+            f"/api/v1/users?{query}", headers=superuser_token_headers
+        )
+        assert response.status_code == 400
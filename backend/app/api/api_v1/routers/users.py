@@ -1,7 +1,18 @@
-from fastapi import APIRouter, Request, Depends, Response, encoders
+from fastapi import (
+    APIRouter,
+    Request,
+    Depends,
+    HTTPException,
+    Query,
+    Response,
+    encoders,
+    status,
+)
+from starlette.concurrency import run_in_threadpool
 import typing as t
 
 from app.db.session import get_db
+from app.db.crud.pagination import MAX_PAGE_SIZE, react_admin_params
 from app.db.crud.user_crud import (
     get_users,
     get_user,
@@ -10,28 +21,62 @@ from app.db.crud.user_crud import (
     edit_user,
 )
 from app.db.schemas import UserCreate, UserEdit, User, UserOut
+from app.core import security
 from app.core.auth import get_current_active_user, get_current_active_superuser
 
 users_router = r = APIRouter()
 
+# Fields react-admin may send in `filter`, with the JSON type of their value
+USER_FILTER_TYPES = {"email": str, "is_active": bool, "is_superuser": bool}
+
 
 @r.get(
     "/users",
     response_model=t.List[User],
     response_model_exclude_none=True,
 )
-async def users_list(
+def users_list(
     response: Response,
+    email: str = Query(None, description="Email prefix"),
+    is_active: bool = None,
+    is_superuser: bool = None,
+    sort: str = Query(
+        "id", description="email or id, prefixed with - for descending order"
+    ),
+    cursor: str = Query(
+        None, description="X-Next-Cursor of the previous page"
+    ),
+    limit: int = Query(100, ge=1, le=MAX_PAGE_SIZE),
+    count: str = Query("auto", regex="^(auto|exact|none)$"),
+    range_: str = Query(
+        None, alias="range", description="react-admin's [start, end]"
+    ),
+    filter_: str = Query(
+        None, alias="filter", description="react-admin's JSON filters"
+    ),
     db=Depends(get_db),
     current_user=Depends(get_current_active_superuser),
 ):
     """
-    Get all users
+    Get a page of users
     """
-    users = get_users(db)
-    # This is necessary for react-admin to work
-    response.headers["Content-Range"] = f"0-9/{len(users)}"
-    return users
+    sort, offset, range_limit, filters = react_admin_params(
+        sort, range_, filter_, USER_FILTER_TYPES
+    )
+    page = get_users(
+        db,
+        email=filters.get("email", email),
+        is_active=filters.get("is_active", is_active),
+        is_superuser=filters.get("is_superuser", is_superuser),
+        sort=sort,
+        cursor=cursor,
+        limit=range_limit or limit,
+        count=count,
+        offset=offset,
+    )
+    # Content-Range is necessary for react-admin to work
+    response.headers.update(page.headers("users"))
+    return page.items
 
 
 @r.get("/users/me", response_model=User, response_model_exclude_none=True)
@@ -47,7 +92,7 @@ async def user_me(current_user=Depends(get_current_active_user)):
     response_model=User,
     response_model_exclude_none=True,
 )
-async def user_details(
+def user_details(
     request: Request,
     user_id: int,
     db=Depends(get_db),
@@ -63,6 +108,18 @@ async def user_details(
     # )
 
 
+async def hash_password(password: str) -> str:
+    # bcrypt runs on the hashing threads, not on the database threadpool
+    try:
+        return await security.run_hashing(security.get_password_hash, password)
+    except security.PasswordHashingBusy:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many password hashes in progress, try again shortly",
+            headers={"Retry-After": "1"},
+        )
+
+
 @r.post("/users", response_model=User, response_model_exclude_none=True)
 async def user_create(
     request: Request,
@@ -73,7 +130,8 @@ async def user_create(
     """
     Create a new user
     """
-    return create_user(db, user)
+    hashed_password = await hash_password(user.password)
+    return await run_in_threadpool(create_user, db, user, hashed_password)
 
 
 @r.put(
@@ -89,13 +147,18 @@ async def user_edit(
     """
     Update existing user
     """
-    return edit_user(db, user_id, user)
+    hashed_password = None
+    if "password" in user.dict(exclude_unset=True):
+        hashed_password = await hash_password(user.password)
+    return await run_in_threadpool(
+        edit_user, db, user_id, user, hashed_password
+    )
 
 
 @r.delete(
     "/users/{user_id}", response_model=User, response_model_exclude_none=True
 )
-async def user_delete(
+def user_delete(
     request: Request,
     user_id: int,
     db=Depends(get_db),
@@ -1,13 +1,15 @@
 import jwt
 from fastapi import Depends, HTTPException, status
 from jwt import PyJWTError
+from starlette.concurrency import run_in_threadpool
 
-from app.db import models, schemas, session
+from app.db import schemas, session
 from app.db.crud.user_crud import get_user_by_email, create_user
 from app.core import security
+from app.core.cache import user_cache
 
 
-async def get_current_user(
+def get_current_user(
     db=Depends(session.get_db), token: str = Depends(security.oauth2_scheme)
 ):
     credentials_exception = HTTPException(
@@ -26,14 +28,20 @@ async def get_current_user(
         token_data = schemas.TokenData(email=email, permissions=permissions)
     except PyJWTError:
         raise credentials_exception
-    user = get_user_by_email(db, token_data.email)
+
+    # A snapshot rather than the ORM instance, so it outlives the session
+    user = user_cache.get(token_data.email)
     if user is None:
-        raise credentials_exception
+        db_user = get_user_by_email(db, token_data.email)
+        if db_user is None:
+            raise credentials_exception
+        user = schemas.User.from_orm(db_user)
+        user_cache.set(token_data.email, user)
     return user
 
 
 async def get_current_active_user(
-    current_user: models.User = Depends(get_current_user),
+    current_user: schemas.User = Depends(get_current_user),
 ):
     if not current_user.is_active:
         raise HTTPException(status_code=400, detail="Inactive user")
@@ -41,8 +49,8 @@ async def get_current_active_user(
 
 
 async def get_current_active_superuser(
-    current_user: models.User = Depends(get_current_user),
-) -> models.User:
+    current_user: schemas.User = Depends(get_current_user),
+) -> schemas.User:
     if not current_user.is_superuser:
         raise HTTPException(
             status_code=403, detail="The user doesn't have enough privileges"
@@ -50,20 +58,28 @@ async def get_current_active_superuser(
     return current_user
 
 
-def authenticate_user(db, email: str, password: str):
-    user = get_user_by_email(db, email)
+async def authenticate_user(db, email: str, password: str):
+    # Queries run on the database threads and bcrypt on the hashing threads,
+    # so a login never holds the event loop or a database thread while hashing
+    user = await run_in_threadpool(get_user_by_email, db, email)
     if not user:
         return False
-    if not security.verify_password(password, user.hashed_password):
+    if not await security.run_hashing(
+        security.verify_password, password, user.hashed_password
+    ):
         return False
     return user
 
 
-def sign_up_new_user(db, email: str, password: str):
-    user = get_user_by_email(db, email)
+async def sign_up_new_user(db, email: str, password: str):
+    user = await run_in_threadpool(get_user_by_email, db, email)
     if user:
         return False  # User already exists
-    new_user = create_user(
+    hashed_password = await security.run_hashing(
+        security.get_password_hash, password
+    )
+    new_user = await run_in_threadpool(
+        create_user,
         db,
         schemas.UserCreate(
             email=email,
@@ -71,5 +87,6 @@ def sign_up_new_user(db, email: str, password: str):
             is_active=True,
             is_superuser=False,
         ),
+        hashed_password,
     )
     return new_user
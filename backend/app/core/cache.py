@@ -0,0 +1,57 @@
+import threading
+import time
+import typing as t
+from collections import OrderedDict
+
+from app.core import config
+
+
+class TTLCache:
+    """
+    Thread safe mapping whose entries expire `ttl` seconds after being set.
+    Holds at most `maxsize` entries, evicting the least recently used.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[t.Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: t.Hashable) -> t.Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: t.Hashable, value: t.Any):
+        if self.maxsize <= 0 or self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def pop(self, key: t.Hashable):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Users resolved from a token subject by get_current_user. Changes made through
+# user_crud invalidate their entry; changes made elsewhere (another worker
+# process, the console) show up once the entry expires.
+user_cache = TTLCache(config.USER_CACHE_SIZE, config.USER_CACHE_TTL)
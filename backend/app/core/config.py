@@ -9,3 +9,64 @@ POSTGRES_DB = os.getenv("POSTGRES_DB")
 SECRET_KEY = os.getenv("SECRET_KEY")
 
 API_V1_STR = "/api/v1"
+
+# Bearer token Prometheus scrapes /api/metrics with. Without it, only
+# superusers can read the metrics
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+# Connection pool
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+# Seconds to wait for a connection before failing the request
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+# Connections older than this many seconds are replaced on checkout
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() in ("1", "true")
+
+# Unfiltered lists of tables larger than this report the planner's row
+# estimate as their total instead of counting every row
+COUNT_ESTIMATE_THRESHOLD = int(os.getenv("COUNT_ESTIMATE_THRESHOLD", "100000"))
+
+# Fast list responses (fast=true) are compressed from this many bytes on
+COMPRESSION_MINIMUM_SIZE = int(os.getenv("COMPRESSION_MINIMUM_SIZE", "1024"))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "4"))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+
+# Users resolved by get_current_user are reused for this many seconds
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", "30"))
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "1024"))
+
+# Retrieval (POST /api/v1/query). EMBEDDER is "openai" or "hashing", a local
+# embedder for tests; VECTOR_STORE is "pinecone" or "local", an in-process store
+EMBEDDER = os.getenv("EMBEDDER", "openai")
+EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "text-embedding-3-small")
+EMBEDDING_DIMENSION = int(os.getenv("EMBEDDING_DIMENSION", "1536"))
+OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+OPENAI_BASE_URL = os.getenv("OPENAI_BASE_URL", "https://api.openai.com")
+VECTOR_STORE = os.getenv("VECTOR_STORE", "pinecone")
+PINECONE_API_KEY = os.getenv("PINECONE_API_KEY")
+PINECONE_INDEX_HOST = os.getenv("PINECONE_INDEX_HOST")
+PINECONE_NAMESPACE = os.getenv("PINECONE_NAMESPACE", "cchc-chunks")
+# Hybrid queries fuse this many vector and lexical hits with reciprocal rank
+# fusion, 1 / (RRF_K + rank)
+HYBRID_CANDIDATES = int(os.getenv("HYBRID_CANDIDATES", "50"))
+RRF_K = int(os.getenv("RRF_K", "60"))
+# Threads running the vector half of hybrid queries
+RETRIEVAL_WORKERS = int(os.getenv("RETRIEVAL_WORKERS", "8"))
+# Seconds of chunks each worker reloads when it syncs its lexical index, for
+# transactions that committed after a later one
+LEXICAL_SYNC_OVERLAP = int(os.getenv("LEXICAL_SYNC_OVERLAP", "5"))
+# Lexical and hybrid queries sync the lexical index at most once every this
+# many seconds, so chunks stored by other workers may show up that much later
+LEXICAL_SYNC_INTERVAL = float(os.getenv("LEXICAL_SYNC_INTERVAL", "2"))
+
+# Threads dedicated to bcrypt, and how many more hashing requests may wait
+# for one of them before the auth routes answer 503
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+PASSWORD_HASH_QUEUE = int(os.getenv("PASSWORD_HASH_QUEUE", "32"))
+
+# Threads running the synchronous routes and dependencies, and therefore every
+# database call. By default one per connection the pool can open.
+DB_THREADPOOL_SIZE = int(
+    os.getenv("DB_THREADPOOL_SIZE", DB_POOL_SIZE + DB_MAX_OVERFLOW)
+)
@@ -0,0 +1,67 @@
+import hashlib
+import math
+import typing as t
+
+import httpx
+
+from app.core import config
+
+
+class OpenAIEmbedder:
+    """
+    Embeds texts with the OpenAI embeddings API, using the model the
+    document parser indexed the chunks with.
+    """
+
+    def __init__(
+        self,
+        api_key: str,
+        model: str = "text-embedding-3-small",
+        base_url: str = "https://api.openai.com",
+        timeout: float = 10.0,
+    ):
+        self.model = model
+        self.client = httpx.Client(
+            base_url=base_url,
+            headers={"Authorization": f"Bearer {api_key}"},
+            timeout=timeout,
+        )
+
+    def embed(self, text: str) -> t.List[float]:
+        response = self.client.post(
+            "/v1/embeddings", json={"model": self.model, "input": text}
+        )
+        response.raise_for_status()
+        return response.json()["data"][0]["embedding"]
+
+
+class HashingEmbedder:
+    """
+    Deterministic unit vectors built with the hashing trick: texts sharing
+    words get similar vectors. For tests and local runs without OpenAI.
+    """
+
+    def __init__(self, dimension: int = 1536):
+        self.dimension = dimension
+
+    def embed(self, text: str) -> t.List[float]:
+        vector = [0.0] * self.dimension
+        for word in text.lower().split():
+            digest = hashlib.blake2b(word.encode(), digest_size=8).digest()
+            value = int.from_bytes(digest, "little")
+            vector[value % self.dimension] += 1.0 if value & (1 << 63) else -1.0
+        norm = math.sqrt(sum(value * value for value in vector))
+        if not norm:
+            vector[0] = 1.0
+            return vector
+        return [value / norm for value in vector]
+
+
+def create_embedder():
+    if config.EMBEDDER == "hashing":
+        return HashingEmbedder(config.EMBEDDING_DIMENSION)
+    return OpenAIEmbedder(
+        config.OPENAI_API_KEY,
+        model=config.EMBEDDING_MODEL,
+        base_url=config.OPENAI_BASE_URL,
+    )
@@ -0,0 +1,105 @@
+import heapq
+import math
+import re
+import threading
+import typing as t
+import unicodedata
+from collections import Counter
+
+from app.core.vector_store import Hit
+
+# Words, numbers and dotted codes such as clause numbers ("5.2.3")
+_TOKEN = re.compile(r"[a-z0-9]+(?:\.[a-z0-9]+)*")
+_RUNS = re.compile(r"[a-z]+|[0-9]+")
+
+
+def tokenize(text: str) -> t.List[str]:
+    """
+    Lowercased tokens without accents. Tokens mixing letters and digits
+    ("nch851", "of2008") also yield their letter and digit runs, so
+    "NCh851" and "NCh 851" match each other.
+    """
+    text = unicodedata.normalize("NFKD", text.lower())
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    tokens = []
+    for token in _TOKEN.findall(text):
+        tokens.append(token)
+        if not token.replace(".", "").isdigit():
+            runs = _RUNS.findall(token)
+            if len(runs) > 1:
+                tokens += runs
+    return tokens
+
+
+class BM25Index:
+    """
+    In-memory inverted index over chunk texts, scored with Okapi BM25.
+
+    Chunks are added one by one as they are ingested; adding an id again
+    replaces its text. Document frequencies and the average length are read
+    at query time, so scores always reflect the current contents.
+    """
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        # term -> {chunk id: term frequency}
+        self._postings: t.Dict[str, t.Dict[str, int]] = {}
+        self._lengths: t.Dict[str, int] = {}
+        self._metadata: t.Dict[str, dict] = {}
+        self._total_length = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    def add(self, id: str, text: str, metadata: dict = None):
+        frequencies = Counter(tokenize(text))
+        with self._lock:
+            self._remove(id)
+            for term, frequency in frequencies.items():
+                self._postings.setdefault(term, {})[id] = frequency
+            length = sum(frequencies.values())
+            self._lengths[id] = length
+            self._total_length += length
+            self._metadata[id] = {**(metadata or {}), "text": text}
+
+    def remove(self, id: str):
+        with self._lock:
+            self._remove(id)
+
+    def _remove(self, id: str):
+        length = self._lengths.pop(id, None)
+        if length is None:
+            return
+        self._total_length -= length
+        text = self._metadata.pop(id)["text"]
+        for term in set(tokenize(text)):
+            postings = self._postings.get(term)
+            if postings is not None:
+                postings.pop(id, None)
+                if not postings:
+                    del self._postings[term]
+
+    def search(self, query: str, top_k: int) -> t.List[Hit]:
+        terms = set(tokenize(query))
+        scores: t.Dict[str, float] = {}
+        with self._lock:
+            count = len(self._lengths)
+            if not count or not terms:
+                return []
+            average_length = self._total_length / count
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(
+                    1 + (count - len(postings) + 0.5) / (len(postings) + 0.5)
+                )
+                for id, frequency in postings.items():
+                    norm = 1 - self.b + self.b * self._lengths[id] / average_length
+                    scores[id] = scores.get(id, 0.0) + idf * (
+                        frequency * (self.k1 + 1) / (frequency + self.k1 * norm)
+                    )
+            top = heapq.nlargest(top_k, scores.items(), key=lambda item: item[1])
+            return [Hit(id, score, self._metadata[id]) for id, score in top]
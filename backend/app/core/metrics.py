@@ -0,0 +1,134 @@
+"""
+Minimal in-process metrics rendered in the Prometheus text format.
+
+Metrics register themselves on creation and `render` returns all of them, so
+modules only need to create a metric at import time and update it.
+"""
+import bisect
+import threading
+import typing as t
+from abc import ABC, abstractmethod
+
+DEFAULT_BUCKETS = (
+    0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+REGISTRY: t.List["Metric"] = []
+
+
+class Metric(ABC):
+    type = ""
+
+    def __init__(self, name: str, description: str):
+        self.name = name
+        self.description = description
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def header(self) -> t.List[str]:
+        return [
+            f"# HELP {self.name} {self.description}",
+            f"# TYPE {self.name} {self.type}",
+        ]
+
+    @abstractmethod
+    def lines(self) -> t.List[str]:
+        """Returns the metric's lines of the text format, header included."""
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def __init__(self, name: str, description: str):
+        super().__init__(name, description)
+        self.value = 0
+
+    def inc(self, amount: float = 1):
+        with self._lock:
+            self.value += amount
+
+    def lines(self) -> t.List[str]:
+        return self.header() + [f"{self.name} {self.value}"]
+
+
+class Gauge(Metric):
+    """
+    Gauge whose value is read from `callback` when rendered.
+    """
+
+    type = "gauge"
+
+    def __init__(
+        self, name: str, description: str, callback: t.Callable[[], float]
+    ):
+        super().__init__(name, description)
+        self.callback = callback
+
+    def lines(self) -> t.List[str]:
+        return self.header() + [f"{self.name} {self.callback()}"]
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        buckets: t.Sequence[float] = DEFAULT_BUCKETS,
+        labels: t.Sequence[str] = (),
+    ):
+        super().__init__(name, description)
+        self.buckets = tuple(buckets)
+        self.label_names = tuple(labels)
+        # Per label values: (bucket counts, count, sum)
+        self._series: t.Dict[tuple, list] = {}
+
+    def observe(self, value: float, **labels):
+        key = tuple(labels.get(name, "") for name in self.label_names)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.setdefault(
+                key, [[0] * len(self.buckets), 0, 0.0]
+            )
+            if index < len(self.buckets):
+                series[0][index] += 1
+            series[1] += 1
+            series[2] += value
+
+    def count(self, **labels) -> int:
+        key = tuple(labels.get(name, "") for name in self.label_names)
+        with self._lock:
+            series = self._series.get(key)
+            return series[1] if series else 0
+
+    def lines(self) -> t.List[str]:
+        lines = self.header()
+        with self._lock:
+            series = {
+                key: (list(counts), count, total)
+                for key, (counts, count, total) in self._series.items()
+            }
+        for key, (counts, count, total) in sorted(series.items()):
+            labels = ",".join(
+                f'{name}="{value}"' for name, value in zip(self.label_names, key)
+            )
+            prefix = f"{labels}," if labels else ""
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                lines.append(
+                    f'{self.name}_bucket{{{prefix}le="{bound}"}} {cumulative}'
+                )
+            lines.append(f'{self.name}_bucket{{{prefix}le="+Inf"}} {count}')
+            suffix = f"{{{labels}}}" if labels else ""
+            lines.append(f"{self.name}_sum{suffix} {total}")
+            lines.append(f"{self.name}_count{suffix} {count}")
+        return lines
+
+
+def render() -> str:
+    lines = []
+    for metric in REGISTRY:
+        lines += metric.lines()
+    return "\n".join(lines) + "\n"
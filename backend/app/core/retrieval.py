@@ -0,0 +1,290 @@
+import threading
+import time
+import typing as t
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from fastapi import HTTPException
+from sqlalchemy.orm import Session
+
+from app.core import config, metrics
+from app.core.embeddings import create_embedder
+from app.core.lexical_index import BM25Index
+from app.core.vector_store import (
+    Hit,
+    VectorStoreNotConfigured,
+    create_vector_store,
+)
+from app.db import schemas
+from app.db.crud.chunk_crud import (
+    count_chunks,
+    get_chunk_ids,
+    get_chunks_indexed_since,
+    upsert_chunks,
+)
+from app.db.crud.document_crud import get_documents_by_hash
+
+RETRIEVAL_STAGE_SECONDS = metrics.Histogram(
+    "retrieval_stage_seconds",
+    "Seconds spent in each stage of a retrieval query.",
+    labels=("stage",),
+)
+
+
+class StageTimer:
+    """
+    Times the stages of one query, into `seconds` and the stage histogram.
+    """
+
+    def __init__(self):
+        self.seconds: t.Dict[str, float] = {}
+        # Hybrid queries time their two searches from different threads
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.seconds[name] = self.seconds.get(name, 0.0) + elapsed
+            RETRIEVAL_STAGE_SECONDS.observe(elapsed, stage=name)
+
+    def milliseconds(self) -> t.Dict[str, float]:
+        with self._lock:
+            return {
+                name: round(seconds * 1000, 3)
+                for name, seconds in self.seconds.items()
+            }
+
+    def server_timing(self) -> str:
+        return ", ".join(
+            f"{name};dur={ms}" for name, ms in self.milliseconds().items()
+        )
+
+
+class FusedHit(t.NamedTuple):
+    hit: Hit
+    score: float
+    # Rank of the hit in each result list it appeared in
+    ranks: t.Dict[str, int]
+
+
+def reciprocal_rank_fusion(
+    rankings: t.Dict[str, t.List[Hit]], k: int = 60
+) -> t.List[FusedHit]:
+    """
+    Merges ranked lists by summing 1 / (k + rank) over the lists each hit
+    appears in. Only ranks count, so scores on different scales (cosine
+    similarity, BM25) need no normalization.
+    """
+    fused: t.Dict[str, FusedHit] = {}
+    for name, hits in rankings.items():
+        for rank, hit in enumerate(hits, start=1):
+            previous = fused.get(hit.id)
+            if previous is None:
+                fused[hit.id] = FusedHit(hit, 1 / (k + rank), {name: rank})
+            else:
+                previous.ranks[name] = rank
+                fused[hit.id] = previous._replace(
+                    score=previous.score + 1 / (k + rank)
+                )
+    return sorted(fused.values(), key=lambda fused_hit: -fused_hit.score)
+
+
+class Retriever:
+    """
+    Finds the chunks closest to a question and joins them to their documents.
+
+    Chunks are searched by vector similarity, by BM25 over their text (which
+    catches exact codes like "NCh 851" or "5.2.3" that embeddings blur), or
+    by both fused with reciprocal rank fusion. In hybrid mode the vector
+    search, which mostly waits on the embeddings API and the store, runs on
+    another thread while the lexical search runs on the calling one.
+
+    Chunk texts are stored in the chunk table. Each process keeps its own
+    BM25 index of them, loaded on its first lexical query and updated with
+    the chunks other processes stored since at most every
+    LEXICAL_SYNC_INTERVAL seconds.
+    """
+
+    def __init__(
+        self,
+        embedder,
+        store,
+        namespace: str = config.PINECONE_NAMESPACE,
+        lexical_index: BM25Index = None,
+    ):
+        self.embedder = embedder
+        self.store = store
+        self.namespace = namespace
+        self.lexical_index = lexical_index if lexical_index is not None else BM25Index()
+        self._executor = ThreadPoolExecutor(
+            max_workers=config.RETRIEVAL_WORKERS, thread_name_prefix="retrieval"
+        )
+        # When each chunk in the lexical index was stored, and since when
+        # the chunk table was last read
+        self._indexed_at: t.Dict[str, datetime] = {}
+        self._synced_at: t.Optional[datetime] = None
+        self._sync_lock = threading.Lock()
+
+    def sync_lexical_index(self, db: Session, max_age: float = 0):
+        """
+        Adds the chunks stored since the last sync to the lexical index, all
+        of them on the first one, and removes the chunks deleted since. Does
+        nothing when the last sync started less than `max_age` seconds ago.
+        """
+        with self._sync_lock:
+            started_at = datetime.utcnow()
+            if (
+                self._synced_at is not None
+                and started_at - self._synced_at < timedelta(seconds=max_age)
+            ):
+                return
+            since = self._synced_at
+            if since is not None:
+                since -= timedelta(seconds=config.LEXICAL_SYNC_OVERLAP)
+            for chunk in get_chunks_indexed_since(db, since):
+                if self._indexed_at.get(chunk.id) != chunk.indexed_at:
+                    self.lexical_index.add(
+                        chunk.id, chunk.text, chunk.chunk_metadata
+                    )
+                    self._indexed_at[chunk.id] = chunk.indexed_at
+            # Only look for deleted chunks when the table shrank below the
+            # index
+            if len(self._indexed_at) > count_chunks(db):
+                self._remove_chunks(set(self._indexed_at) - get_chunk_ids(db))
+            self._synced_at = started_at
+
+    def remove_chunks(self, ids: t.Iterable[str]):
+        with self._sync_lock:
+            self._remove_chunks(ids)
+
+    def _remove_chunks(self, ids: t.Iterable[str]):
+        for id in ids:
+            self.lexical_index.remove(id)
+            self._indexed_at.pop(id, None)
+
+    def ingest(self, db: Session, chunks: t.List[schemas.ChunkIn]) -> int:
+        """
+        Stores chunks and adds them to the lexical index, and to the vector
+        store when they carry their embedding and the store is local.
+        """
+        indexed_at = datetime.utcnow()
+        upsert_chunks(db, chunks, indexed_at)
+        vectors = []
+        count = 0
+        for chunk in chunks:
+            with self._sync_lock:
+                self.lexical_index.add(chunk.id, chunk.text, chunk.metadata)
+                self._indexed_at[chunk.id] = indexed_at
+            if chunk.values is not None:
+                vectors.append(
+                    {
+                        "id": chunk.id,
+                        "values": chunk.values,
+                        "metadata": {**chunk.metadata, "text": chunk.text},
+                    }
+                )
+            count += 1
+        if vectors and hasattr(self.store, "upsert"):
+            self.store.upsert(vectors, self.namespace)
+        return count
+
+    def search(
+        self, question: str, top_k: int, timer: StageTimer
+    ) -> t.List[Hit]:
+        with timer.stage("embed"):
+            vector = self.embedder.embed(question)
+        with timer.stage("search"):
+            return self.store.query(vector, top_k, self.namespace)
+
+    def rank(
+        self,
+        db: Session,
+        question: str,
+        top_k: int,
+        timer: StageTimer,
+        mode: str,
+    ) -> t.List[FusedHit]:
+        if mode != "hybrid":
+            if mode == "vector":
+                hits = self.search(question, top_k, timer)
+            else:
+                with timer.stage("lexical"):
+                    self.sync_lexical_index(db, config.LEXICAL_SYNC_INTERVAL)
+                    hits = self.lexical_index.search(question, top_k)
+            return [
+                FusedHit(hit, hit.score, {mode: rank})
+                for rank, hit in enumerate(hits, start=1)
+            ]
+
+        # Each list goes deeper than top_k, so hits ranked well by only one
+        # of them can still make it into the fused top_k
+        candidates = max(top_k, config.HYBRID_CANDIDATES)
+        vector_hits = self._executor.submit(self.search, question, candidates, timer)
+        with timer.stage("lexical"):
+            self.sync_lexical_index(db, config.LEXICAL_SYNC_INTERVAL)
+            lexical_hits = self.lexical_index.search(question, candidates)
+        rankings = {"vector": vector_hits.result(), "lexical": lexical_hits}
+        with timer.stage("fuse"):
+            return reciprocal_rank_fusion(rankings, config.RRF_K)[:top_k]
+
+    def query(
+        self,
+        db: Session,
+        question: str,
+        top_k: int,
+        timer: StageTimer,
+        mode: str = "hybrid",
+    ) -> t.List[schemas.RetrievedChunk]:
+        fused_hits = self.rank(db, question, top_k, timer, mode)
+        with timer.stage("join"):
+            # Chunks from the parser carry the hash of their document
+            documents = get_documents_by_hash(
+                db,
+                [
+                    fused.hit.metadata["doc_hash"]
+                    for fused in fused_hits
+                    if fused.hit.metadata.get("doc_hash")
+                ],
+            )
+            return [
+                schemas.RetrievedChunk(
+                    id=fused.hit.id,
+                    rank=rank,
+                    score=fused.score,
+                    vector_rank=fused.ranks.get("vector"),
+                    lexical_rank=fused.ranks.get("lexical"),
+                    text=fused.hit.metadata.get("text"),
+                    section=fused.hit.metadata.get("section"),
+                    page_number=fused.hit.metadata.get("page_number"),
+                    last_page_number=fused.hit.metadata.get("last_page_number"),
+                    document=documents.get(fused.hit.metadata.get("doc_hash")),
+                )
+                for rank, fused in enumerate(fused_hits, start=1)
+            ]
+
+
+_retriever = None
+_retriever_lock = threading.Lock()
+
+
+def get_retriever() -> Retriever:
+    """
+    Dependency returning the process wide retriever, created on first use
+    from the EMBEDDER and VECTOR_STORE settings. Answers 503 while the vector
+    store is not configured.
+    """
+    global _retriever
+    with _retriever_lock:
+        if _retriever is None:
+            try:
+                store = create_vector_store()
+            except VectorStoreNotConfigured as e:
+                raise HTTPException(status_code=503, detail=str(e))
+            _retriever = Retriever(create_embedder(), store)
+        return _retriever
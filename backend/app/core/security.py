@@ -1,7 +1,14 @@
+import asyncio
+import threading
+import time
+import typing as t
+from concurrent.futures import ThreadPoolExecutor
+
 import jwt
 from fastapi.security import OAuth2PasswordBearer
 from passlib.context import CryptContext
 from datetime import datetime, timedelta
+from app.core import config, metrics
 from app.core.config import SECRET_KEY
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/token")
@@ -20,6 +27,81 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+class PasswordHashingBusy(Exception):
+    """
+    Raised when every hashing thread is busy and the waiting line is full.
+    """
+
+
+HASHING_SECONDS = metrics.Histogram(
+    "password_hashing_seconds",
+    "Seconds from submitting a password hash or check to its result.",
+)
+HASHING_REJECTED = metrics.Counter(
+    "password_hashing_rejected_total",
+    "Password hashes or checks refused because the hashing queue was full.",
+)
+
+# bcrypt releases the GIL, so these threads hash in parallel with the rest of
+# the app, but each one still keeps a core busy for the whole hash
+_hashing_executor: t.Optional[ThreadPoolExecutor] = None
+_hashing_workers = 0
+_hashing_lock = threading.Lock()
+_hashing_in_flight = 0
+
+metrics.Gauge(
+    "password_hashing_in_flight",
+    "Password hashes or checks running or waiting for a hashing thread.",
+    lambda: _hashing_in_flight,
+)
+
+
+def _get_hashing_executor() -> ThreadPoolExecutor:
+    # Called with _hashing_lock held. Built on first use, and again when
+    # PASSWORD_HASH_WORKERS changed, so the threads match the limit.
+    global _hashing_executor, _hashing_workers
+    workers = config.PASSWORD_HASH_WORKERS
+    if _hashing_executor is None or _hashing_workers != workers:
+        if _hashing_executor is not None:
+            _hashing_executor.shutdown(wait=False)
+        _hashing_workers = workers
+        _hashing_executor = ThreadPoolExecutor(
+            max_workers=_hashing_workers, thread_name_prefix="bcrypt"
+        )
+    return _hashing_executor
+
+
+async def run_hashing(func: t.Callable, *args):
+    """
+    Runs `func` (get_password_hash or verify_password) on the hashing threads.
+    Raises PasswordHashingBusy instead of queueing without bound.
+    """
+    global _hashing_in_flight
+    with _hashing_lock:
+        limit = config.PASSWORD_HASH_WORKERS + config.PASSWORD_HASH_QUEUE
+        if _hashing_in_flight >= limit:
+            HASHING_REJECTED.inc()
+            raise PasswordHashingBusy()
+        _hashing_in_flight += 1
+        executor = _get_hashing_executor()
+
+    start = time.perf_counter()
+
+    def hash_and_release():
+        # Released by the thread, so a cancelled request still holds its slot
+        # until the hash it started is done
+        global _hashing_in_flight
+        try:
+            return func(*args)
+        finally:
+            with _hashing_lock:
+                _hashing_in_flight -= 1
+            HASHING_SECONDS.observe(time.perf_counter() - start)
+
+    loop = asyncio.get_event_loop()
+    return await loop.run_in_executor(executor, hash_and_release)
+
+
 def create_access_token(*, data: dict, expires_delta: timedelta = None):
     to_encode = data.copy()
     if expires_delta:
@@ -0,0 +1,126 @@
+import heapq
+import math
+import threading
+import typing as t
+
+import httpx
+
+from app.core import config
+
+
+class Hit(t.NamedTuple):
+    id: str
+    score: float
+    metadata: dict
+
+
+class PineconeStore:
+    """
+    Queries a Pinecone index through its REST API, the index the document
+    parser upserts chunks into.
+    """
+
+    def __init__(self, api_key: str, host: str, timeout: float = 10.0):
+        if not host.startswith("http"):
+            host = f"https://{host}"
+        self.client = httpx.Client(
+            base_url=host,
+            headers={
+                "Api-Key": api_key,
+                "X-Pinecone-API-Version": "2024-07",
+            },
+            timeout=timeout,
+        )
+
+    def query(
+        self, vector: t.List[float], top_k: int, namespace: str
+    ) -> t.List[Hit]:
+        response = self.client.post(
+            "/query",
+            json={
+                "vector": vector,
+                "topK": top_k,
+                "namespace": namespace,
+                "includeMetadata": True,
+            },
+        )
+        response.raise_for_status()
+        return [
+            Hit(match["id"], match["score"], match.get("metadata") or {})
+            for match in response.json().get("matches", [])
+        ]
+
+
+class LocalVectorStore:
+    """
+    Brute force cosine similarity over vectors kept in the process. For tests
+    and small local indexes.
+    """
+
+    def __init__(self):
+        self._namespaces: t.Dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def upsert(self, records: t.Iterable[dict], namespace: str):
+        """
+        Stores Pinecone style records: {"id", "values", "metadata"}.
+        """
+        with self._lock:
+            vectors = self._namespaces.setdefault(namespace, {})
+            for record in records:
+                values = record["values"]
+                norm = math.sqrt(sum(value * value for value in values)) or 1.0
+                vectors[record["id"]] = (
+                    [value / norm for value in values],
+                    record.get("metadata") or {},
+                )
+
+    def delete(self, ids: t.Iterable[str], namespace: str):
+        with self._lock:
+            vectors = self._namespaces.get(namespace, {})
+            for id in ids:
+                vectors.pop(id, None)
+
+    def query(
+        self, vector: t.List[float], top_k: int, namespace: str
+    ) -> t.List[Hit]:
+        norm = math.sqrt(sum(value * value for value in vector)) or 1.0
+        query = [value / norm for value in vector]
+        with self._lock:
+            vectors = list(self._namespaces.get(namespace, {}).items())
+        scored = (
+            Hit(id, sum(a * b for a, b in zip(query, values)), metadata)
+            for id, (values, metadata) in vectors
+        )
+        return heapq.nlargest(top_k, scored, key=lambda hit: hit.score)
+
+
+class VectorStoreNotConfigured(Exception):
+    pass
+
+
+def vector_store_config_error() -> t.Optional[str]:
+    """
+    Describes what the VECTOR_STORE setting is missing, or returns None.
+    """
+    if config.VECTOR_STORE == "local":
+        return None
+    if config.VECTOR_STORE != "pinecone":
+        return f"Unknown VECTOR_STORE {config.VECTOR_STORE!r}, use pinecone or local"
+    missing = [
+        name
+        for name in ("PINECONE_API_KEY", "PINECONE_INDEX_HOST")
+        if not getattr(config, name)
+    ]
+    if missing:
+        return f"VECTOR_STORE is pinecone but {' and '.join(missing)} not set"
+    return None
+
+
+def create_vector_store():
+    error = vector_store_config_error()
+    if error:
+        raise VectorStoreNotConfigured(error)
+    if config.VECTOR_STORE == "local":
+        return LocalVectorStore()
+    return PineconeStore(config.PINECONE_API_KEY, config.PINECONE_INDEX_HOST)
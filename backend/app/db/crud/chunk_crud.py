@@ -0,0 +1,66 @@
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+import typing as t
+from datetime import datetime
+
+from app.db import models, schemas
+
+
+def upsert_chunks(
+    db: Session, chunks: t.List[schemas.ChunkIn], indexed_at: datetime
+) -> None:
+    """Stores chunk texts, replacing the chunks stored under the same ids."""
+    if not chunks:
+        return
+    statement = insert(models.Chunk.__table__).values(
+        [
+            {
+                "id": chunk.id,
+                "doc_hash": chunk.metadata.get("doc_hash"),
+                "text": chunk.text,
+                "metadata": chunk.metadata,
+                "indexed_at": indexed_at,
+            }
+            for chunk in chunks
+        ]
+    )
+    excluded = statement.excluded
+    db.execute(
+        statement.on_conflict_do_update(
+            index_elements=["id"],
+            set_={
+                "doc_hash": excluded["doc_hash"],
+                "text": excluded["text"],
+                "metadata": excluded["metadata"],
+                "indexed_at": excluded["indexed_at"],
+            },
+        )
+    )
+    db.commit()
+
+
+def get_chunks_indexed_since(
+    db: Session, since: t.Optional[datetime] = None
+) -> t.List[models.Chunk]:
+    """Returns the chunks indexed at or after `since`, or all of them."""
+    query = db.query(models.Chunk)
+    if since is not None:
+        query = query.filter(models.Chunk.indexed_at >= since)
+    return query.order_by(models.Chunk.indexed_at).all()
+
+
+def delete_chunks(db: Session, doc_hash: str) -> t.List[str]:
+    """Deletes the chunks of a document and returns their ids."""
+    query = db.query(models.Chunk).filter(models.Chunk.doc_hash == doc_hash)
+    ids = [id for id, in query.with_entities(models.Chunk.id)]
+    query.delete(synchronize_session=False)
+    db.commit()
+    return ids
+
+
+def count_chunks(db: Session) -> int:
+    return db.query(models.Chunk).count()
+
+
+def get_chunk_ids(db: Session) -> t.Set[str]:
+    return {id for id, in db.query(models.Chunk.id)}
@@ -1,28 +1,172 @@
 from fastapi import HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import func
+from sqlalchemy.orm import Session, joinedload, selectinload
 import typing as t
+from datetime import datetime
 
-from .tag_crud import get_tags_by_name_list
+from .pagination import Page, escape_like, paginate, row_dict
+from .tag_crud import TAG_ROW_COLUMNS, get_tags_by_name_list
 from app.db import models, schemas
+from app.db.models.document import SEARCH_CONFIG
+from app.db.models.document_tags import document_tags
+
+DOCUMENT_SORT_FIELDS = {
+    "updated_at": models.Document.updated_at,
+    "uploaded_at": models.Document.uploaded_at,
+    "title": models.Document.title,
+    "id": models.Document.id,
+}
+
+# The fields of schemas.Document, selected without building ORM instances
+DOCUMENT_ROW_COLUMNS = (
+    models.Document.id,
+    models.Document.doc_hash,
+    models.Document.title,
+    models.Document.description,
+    models.Document.document_type,
+    models.Document.file_weight,
+    models.Document.pages,
+    models.Document.s3_url,
+    models.Document.uploaded_at,
+    models.Document.updated_at,
+)
 
 def get_document(db: Session, document_id: int) -> models.Document:
     """Return the ORM instance of a document."""
-    document = db.query(models.Document).filter(models.Document.id == document_id).first()
+    document = (
+        db.query(models.Document)
+        .options(selectinload(models.Document.tags))
+        .filter(models.Document.id == document_id)
+        .first()
+    )
     if not document:
         raise HTTPException(status_code=404, detail="Document not found")
     return document
 
 def get_document_by_hash(db: Session, doc_hash: str) -> models.Document:
     """Return the ORM instance of a document."""
-    document = db.query(models.Document).filter(models.Document.doc_hash == doc_hash).first()
+    document = (
+        db.query(models.Document)
+        .options(selectinload(models.Document.tags))
+        .filter(models.Document.doc_hash == doc_hash)
+        .first()
+    )
     if not document:
         raise HTTPException(status_code=404, detail="Document not found")
     return document
 
-def get_documents(db: Session, skip=0, limit=100) -> t.List[schemas.DocumentOut]:
-    """Returns a list of documents as schemas for read-only purposes."""
-    documents = db.query(models.Document).offset(skip).limit(limit).all()
-    return [schemas.DocumentOut.from_orm(doc) for doc in documents]
+def get_documents_by_hash(db: Session, doc_hashes: t.Iterable[str]) -> t.Dict[str, models.Document]:
+    """Returns the documents with the given hashes, and their tags, in one query."""
+    doc_hashes = set(doc_hashes)
+    if not doc_hashes:
+        return {}
+    documents = (
+        db.query(models.Document)
+        .options(joinedload(models.Document.tags))
+        .filter(models.Document.doc_hash.in_(doc_hashes))
+        .all()
+    )
+    return {document.doc_hash: document for document in documents}
+
+def get_documents(
+    db: Session,
+    title: t.Optional[str] = None,
+    tag: t.Optional[str] = None,
+    document_type: t.Optional[str] = None,
+    uploaded_after: t.Optional[datetime] = None,
+    uploaded_before: t.Optional[datetime] = None,
+    updated_after: t.Optional[datetime] = None,
+    updated_before: t.Optional[datetime] = None,
+    sort: str = "-updated_at",
+    cursor: t.Optional[str] = None,
+    limit: int = 100,
+    count: str = "auto",
+    offset: t.Optional[int] = None,
+    as_rows: bool = False,
+) -> Page:
+    """Returns a page of documents matching every given filter.
+
+    `title` is a prefix, dates bound the range inclusively. With `as_rows`
+    the page holds plain dicts shaped like schemas.Document, without its
+    None values, instead of ORM instances.
+    """
+    Document = models.Document
+    filters = []
+    if title:
+        filters.append(Document.title.like(escape_like(title) + "%", escape="\\"))
+    if tag:
+        filters.append(Document.tags.any(models.Tag.name == tag))
+    if document_type:
+        filters.append(Document.document_type == document_type)
+    if uploaded_after:
+        filters.append(Document.uploaded_at >= uploaded_after)
+    if uploaded_before:
+        filters.append(Document.uploaded_at <= uploaded_before)
+    if updated_after:
+        filters.append(Document.updated_at >= updated_after)
+    if updated_before:
+        filters.append(Document.updated_at <= updated_before)
+
+    if as_rows:
+        query = db.query(*DOCUMENT_ROW_COLUMNS)
+    else:
+        # Tags of the whole page load in one extra SELECT ... WHERE id IN (...)
+        query = db.query(Document).options(selectinload(Document.tags))
+    page = paginate(
+        db, query.filter(*filters), Document, sort, DOCUMENT_SORT_FIELDS,
+        cursor=cursor, limit=limit, count=count, filtered=bool(filters),
+        offset=offset,
+    )
+    if as_rows:
+        page.items = _document_rows(db, page.items)
+    return page
+
+def _document_rows(db: Session, rows: list) -> t.List[dict]:
+    """Turns selected document rows into dicts, with their tags loaded in one query."""
+    documents = [row_dict(row) for row in rows]
+    by_id = {document["id"]: document for document in documents}
+    for document in documents:
+        document["tags"] = []
+    if by_id:
+        tag_rows = (
+            db.query(document_tags.c.document_id, *TAG_ROW_COLUMNS)
+            .join(models.Tag, models.Tag.id == document_tags.c.tag_id)
+            .filter(document_tags.c.document_id.in_(list(by_id)))
+            .order_by(models.Tag.id)
+        )
+        for tag_row in tag_rows:
+            tag = row_dict(tag_row)
+            by_id[tag.pop("document_id")]["tags"].append(tag)
+    return documents
+
+def search_documents(
+    db: Session, q: str, offset: int = 0, limit: int = 20
+) -> Page:
+    """Returns a page of the documents matching the web search style query `q`,
+    best ranked first, as schemas.DocumentSearchResult."""
+    Document = models.Document
+    query = func.websearch_to_tsquery(SEARCH_CONFIG, q)
+    matches = Document.search_vector.op("@@")(query)
+    # Cover density ranking, normalized by document length (32: rank / (rank + 1))
+    rank = func.ts_rank_cd(Document.search_vector, query, 32).label("rank")
+
+    total = db.query(func.count(Document.id)).filter(matches).scalar()
+    rows = (
+        db.query(Document, rank)
+        .options(selectinload(Document.tags))
+        .filter(matches)
+        .order_by(rank.desc(), Document.id)
+        .offset(offset)
+        .limit(limit)
+        .all()
+    )
+    items = [
+        schemas.DocumentSearchResult(
+            rank=rank, **schemas.Document.from_orm(document).dict()
+        )
+        for document, rank in rows
+    ]
+    return Page(items, None, total, offset=offset)
 
 def create_document(db: Session, document: schemas.DocumentCreate) -> models.Document:
     """Create a new document and return the ORM instance."""
@@ -69,6 +213,13 @@ def delete_document(db: Session, document_id: int) -> models.Document:
     db.commit()
     return document
 
+def delete_document_by_hash(db: Session, doc_hash: str) -> models.Document:
+    """Delete a document by hash and return the deleted ORM instance."""
+    document = get_document_by_hash(db, doc_hash)
+    db.delete(document)
+    db.commit()
+    return document
+
 def add_tags_to_document(db: Session, document_id: int, tags_names: t.List[str]) -> models.Document:
     """Add multiple tags to a document and return the updated ORM instance."""
     document = get_document(db, document_id)  # ORM instance
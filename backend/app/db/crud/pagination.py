@@ -0,0 +1,261 @@
+import base64
+import json
+import typing as t
+from datetime import datetime
+
+from fastapi import HTTPException
+from sqlalchemy import and_, or_, text, tuple_
+from sqlalchemy.orm import Query, Session
+
+from app.core import config
+
+MAX_PAGE_SIZE = 1000
+
+
+class Page:
+    """
+    One page of a keyset paginated list, or of an offset paginated one when
+    `offset` is given.
+    """
+
+    def __init__(
+        self,
+        items: list,
+        next_cursor: t.Optional[str],
+        total: t.Optional[int],
+        estimated: bool = False,
+        offset: int = 0,
+    ):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.total = total
+        self.estimated = estimated
+        self.offset = offset
+
+    def headers(self, resource: str) -> t.Dict[str, str]:
+        total = "*" if self.total is None else str(self.total)
+        # Keyset pages have no offset, so their positions are relative to
+        # the page. react-admin only reads the total after the slash.
+        if self.items:
+            last = self.offset + len(self.items) - 1
+            content_range = f"{resource} {self.offset}-{last}/{total}"
+        else:
+            content_range = f"{resource} */{total}"
+        headers = {"Content-Range": content_range, "X-Total-Count": total}
+        if self.estimated:
+            headers["X-Total-Count-Estimated"] = "true"
+        if self.next_cursor:
+            headers["X-Next-Cursor"] = self.next_cursor
+        return headers
+
+
+def encode_cursor(values: t.Sequence) -> str:
+    values = [
+        value.isoformat() if isinstance(value, datetime) else value
+        for value in values
+    ]
+    encoded = base64.urlsafe_b64encode(json.dumps(values).encode())
+    return encoded.decode().rstrip("=")
+
+
+def _decode_value(value, column):
+    if value is None:
+        return None
+    python_type = column.type.python_type
+    if python_type is datetime and isinstance(value, str):
+        return datetime.fromisoformat(value)
+    # bool is an int, but never a valid sort value
+    if python_type in (int, str) and type(value) is python_type:
+        return value
+    raise ValueError(value)
+
+
+def decode_cursor(cursor: str, columns: t.Sequence) -> list:
+    """
+    Decodes a cursor made by encode_cursor for the same `columns`, the last
+    of which is the id. Raises a 400 for anything else, before the values
+    reach the database.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if not isinstance(values, list) or len(values) != len(columns):
+            raise ValueError(cursor)
+        values = [
+            _decode_value(value, column)
+            for value, column in zip(values, columns)
+        ]
+        if values[-1] is None:
+            raise ValueError(cursor)
+        return values
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def react_admin_params(
+    sort: str,
+    range_: t.Optional[str],
+    filter_: t.Optional[str],
+    filter_types: t.Dict[str, type],
+) -> t.Tuple[str, t.Optional[int], t.Optional[int], dict]:
+    """
+    Translates the list parameters of react-admin's simple REST client,
+    sort=["id","ASC"]&range=[0,9]&filter={"email":"a"}, into this API's:
+    the sort field (prefixed with "-" for descending order), the offset and
+    limit of `range` (None when it is not sent) and the filters, checked
+    against `filter_types`. A plain `sort` such as "-id" is returned as is.
+    """
+    try:
+        if sort.startswith("["):
+            field, order = json.loads(sort)
+            if not isinstance(field, str) or order not in ("ASC", "DESC"):
+                raise ValueError(sort)
+            sort = f"-{field}" if order == "DESC" else field
+
+        offset = limit = None
+        if range_ is not None:
+            start, end = json.loads(range_)
+            if type(start) is not int or type(end) is not int or not 0 <= start <= end:
+                raise ValueError(range_)
+            offset, limit = start, min(end - start + 1, MAX_PAGE_SIZE)
+
+        filters = json.loads(filter_) if filter_ else {}
+        if not isinstance(filters, dict):
+            raise ValueError(filter_)
+    except (ValueError, TypeError):
+        raise HTTPException(
+            status_code=400, detail="Invalid sort, range or filter"
+        )
+
+    for name, value in filters.items():
+        if name not in filter_types:
+            raise HTTPException(
+                status_code=400, detail=f"Cannot filter by {name}"
+            )
+        if type(value) is not filter_types[name]:
+            raise HTTPException(
+                status_code=400, detail=f"Invalid value for filter {name}"
+            )
+    return sort, offset, limit, filters
+
+
+def row_dict(row) -> dict:
+    """
+    A selected row as a dict without its None values, as the routes
+    serialize with response_model_exclude_none.
+    """
+    return {key: value for key, value in row._asdict().items() if value is not None}
+
+
+def escape_like(prefix: str) -> str:
+    """
+    Escapes the LIKE wildcards of `prefix`, using backslash as escape.
+    """
+    return (
+        prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    )
+
+
+def after_cursor(column, id_column, value, last_id, descending: bool):
+    """
+    Rows after (value, last_id) in the order of (column, id_column).
+
+    NULLs sort as larger than any value, which is where Postgres puts them by
+    default, so a backward scan of an ascending (column, id) index serves the
+    descending order too.
+    """
+    if column is id_column:
+        return id_column < last_id if descending else id_column > last_id
+    if descending:
+        if value is None:
+            return or_(
+                column.isnot(None), and_(column.is_(None), id_column < last_id)
+            )
+        return tuple_(column, id_column) < tuple_(value, last_id)
+    if value is None:
+        return and_(column.is_(None), id_column > last_id)
+    return or_(
+        tuple_(column, id_column) > tuple_(value, last_id), column.is_(None)
+    )
+
+
+def estimated_count(db: Session, table: str) -> t.Optional[int]:
+    """
+    Planner's row estimate for `table`, or None when it was never analyzed.
+    """
+    estimate = db.execute(
+        text("SELECT reltuples FROM pg_class WHERE relname = :table"),
+        {"table": table},
+    ).scalar()
+    if estimate is None or estimate < 0:
+        return None
+    return int(estimate)
+
+
+def paginate(
+    db: Session,
+    query: Query,
+    model,
+    sort: str,
+    sort_fields: t.Dict[str, t.Any],
+    cursor: t.Optional[str] = None,
+    limit: int = 100,
+    count: str = "auto",
+    filtered: bool = False,
+    offset: t.Optional[int] = None,
+) -> Page:
+    """
+    Returns the page of `query` following `cursor`, ordered by the
+    `sort_fields` column named by `sort` (prefixed with "-" for descending
+    order) and then by id. With `offset` the page starts at that position
+    instead, as react-admin expects.
+
+    `count` is "exact", "none" or "auto", which uses the planner's estimate
+    for unfiltered tables above COUNT_ESTIMATE_THRESHOLD rows.
+    """
+    descending = sort.startswith("-")
+    column = sort_fields.get(sort.lstrip("-"))
+    if column is None:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Cannot sort by {sort}, use one of {', '.join(sort_fields)}",
+        )
+    if cursor and offset is not None:
+        raise HTTPException(
+            status_code=400, detail="Send either a cursor or a range"
+        )
+    id_column = model.id
+    columns = [column] if column is id_column else [column, id_column]
+
+    total, estimated = None, False
+    if count == "auto" and not filtered:
+        total = estimated_count(db, model.__tablename__)
+        estimated = (
+            total is not None and total >= config.COUNT_ESTIMATE_THRESHOLD
+        )
+        if not estimated:
+            total = None
+    if count != "none" and total is None:
+        total = query.order_by(None).count()
+
+    if cursor:
+        values = decode_cursor(cursor, columns)
+        last_id = values[-1]
+        query = query.filter(
+            after_cursor(column, id_column, values[0], last_id, descending)
+        )
+    query = query.order_by(
+        *(c.desc() if descending else c.asc() for c in columns)
+    )
+
+    if offset is not None:
+        items = query.offset(offset).limit(limit).all()
+        return Page(items, None, total, estimated, offset=offset)
+
+    rows = query.limit(limit + 1).all()
+    items = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        last = items[-1]
+        next_cursor = encode_cursor([getattr(last, c.key) for c in columns])
+    return Page(items, next_cursor, total, estimated)
@@ -2,8 +2,19 @@ from fastapi import HTTPException, status
 from sqlalchemy.orm import Session
 import typing as t
 
+from .pagination import Page, escape_like, paginate, row_dict
 from app.db import models, schemas
 
+TAG_SORT_FIELDS = {"name": models.Tag.name, "id": models.Tag.id}
+
+# The fields of schemas.Tag, selected without building ORM instances
+TAG_ROW_COLUMNS = (
+    models.Tag.id,
+    models.Tag.name,
+    models.Tag.description,
+    models.Tag.is_active,
+)
+
 def get_tag(db: Session, tag_id: int) -> models.Tag:
     tag = db.query(models.Tag).filter(models.Tag.id == tag_id).first()
     if not tag:
@@ -14,9 +25,33 @@ def get_tag_by_name(db: Session, name: str) -> t.Optional[models.Tag]:
     # Returns an ORM instance or None
     return db.query(models.Tag).filter(models.Tag.name == name).first()
 
-def get_tags(db: Session, skip: int = 0, limit: int = 100) -> t.List[models.Tag]:
-    # Returns a list of ORM Tag instances
-    return db.query(models.Tag).offset(skip).limit(limit).all()
+def get_tags(
+    db: Session,
+    name: t.Optional[str] = None,
+    is_active: t.Optional[bool] = None,
+    sort: str = "id",
+    cursor: t.Optional[str] = None,
+    limit: int = 100,
+    count: str = "auto",
+    offset: t.Optional[int] = None,
+    as_rows: bool = False,
+) -> Page:
+    # Returns a page of ORM Tag instances, or of dicts shaped like schemas.Tag
+    # with `as_rows`. `name` is a prefix
+    filters = []
+    if name:
+        filters.append(models.Tag.name.like(escape_like(name) + "%", escape="\\"))
+    if is_active is not None:
+        filters.append(models.Tag.is_active == is_active)
+    query = db.query(*TAG_ROW_COLUMNS) if as_rows else db.query(models.Tag)
+    page = paginate(
+        db, query.filter(*filters), models.Tag, sort, TAG_SORT_FIELDS,
+        cursor=cursor, limit=limit, count=count, filtered=bool(filters),
+        offset=offset,
+    )
+    if as_rows:
+        page.items = [row_dict(row) for row in page.items]
+    return page
 
 def get_tags_by_id_list(db: Session, tag_id_list: t.List[int]) -> t.List[models.Tag]:
     # Returns a list of ORM Tag instances
@@ -2,8 +2,10 @@ from fastapi import HTTPException, status
 from sqlalchemy.orm import Session
 import typing as t
 
+from .pagination import Page, escape_like, paginate
 from app.db import models, schemas
 from app.core.security import get_password_hash
+from app.core.cache import user_cache
 
 
 def get_user(db: Session, user_id: int): 
@@ -17,14 +19,51 @@ def get_user_by_email(db: Session, email: str) -> schemas.UserBase:
     return db.query(models.User).filter(models.User.email == email).first()
 
 
+USER_SORT_FIELDS = {"email": models.User.email, "id": models.User.id}
+
+
 def get_users(
-    db: Session, skip: int = 0, limit: int = 100
-) -> t.List[schemas.UserOut]:
-    return db.query(models.User).offset(skip).limit(limit).all()
+    db: Session,
+    email: t.Optional[str] = None,
+    is_active: t.Optional[bool] = None,
+    is_superuser: t.Optional[bool] = None,
+    sort: str = "id",
+    cursor: t.Optional[str] = None,
+    limit: int = 100,
+    count: str = "auto",
+    offset: t.Optional[int] = None,
+) -> Page:
+    # `email` is a prefix
+    filters = []
+    if email:
+        filters.append(
+            models.User.email.like(escape_like(email) + "%", escape="\\")
+        )
+    if is_active is not None:
+        filters.append(models.User.is_active == is_active)
+    if is_superuser is not None:
+        filters.append(models.User.is_superuser == is_superuser)
+    query = db.query(models.User).filter(*filters)
+    return paginate(
+        db,
+        query,
+        models.User,
+        sort,
+        USER_SORT_FIELDS,
+        cursor=cursor,
+        limit=limit,
+        count=count,
+        filtered=bool(filters),
+        offset=offset,
+    )
 
 
-def create_user(db: Session, user: schemas.UserCreate):
-    hashed_password = get_password_hash(user.password)
+def create_user(
+    db: Session, user: schemas.UserCreate, hashed_password: str = None
+):
+    # Callers on the event loop hash the password beforehand
+    if hashed_password is None:
+        hashed_password = get_password_hash(user.password)
     db_user = models.User(
         first_name=user.first_name,
         last_name=user.last_name,
@@ -43,21 +82,30 @@ def delete_user(db: Session, user_id: int):
     user = get_user(db, user_id)
     if not user:
         raise HTTPException(status.HTTP_404_NOT_FOUND, detail="User not found")
+    email = user.email
     db.delete(user)
     db.commit()
+    user_cache.pop(email)
     return user
 
 
 def edit_user(
-    db: Session, user_id: int, user: schemas.UserEdit
+    db: Session,
+    user_id: int,
+    user: schemas.UserEdit,
+    hashed_password: str = None,
 ) -> schemas.User:
     db_user = get_user(db, user_id)
     if not db_user:
         raise HTTPException(status.HTTP_404_NOT_FOUND, detail="User not found")
     update_data = user.dict(exclude_unset=True)
+    previous_email = db_user.email
 
     if "password" in update_data:
-        update_data["hashed_password"] = get_password_hash(user.password)
+        # Callers on the event loop hash the password beforehand
+        if hashed_password is None:
+            hashed_password = get_password_hash(user.password)
+        update_data["hashed_password"] = hashed_password
         del update_data["password"]
 
     for key, value in update_data.items():
@@ -66,4 +114,6 @@ def edit_user(
     db.add(db_user)
     db.commit()
     db.refresh(db_user)
+    user_cache.pop(previous_email)
+    user_cache.pop(db_user.email)
     return db_user
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, DateTime, String
+from sqlalchemy.dialects.postgresql import JSONB
+
+from app.db.session import Base
+
+class Chunk(Base):
+    __tablename__ = "chunk"
+
+    # The id of the chunk in the vector store
+    id = Column(String, primary_key=True)
+    doc_hash = Column(String, index=True)
+    text = Column(String, nullable=False)
+    # `metadata` is reserved on declarative classes
+    chunk_metadata = Column("metadata", JSONB, nullable=False, default=dict)
+    # Workers load the chunks indexed since their last look
+    indexed_at = Column(DateTime, index=True, nullable=False)
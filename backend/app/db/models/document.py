@@ -1,14 +1,30 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, ForeignKey, DateTime, Boolean, Index, DDL, event
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred, relationship
 from app.db.models.document_tags import document_tags
 
 from app.db.session import Base
 
+# Text search configuration of search_vector and of the search queries
+SEARCH_CONFIG = "spanish"
+
 class Document(Base):
     __tablename__ = "document"
+    # Keyset pagination runs on (sort column, id)
+    __table_args__ = (
+        Index("ix_document_title_id", "title", "id"),
+        Index("ix_document_uploaded_at_id", "uploaded_at", "id"),
+        Index("ix_document_updated_at_id", "updated_at", "id"),
+        Index(
+            "ix_document_title_prefix",
+            "title",
+            postgresql_ops={"title": "varchar_pattern_ops"},
+        ),
+        Index("ix_document_search_vector", "search_vector", postgresql_using="gin"),
+    )
     id = Column(Integer, primary_key=True, index=True)
     doc_hash = Column(String, index=True, unique=True)
-    title = Column(String, index=True)
+    title = Column(String)
     description = Column(String, index=True)
     document_type = Column(String, index=True)
     file_weight = Column(Integer, index=True)
@@ -17,6 +33,26 @@ class Document(Base):
     user_id = Column(Integer, ForeignKey('user.id'))
     user = relationship("User", back_populates="documents")
     tags = relationship("Tag", secondary=document_tags, back_populates="documents")    
-    uploaded_at = Column(DateTime, index=True)
-    updated_at = Column(DateTime, index=True)
-    is_up_to_date = Column(Boolean, default=True)
\ No newline at end of file
+    uploaded_at = Column(DateTime)
+    updated_at = Column(DateTime)
+    is_up_to_date = Column(Boolean, default=True)
+    # Title and description, kept up to date by the document_search_vector_update
+    # trigger. Deferred: only searches read it
+    search_vector = deferred(Column(TSVECTOR))
+
+
+# The migration creates the trigger in the database, this creates it along with
+# the table through Base.metadata.create_all
+event.listen(Document.__table__, "after_create", DDL(f"""
+    CREATE FUNCTION document_search_vector_update() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(NEW.title, '')), 'A') ||
+            setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(NEW.description, '')), 'B');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql;
+    CREATE TRIGGER document_search_vector_update
+    BEFORE INSERT OR UPDATE OF title, description ON document
+    FOR EACH ROW EXECUTE FUNCTION document_search_vector_update()
+"""))
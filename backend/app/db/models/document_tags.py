@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Table, ForeignKey
+from sqlalchemy import Column, Integer, Table, ForeignKey, Index
 
 from app.db.session import Base
 
@@ -7,4 +7,5 @@ document_tags = Table(
     Base.metadata,
     Column("document_id", Integer, ForeignKey("document.id"), primary_key=True),
     Column("tag_id", Integer, ForeignKey("tag.id"), primary_key=True),
+    Index("ix_document_tags_tag_id", "tag_id", "document_id"),
 )
\ No newline at end of file
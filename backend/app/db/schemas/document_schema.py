@@ -1,4 +1,4 @@
-from .main_schema import DocumentBase, Tag
+from .main_schema import Document, DocumentBase, Tag
 from typing import List
 
 class DocumentOut(DocumentBase):
@@ -23,4 +23,7 @@ class DocumentEdit(DocumentBase):
     doc_hash : str
 
     class Config:
-        orm_mode = True
\ No newline at end of file
+        orm_mode = True
+
+class DocumentSearchResult(Document):
+    rank: float
@@ -0,0 +1,39 @@
+from pydantic import BaseModel, Field
+from typing import Any, Dict, List, Optional
+
+from .main_schema import Document
+
+class QueryRequest(BaseModel):
+    question: str = Field(..., min_length=1)
+    top_k: int = Field(5, ge=1, le=50)
+    mode: str = Field("hybrid", regex="^(hybrid|vector|lexical)$")
+
+class RetrievedChunk(BaseModel):
+    id: str
+    rank: int
+    # Reciprocal rank fusion score in hybrid mode, else the search's own
+    score: float
+    vector_rank: Optional[int] = None
+    lexical_rank: Optional[int] = None
+    text: Optional[str] = None
+    section: Optional[str] = None
+    page_number: Optional[int] = None
+    last_page_number: Optional[int] = None
+    # None when the chunk's document is not in the backend yet
+    document: Optional[Document] = None
+
+class QueryResponse(BaseModel):
+    question: str
+    chunks: List[RetrievedChunk]
+    # Milliseconds spent in each retrieval stage
+    timings: Dict[str, float]
+
+class ChunkIn(BaseModel):
+    id: str
+    text: str
+    # Only kept by a local vector store
+    values: Optional[List[float]] = None
+    metadata: Dict[str, Any] = {}
+
+class ChunksIndexed(BaseModel):
+    indexed: int
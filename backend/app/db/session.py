@@ -1,19 +1,103 @@
+import time
+
 from sqlalchemy import create_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import QueuePool
+from starlette.requests import Request
+
+from app.core import config, metrics
+
+POOL_CHECKOUT_SECONDS = metrics.Histogram(
+    "db_pool_checkout_seconds",
+    "Seconds spent waiting for a connection from the pool.",
+)
+POOL_CHECKOUT_TIMEOUTS = metrics.Counter(
+    "db_pool_checkout_timeouts_total",
+    "Checkouts that gave up after DB_POOL_TIMEOUT seconds.",
+)
+
+
+class TimedQueuePool(QueuePool):
+    """
+    QueuePool recording how long each checkout waits, including the time to
+    open a new connection when the pool grows.
+    """
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            POOL_CHECKOUT_TIMEOUTS.inc()
+            raise
+        finally:
+            POOL_CHECKOUT_SECONDS.observe(time.perf_counter() - start)
 
-from app.core import config
 
 engine = create_engine(
     config.SQLALCHEMY_DATABASE_URI,
+    poolclass=TimedQueuePool,
+    pool_size=config.DB_POOL_SIZE,
+    max_overflow=config.DB_MAX_OVERFLOW,
+    pool_timeout=config.DB_POOL_TIMEOUT,
+    pool_recycle=config.DB_POOL_RECYCLE,
+    pool_pre_ping=config.DB_POOL_PRE_PING,
 )
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
+metrics.Gauge(
+    "db_pool_checked_out",
+    "Connections currently checked out of the pool.",
+    lambda: engine.pool.checkedout(),
+)
+metrics.Gauge(
+    "db_pool_overflow",
+    "Connections open beyond the pool size.",
+    lambda: max(engine.pool.overflow(), 0),
+)
+
+
+class RequestSession:
+    """
+    The session of one request. It is only created when something asks for
+    it, so requests that never query do not touch the pool, and every
+    dependency of the request shares it.
+    """
+
+    def __init__(self):
+        self._session = None
+
+    @property
+    def started(self) -> bool:
+        return self._session is not None
+
+    def get(self) -> Session:
+        if self._session is None:
+            self._session = SessionLocal()
+        return self._session
+
+    def close(self):
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
 
 # Dependency
-def get_db():
+def get_db(request: Request):
+    """
+    Yields the request's session, set up by `db_session_middleware`. Outside
+    of it (e.g. when the app runs without the middleware) a session of its
+    own is created and closed.
+    """
+    request_session = getattr(request.state, "db", None)
+    if request_session is not None:
+        yield request_session.get()
+        return
+
     db = SessionLocal()
     try:
         yield db
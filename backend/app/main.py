@@ -1,4 +1,9 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
 from fastapi import FastAPI, Depends
+from starlette.concurrency import run_in_threadpool
 from starlette.requests import Request
 import uvicorn
 
@@ -6,24 +11,52 @@ from app.api.api_v1.routers.users import users_router
 from app.api.api_v1.routers.documents import documents_router
 from app.api.api_v1.routers.tags import tags_router
 from app.api.api_v1.routers.auth import auth_router
+from app.api.api_v1.routers.metrics import metrics_router
+from app.api.api_v1.routers.query import query_router
 from app.core import config
-from app.db.session import SessionLocal
+from app.core.vector_store import vector_store_config_error
+from app.db.session import RequestSession
 from app.core.auth import get_current_active_user
 from app.core.celery_app import celery_app
 from app import tasks
 
 
+_log = logging.getLogger(__name__)
+
 app = FastAPI(
     title=config.PROJECT_NAME, docs_url="/api/docs", openapi_url="/api"
 )
 
 
+@app.on_event("startup")
+def configure_threadpool():
+    # Routes touching the database are plain `def` functions, which FastAPI
+    # runs in the loop's default executor so queries never block the event
+    # loop. Bound it so requests queue here rather than on the connection pool.
+    asyncio.get_event_loop().set_default_executor(
+        ThreadPoolExecutor(
+            max_workers=config.DB_THREADPOOL_SIZE, thread_name_prefix="db"
+        )
+    )
+
+
+@app.on_event("startup")
+def check_vector_store_config():
+    # Only /query needs the vector store, so the rest of the API still starts
+    error = vector_store_config_error()
+    if error:
+        _log.warning(f"{error}: queries will answer 503")
+
+
 @app.middleware("http")
 async def db_session_middleware(request: Request, call_next):
-    request.state.db = SessionLocal()
-    response = await call_next(request)
-    request.state.db.close()
-    return response
+    request.state.db = RequestSession()
+    try:
+        return await call_next(request)
+    finally:
+        if request.state.db.started:
+            # Closing rolls back and returns the connection: keep it off the loop
+            await run_in_threadpool(request.state.db.close)
 
 
 @app.get("/api/v1")
@@ -48,6 +81,8 @@ app.include_router(
 
 app.include_router(auth_router, prefix="/api", tags=["auth"])
 
+app.include_router(metrics_router, prefix="/api", tags=["metrics"])
+
 app.include_router(
     documents_router,
     prefix="/api/v1",
@@ -62,5 +97,12 @@ app.include_router(
     dependencies=[Depends(get_current_active_user)],
 )
 
+app.include_router(
+    query_router,
+    prefix="/api/v1",
+    tags=["query"],
+    dependencies=[Depends(get_current_active_user)],
+)
+
 if __name__ == "__main__":
     uvicorn.run("main:app", host="0.0.0.0", reload=True, port=8888)
@@ -0,0 +1,156 @@
+import asyncio
+import threading
+import time
+
+import httpx
+
+from app.api.api_v1.routers import documents
+from app.core import auth, config, security
+from app.core.auth import get_current_active_user
+from app.main import app
+
+LOGINS = 8
+DOCUMENT_READS = 40
+
+
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+def test_logins_do_not_block_document_reads(
+    client, test_user, test_superuser, test_password, monkeypatch
+):
+    # Every verification holds its hashing thread until the reads are done
+    hashing = threading.Semaphore(0)
+    release = threading.Event()
+
+    def held_verify_password(plain_password, hashed_password):
+        hashing.release()
+        assert release.wait(10)
+        return True
+
+    monkeypatch.setattr(security, "verify_password", held_verify_password)
+    monkeypatch.setattr(auth, "get_user_by_email", lambda db, email: test_user)
+    monkeypatch.setattr(
+        documents,
+        "get_document",
+        lambda db, document_id: {
+            "id": document_id,
+            "doc_hash": f"hash-{document_id}",
+            "title": "Document",
+            "tags": [],
+        },
+    )
+    app.dependency_overrides[get_current_active_user] = lambda: test_superuser
+
+    async def login(http):
+        return await http.post(
+            "/api/token",
+            data={"username": test_user.email, "password": test_password},
+        )
+
+    async def load():
+        async with httpx.AsyncClient(app=app, base_url="http://test") as http:
+            logins = asyncio.gather(*(login(http) for _ in range(LOGINS)))
+            loop = asyncio.get_event_loop()
+            for _ in range(config.PASSWORD_HASH_WORKERS):
+                assert await loop.run_in_executor(None, hashing.acquire, True, 10)
+
+            # Served while every hashing thread is busy with a login
+            for i in range(DOCUMENT_READS):
+                response = await asyncio.wait_for(
+                    http.get(f"/api/v1/document/{i + 1}"), timeout=5
+                )
+                assert response.status_code == 200
+
+            release.set()
+            return await logins
+
+    try:
+        responses = run(load())
+    finally:
+        release.set()
+        app.dependency_overrides.pop(get_current_active_user)
+
+    assert [response.status_code for response in responses] == [200] * LOGINS
+
+
+def test_login_storm_is_shed(client, test_user, monkeypatch):
+    running = 0
+    most_running = 0
+    lock = threading.Lock()
+
+    def slow_verify_password(plain_password, hashed_password):
+        nonlocal running, most_running
+        with lock:
+            running += 1
+            most_running = max(most_running, running)
+        time.sleep(0.2)
+        with lock:
+            running -= 1
+        return True
+
+    monkeypatch.setattr(security, "verify_password", slow_verify_password)
+    monkeypatch.setattr(auth, "get_user_by_email", lambda db, email: test_user)
+    monkeypatch.setattr(config, "PASSWORD_HASH_WORKERS", 1)
+    monkeypatch.setattr(config, "PASSWORD_HASH_QUEUE", 1)
+    rejected = security.HASHING_REJECTED.value
+
+    async def load():
+        async with httpx.AsyncClient(app=app, base_url="http://test") as http:
+            return await asyncio.gather(
+                *(
+                    http.post(
+                        "/api/token",
+                        data={"username": test_user.email, "password": "x"},
+                    )
+                    for _ in range(6)
+                )
+            )
+
+    responses = run(load())
+    statuses = sorted(response.status_code for response in responses)
+
+    assert statuses == [200, 200, 503, 503, 503, 503]
+    assert all(
+        response.headers["Retry-After"] == "1"
+        for response in responses
+        if response.status_code == 503
+    )
+    assert security.HASHING_REJECTED.value == rejected + 4
+    # The hashing pool was rebuilt with the single configured thread
+    assert most_running == 1
+
+
+def test_user_passwords_are_hashed_on_the_hashing_threads(
+    client, superuser_token_headers, monkeypatch
+):
+    hashed_on = []
+
+    def recording_get_password_hash(password):
+        hashed_on.append(threading.current_thread().name)
+        return "hashed"
+
+    monkeypatch.setattr(
+        security, "get_password_hash", recording_get_password_hash
+    )
+
+    response = client.post(
+        "/api/v1/users",
+        json={"email": "new@email.com", "password": "new_password"},
+        headers=superuser_token_headers,
+    )
+    assert response.status_code == 200
+    response = client.put(
+        f"/api/v1/users/{response.json()['id']}",
+        json={"email": "new@email.com", "password": "other_password"},
+        headers=superuser_token_headers,
+    )
+    assert response.status_code == 200
+
+    assert len(hashed_on) == 2
+    assert all(name.startswith("bcrypt") for name in hashed_on)
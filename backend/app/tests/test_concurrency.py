@@ -0,0 +1,76 @@
+import asyncio
+import threading
+
+import httpx
+
+from app.api.api_v1.routers import documents
+from app.core import config
+from app.core.auth import get_current_active_user
+from app.main import app, configure_threadpool
+
+SLOW_QUERIES = 3
+FAST_REQUESTS = 50
+
+
+def test_slow_queries_do_not_block_other_requests(
+    client, test_superuser, monkeypatch
+):
+    # One thread left for the other requests once the slow queries hold theirs
+    monkeypatch.setattr(config, "DB_THREADPOOL_SIZE", SLOW_QUERIES + 1)
+    release = threading.Event()
+    query_threads = []
+
+    async def load():
+        loop = asyncio.get_event_loop()
+        # httpx does not send the startup events
+        configure_threadpool()
+        entered = asyncio.Semaphore(0)
+
+        def held_get_document(db, document_id):
+            # A blocking query, held until the other requests are served
+            query_threads.append(threading.current_thread().name)
+            loop.call_soon_threadsafe(entered.release)
+            assert release.wait(10)
+            return {
+                "id": document_id,
+                "doc_hash": f"hash-{document_id}",
+                "title": "Slow document",
+                "tags": [],
+            }
+
+        monkeypatch.setattr(documents, "get_document", held_get_document)
+
+        async with httpx.AsyncClient(app=app, base_url="http://test") as http:
+            slow = [
+                asyncio.ensure_future(http.get(f"/api/v1/document/{i + 1}"))
+                for i in range(SLOW_QUERIES)
+            ]
+            # Concurrent slow queries overlap instead of queueing behind
+            # each other
+            for _ in range(SLOW_QUERIES):
+                await asyncio.wait_for(entered.acquire(), timeout=10)
+
+            # Served by the remaining thread while the slow queries run
+            for i in range(FAST_REQUESTS):
+                response = await asyncio.wait_for(
+                    http.get(f"/api/v1/document/hash/hash-{i}"), timeout=5
+                )
+                assert response.status_code == 200
+            assert not any(request.done() for request in slow)
+
+            release.set()
+            return await asyncio.gather(*slow)
+
+    app.dependency_overrides[get_current_active_user] = lambda: test_superuser
+    loop = asyncio.new_event_loop()
+    try:
+        responses = loop.run_until_complete(load())
+    finally:
+        release.set()
+        loop.close()
+        app.dependency_overrides.pop(get_current_active_user)
+
+    statuses = [response.status_code for response in responses]
+    assert statuses == [200] * SLOW_QUERIES
+    # The queries ran on the bounded database threadpool
+    assert all(name.startswith("db") for name in query_threads)
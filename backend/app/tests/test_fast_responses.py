@@ -0,0 +1,64 @@
+import gzip
+from datetime import datetime
+
+import orjson
+from starlette.requests import Request
+
+from app.core import config
+from app.core.responses import fast_response
+from app.db import models
+
+
+def request_accepting(encoding: str) -> Request:
+    return Request(
+        {
+            "type": "http",
+            "headers": [(b"accept-encoding", encoding.encode())],
+        }
+    )
+
+
+def test_fast_path_matches_response_model(
+    client, test_db, test_superuser, superuser_token_headers
+):
+    tags = [models.Tag(name="normas"), models.Tag(name="manuales", description="x")]
+    for i in range(3):
+        document = models.Document(
+            doc_hash=f"hash-{i}",
+            title=f"Documento {i}",
+            pages=i or None,
+            updated_at=datetime(2024, 1, 1, 12, 30, 15, 250),
+            user_id=test_superuser.id,
+        )
+        document.tags.extend(tags[:i])
+        test_db.add(document)
+    test_db.commit()
+
+    def get(url, **params):
+        response = client.get(url, params=params, headers=superuser_token_headers)
+        assert response.status_code == 200
+        for item in response.json():
+            item.get("tags", []).sort(key=lambda tag: tag["id"])
+        return response
+
+    for url in ("/api/v1/documents", "/api/v1/tags"):
+        standard, fast = get(url), get(url, fast=True)
+        assert fast.json() == standard.json()
+        assert fast.headers["Content-Range"] == standard.headers["Content-Range"]
+
+
+def test_fast_response_compression(monkeypatch):
+    monkeypatch.setattr(config, "COMPRESSION_MINIMUM_SIZE", 100)
+    small = [{"id": 1}]
+    large = [{"id": i, "title": "Documento"} for i in range(100)]
+
+    response = fast_response(request_accepting("gzip"), small)
+    assert "content-encoding" not in response.headers
+
+    response = fast_response(request_accepting("gzip;q=0, identity"), large)
+    assert "content-encoding" not in response.headers
+
+    response = fast_response(request_accepting("gzip, deflate"), large)
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["content-length"] == str(len(response.body))
+    assert orjson.loads(gzip.decompress(response.body)) == large
@@ -0,0 +1,107 @@
+from datetime import datetime
+
+from app.db import models
+from app.db.crud.pagination import encode_cursor
+
+
+def make_documents(test_db, test_superuser):
+    tag = models.Tag(name="normas")
+    documents = [
+        models.Document(
+            doc_hash=f"hash-{i}",
+            title=title,
+            document_type=document_type,
+            updated_at=updated_at,
+            user_id=test_superuser.id,
+        )
+        for i, (title, document_type, updated_at) in enumerate(
+            [
+                ("Norma 1", "pdf", datetime(2024, 1, 1)),
+                ("Norma 2", "pdf", datetime(2024, 1, 2)),
+                ("Manual", "pdf", None),
+                ("100% Normas", "docx", datetime(2024, 1, 2)),
+                ("Informe", "pdf", None),
+            ]
+        )
+    ]
+    documents[0].tags.append(tag)
+    documents[3].tags.append(tag)
+    test_db.add_all(documents)
+    test_db.commit()
+    return documents
+
+
+def walk(client, headers, **params):
+    """
+    Follows X-Next-Cursor through every page and returns the titles.
+    """
+    titles = []
+    params.setdefault("limit", 2)
+    while True:
+        response = client.get("/api/v1/documents", params=params, headers=headers)
+        assert response.status_code == 200
+        titles += [document["title"] for document in response.json()]
+        if "X-Next-Cursor" not in response.headers:
+            return titles
+        params["cursor"] = response.headers["X-Next-Cursor"]
+
+
+def test_pages_cover_every_document_once(
+    client, test_db, test_superuser, superuser_token_headers
+):
+    documents = make_documents(test_db, test_superuser)
+
+    def key(document):
+        # NULLs sort after every date, ties are broken by id
+        return (document.updated_at is None, document.updated_at or 0, document.id)
+
+    expected = [document.title for document in sorted(documents, key=key)]
+    assert walk(client, superuser_token_headers, sort="updated_at") == expected
+    assert walk(client, superuser_token_headers, sort="-updated_at") == expected[::-1]
+    assert walk(client, superuser_token_headers, sort="title", limit=1) == sorted(
+        expected
+    )
+
+
+def test_filters(client, test_db, test_superuser, superuser_token_headers):
+    make_documents(test_db, test_superuser)
+
+    def titles(**params):
+        response = client.get(
+            "/api/v1/documents", params=params, headers=superuser_token_headers
+        )
+        assert response.status_code == 200
+        assert response.headers["X-Total-Count"] == str(len(response.json()))
+        return sorted(document["title"] for document in response.json())
+
+    assert titles(title="Norma") == ["Norma 1", "Norma 2"]
+    assert titles(title="100%") == ["100% Normas"]
+    assert titles(tag="normas") == ["100% Normas", "Norma 1"]
+    assert titles(type="docx") == ["100% Normas"]
+    assert titles(updated_after="2024-01-02T00:00:00") == ["100% Normas", "Norma 2"]
+    assert titles(updated_before="2024-01-01T12:00:00", tag="normas") == ["Norma 1"]
+
+
+def test_invalid_sort_and_cursor(client, superuser_token_headers):
+    response = client.get(
+        "/api/v1/documents",
+        params={"sort": "description"},
+        headers=superuser_token_headers,
+    )
+    assert response.status_code == 400
+
+    for cursor in (
+        "not-a-cursor",
+        encode_cursor([1]),
+        # Values of the wrong type for (updated_at, id)
+        encode_cursor(["x", "y"]),
+        encode_cursor(["2024-01-01T00:00:00", "1"]),
+        encode_cursor([{"a": 1}, 1]),
+        encode_cursor(["2024-01-01T00:00:00", None]),
+    ):
+        response = client.get(
+            "/api/v1/documents",
+            params={"cursor": cursor},
+            headers=superuser_token_headers,
+        )
+        assert response.status_code == 400
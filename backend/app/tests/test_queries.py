@@ -0,0 +1,59 @@
+from app.db import models
+
+
+def add_documents(test_db, user, count):
+    tags = [models.Tag(name="normas"), models.Tag(name="manuales")]
+    documents = [
+        models.Document(doc_hash=f"hash-{i}", title=f"Documento {i}", user_id=user.id)
+        for i in range(count)
+    ]
+    for document in documents:
+        document.tags.extend(tags)
+    test_db.add_all(documents)
+    test_db.commit()
+    return documents
+
+
+def test_document_list_queries_do_not_grow_with_page(
+    client, test_db, test_superuser, superuser_token_headers, count_queries
+):
+    add_documents(test_db, test_superuser, 20)
+
+    def queries_for(limit):
+        # The test client shares one session: start from an empty state
+        test_db.expire_all()
+        count_queries.clear()
+        response = client.get(
+            "/api/v1/documents",
+            params={"limit": limit, "count": "exact"},
+            headers=superuser_token_headers,
+        )
+        assert response.status_code == 200
+        assert len(response.json()) == limit
+        assert all(len(document["tags"]) == 2 for document in response.json())
+        return len(count_queries)
+
+    # The first request also resolves the current user
+    queries_for(1)
+    # Count, page and one query for the tags of the whole page
+    assert queries_for(2) == queries_for(20) == 3
+
+
+def test_document_detail_loads_tags_eagerly(
+    client, test_db, test_superuser, superuser_token_headers, count_queries
+):
+    document = add_documents(test_db, test_superuser, 1)[0]
+    urls = (
+        f"/api/v1/document/{document.id}",
+        f"/api/v1/document/hash/{document.doc_hash}",
+    )
+    # Resolves the current user
+    client.get(urls[0], headers=superuser_token_headers)
+
+    for url in urls:
+        test_db.expire_all()
+        count_queries.clear()
+        response = client.get(url, headers=superuser_token_headers)
+        assert response.status_code == 200
+        # The document and its tags
+        assert len(count_queries) == 2
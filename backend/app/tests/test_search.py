@@ -0,0 +1,74 @@
+from app.db import models
+
+
+def search(client, headers, q, **params):
+    response = client.get(
+        "/api/v1/documents/search", params={"q": q, **params}, headers=headers
+    )
+    assert response.status_code == 200
+    return response
+
+
+def add_documents(test_db, user, documents):
+    for i, (title, description) in enumerate(documents):
+        test_db.add(
+            models.Document(
+                doc_hash=f"hash-{i}",
+                title=title,
+                description=description,
+                user_id=user.id,
+            )
+        )
+    test_db.commit()
+
+
+def test_search_ranks_title_matches_first(
+    client, test_db, test_superuser, superuser_token_headers
+):
+    add_documents(
+        test_db,
+        test_superuser,
+        [
+            ("Manual de hormigón", "Incluye las normas de diseño sísmico"),
+            ("Normas de diseño sísmico", "Requisitos para edificios"),
+            ("Informe anual", "Resultados financieros"),
+        ],
+    )
+
+    # Spanish stemming: "norma" finds "normas"
+    response = search(client, superuser_token_headers, "norma sísmica")
+    results = response.json()
+    assert [result["title"] for result in results] == [
+        "Normas de diseño sísmico",
+        "Manual de hormigón",
+    ]
+    assert results[0]["rank"] > results[1]["rank"]
+    assert response.headers["Content-Range"] == "documents 0-1/2"
+
+    response = search(client, superuser_token_headers, "norma -hormigón")
+    assert [result["title"] for result in response.json()] == [
+        "Normas de diseño sísmico"
+    ]
+
+    response = search(
+        client, superuser_token_headers, "norma", offset=1, limit=1
+    )
+    assert [result["title"] for result in response.json()] == [
+        "Manual de hormigón"
+    ]
+    assert response.headers["Content-Range"] == "documents 1-1/2"
+
+
+def test_edited_documents_are_reindexed(
+    client, test_db, test_superuser, superuser_token_headers
+):
+    add_documents(test_db, test_superuser, [("Informe anual", None)])
+    document = test_db.query(models.Document).one()
+
+    document.title = "Informe de ensayos de hormigón"
+    test_db.commit()
+
+    response = search(client, superuser_token_headers, "hormigones")
+    assert [result["id"] for result in response.json()] == [document.id]
+    assert search(client, superuser_token_headers, "anual").json() == []
+
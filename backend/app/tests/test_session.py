@@ -0,0 +1,104 @@
+from sqlalchemy import create_engine
+
+from app.core import config
+from app.db import session
+from app.db.session import (
+    POOL_CHECKOUT_SECONDS,
+    RequestSession,
+    TimedQueuePool,
+    get_db,
+)
+from app.main import app
+
+
+class SharedSession:
+    """
+    Wraps the test session, counting closes instead of closing it.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self.closed = 0
+
+    def __getattr__(self, name):
+        return getattr(self.db, name)
+
+    def close(self):
+        self.closed += 1
+
+
+def test_request_session_is_created_lazily(monkeypatch):
+    created = []
+    monkeypatch.setattr(
+        session, "SessionLocal", lambda: created.append(object()) or created[-1]
+    )
+
+    request_session = RequestSession()
+    assert created == []
+    assert request_session.get() is request_session.get()
+    assert len(created) == 1
+
+
+def test_request_without_queries_opens_no_session(client, monkeypatch):
+    created = []
+    monkeypatch.setattr(
+        session, "SessionLocal", lambda: created.append(object()) or created[-1]
+    )
+
+    response = client.get("/api/v1")
+    assert response.status_code == 200
+    assert created == []
+
+
+def test_dependencies_share_one_session(
+    client, test_db, user_token_headers, monkeypatch
+):
+    created = []
+
+    def session_local():
+        created.append(SharedSession(test_db))
+        return created[-1]
+
+    monkeypatch.setattr(session, "SessionLocal", session_local)
+    app.dependency_overrides.pop(get_db)
+
+    # get_current_user and the route both depend on get_db
+    response = client.get("/api/v1/users/me", headers=user_token_headers)
+    assert response.status_code == 200
+    assert len(created) == 1
+    assert created[0].closed == 1
+
+
+def test_pool_checkouts_are_measured():
+    engine = create_engine(
+        f"{config.SQLALCHEMY_DATABASE_URI}_test", poolclass=TimedQueuePool
+    )
+    before = POOL_CHECKOUT_SECONDS.count()
+
+    engine.connect().close()
+    engine.dispose()
+
+    assert POOL_CHECKOUT_SECONDS.count() == before + 1
+
+
+def test_metrics_endpoint(client, superuser_token_headers):
+    response = client.get("/api/metrics", headers=superuser_token_headers)
+    assert response.status_code == 200
+    assert "# TYPE db_pool_checkout_seconds histogram" in response.text
+    assert "db_pool_checked_out" in response.text
+
+
+def test_metrics_endpoint_access(client, user_token_headers, monkeypatch):
+    assert client.get("/api/metrics").status_code == 401
+    response = client.get("/api/metrics", headers=user_token_headers)
+    assert response.status_code == 403
+
+    monkeypatch.setattr(config, "METRICS_TOKEN", "scrape-token")
+    response = client.get(
+        "/api/metrics", headers={"Authorization": "Bearer scrape-token"}
+    )
+    assert response.status_code == 200
+    response = client.get(
+        "/api/metrics", headers={"Authorization": "Bearer other-token"}
+    )
+    assert response.status_code == 401
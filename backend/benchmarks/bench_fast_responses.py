@@ -0,0 +1,92 @@
+"""
+Times a page of documents through the standard path (ORM-like objects
+validated against the response model and encoded by the standard library)
+and the fast path, on an app without database so only serialization is
+measured.
+
+    docker compose run backend python benchmarks/bench_fast_responses.py
+"""
+import time
+import typing as t
+from datetime import datetime
+from types import SimpleNamespace
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from starlette.requests import Request
+
+from app.core.responses import fast_response
+from app.db.schemas import Document
+
+SIZES = (1000, 10000)
+REPEATS = 3
+
+
+def make_rows(count: int) -> t.List[dict]:
+    tags = [
+        {"id": 1, "name": "normas", "is_active": True},
+        {"id": 2, "name": "manuales", "description": "Manuales", "is_active": True},
+    ]
+    return [
+        {
+            "id": i,
+            "doc_hash": f"{i:064x}",
+            "title": f"Documento {i}",
+            "description": "Norma técnica de construcción",
+            "document_type": "pdf",
+            "file_weight": 123456,
+            "pages": 42,
+            "s3_url": f"https://bucket.s3.amazonaws.com/{i}.pdf",
+            "uploaded_at": datetime(2024, 1, 1),
+            "updated_at": datetime(2024, 6, 1),
+            "tags": tags,
+        }
+        for i in range(count)
+    ]
+
+
+def main():
+    bench = FastAPI()
+    pages = {}
+
+    @bench.get(
+        "/standard/{size}",
+        response_model=t.List[Document],
+        response_model_exclude_none=True,
+    )
+    def standard(size: int):
+        return pages[size][0]
+
+    @bench.get("/fast/{size}")
+    def fast(request: Request, size: int):
+        return fast_response(request, pages[size][1])
+
+    http = TestClient(bench)
+    for size in SIZES:
+        rows = make_rows(size)
+        objects = [
+            SimpleNamespace(
+                **{**row, "tags": [SimpleNamespace(**tag) for tag in row["tags"]]}
+            )
+            for row in rows
+        ]
+        pages[size] = (objects, rows)
+
+        timings = {}
+        for path in ("standard", "fast"):
+            start = time.perf_counter()
+            for _ in range(REPEATS):
+                response = http.get(f"/{path}/{size}")
+                response.raise_for_status()
+            timings[path] = (time.perf_counter() - start) / REPEATS
+            sent = response.headers.get("content-length")
+
+        print(
+            f"{size} rows: standard {timings['standard'] * 1000:.0f} ms, "
+            f"fast {timings['fast'] * 1000:.0f} ms ({sent} bytes sent), "
+            f"{timings['standard'] / timings['fast']:.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
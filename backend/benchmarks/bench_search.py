@@ -0,0 +1,63 @@
+"""
+Times the full text document search over 100k documents. The documents are
+inserted in a transaction that is rolled back at the end, so the database is
+left as it was.
+
+    docker compose run backend python benchmarks/bench_search.py
+"""
+import time
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.db.crud.document_crud import search_documents
+from app.db.session import engine
+
+DOCUMENTS = 100000
+REPEATS = 5
+
+
+def main():
+    connection = engine.connect()
+    transaction = connection.begin()
+    db = Session(bind=connection)
+    try:
+        db.execute(
+            text(
+                """
+                INSERT INTO document (doc_hash, title, description)
+                SELECT
+                    'bench-hash-' || i,
+                    'Documento ' || i,
+                    CASE WHEN i % 1000 = 0
+                        THEN 'Especificaciones de aislación térmica'
+                        ELSE 'Procedimientos de obra y control de calidad'
+                    END
+                FROM generate_series(1, :documents) AS i
+                """
+            ),
+            {"documents": DOCUMENTS},
+        )
+        db.execute(text("ANALYZE document"))
+        # Warm up the plan and the buffers
+        search_documents(db, "aislación")
+
+        timings = []
+        for _ in range(REPEATS):
+            start = time.perf_counter()
+            page = search_documents(db, "aislación térmica")
+            timings.append(time.perf_counter() - start)
+
+        print(
+            f"search over {DOCUMENTS} documents ({page.total} matches): "
+            f"best {min(timings) * 1000:.1f} ms, "
+            f"worst {max(timings) * 1000:.1f} ms"
+        )
+    finally:
+        db.close()
+        transaction.rollback()
+        connection.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,7 @@ from fastapi.testclient import TestClient
 import typing as t
 
 from app.core import config, security
+from app.core.cache import user_cache
 from app.db.session import Base, get_db
 from app.db import models
 from app.main import app
@@ -73,6 +74,32 @@ def create_test_db():
     drop_database(test_db_url)
 
 
+@pytest.fixture(autouse=True)
+def clear_user_cache():
+    """
+    Users are cached by email, which the fixtures reuse across tests.
+    """
+    user_cache.clear()
+    yield
+    user_cache.clear()
+
+
+@pytest.fixture
+def count_queries(test_db):
+    """
+    Records the statements the test session sends to the database.
+    """
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    engine = test_db.get_bind()
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    yield statements
+    event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
 @pytest.fixture
 def client(test_db):
     """
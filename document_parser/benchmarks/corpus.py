@@ -0,0 +1,181 @@
+"""
+Synthetic PDF corpus for the parser benchmarks.
+
+The PDFs are written by hand (no PDF library needed): every page has a bold
+heading, justified looking paragraphs of pseudo Spanish text in Helvetica and,
+optionally, JPEG figures drawn from a small pool so the image description
+cache sees repeated figures like real reports do.
+"""
+import io
+import random
+import textwrap
+from pathlib import Path
+from typing import List
+
+WORDS = (
+    "obra construccion proyecto hormigon estructura vivienda edificio faena "
+    "seguridad trabajador mandante contratista presupuesto plazo etapa diseno "
+    "ingenieria arquitectura permiso municipal norma calidad control riesgo "
+    "inspeccion terreno excavacion fundacion muro losa pilar viga acero "
+    "moldaje armadura cemento arido mezcla resistencia ensayo laboratorio "
+    "informe tecnico productividad costo indice mercado empleo inversion "
+    "region comuna sector inmobiliario infraestructura vial puerto energia "
+    "agua sanitaria mantencion licitacion contrato garantia recepcion final "
+    "avance mensual programa capacitacion gremio empresa socio camara comite "
+    "encuesta expectativa demanda oferta credito hipotecario tasa subsidio "
+    "medida mitigacion ambiental residuo reciclaje eficiencia sostenible "
+    "innovacion digital modelo bim planificacion logistica suministro"
+).split()
+
+LINE_CHARS = 90
+LINES_PER_PAGE = 40
+PAGE_WIDTH, PAGE_HEIGHT = 612, 792
+
+
+def _sentence(rng: random.Random) -> str:
+    words = [rng.choice(WORDS) for _ in range(rng.randint(8, 22))]
+    return " ".join(words).capitalize() + "."
+
+
+def _paragraph(rng: random.Random) -> str:
+    return " ".join(_sentence(rng) for _ in range(rng.randint(3, 7)))
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _figure(seed: int, width: int = 480, height: int = 320) -> bytes:
+    """
+    A JPEG chart-like figure: bars of random heights over a gradient.
+    """
+    from PIL import Image, ImageDraw
+
+    rng = random.Random(seed)
+    img = Image.new("RGB", (width, height), "white")
+    draw = ImageDraw.Draw(img)
+    for y in range(height):
+        shade = 255 - int(40 * y / height)
+        draw.line([(0, y), (width, y)], fill=(shade, shade, 255))
+    bars = rng.randint(4, 12)
+    bar_width = width // (bars * 2)
+    for i in range(bars):
+        bar_height = rng.randint(height // 8, height - 20)
+        x = bar_width // 2 + i * bar_width * 2
+        color = tuple(rng.randint(0, 200) for _ in range(3))
+        draw.rectangle([x, height - bar_height, x + bar_width, height - 10], fill=color)
+    buffer = io.BytesIO()
+    img.save(buffer, format="JPEG", quality=80)
+    return buffer.getvalue()
+
+
+def _page_content(rng: random.Random, heading: str, figures: List[str]) -> bytes:
+    ops = [f"BT /F2 16 Tf 72 {PAGE_HEIGHT - 72} Td ({_escape(heading)}) Tj ET"]
+
+    y = PAGE_HEIGHT - 110
+    # Figures take the bottom of the page, one every 170 points
+    lines_left = LINES_PER_PAGE - 12 * len(figures)
+    ops.append(f"BT /F1 10 Tf 13 TL 72 {y} Td")
+    while lines_left > 0:
+        for line in textwrap.wrap(_paragraph(rng), LINE_CHARS)[:lines_left]:
+            ops.append(f"({_escape(line)}) Tj T*")
+            lines_left -= 1
+        ops.append("T*")
+        lines_left -= 1
+    ops.append("ET")
+
+    for i, name in enumerate(figures):
+        ops.append(f"q 240 0 0 160 {72 + (i % 2) * 250} {72 + (i // 2) * 170} cm /{name} Do Q")
+    return "\n".join(ops).encode("latin-1")
+
+
+def write_pdf(path: Path, seed: int, pages: int, images_per_page: int = 0,
+              image_pool: int = 8) -> Path:
+    """
+    Writes one synthetic PDF with `pages` pages and returns its path.
+    """
+    rng = random.Random(seed)
+    objects = []  # body of object n is objects[n - 1]
+
+    def add(body: bytes) -> int:
+        objects.append(body)
+        return len(objects)
+
+    catalog = add(b"")  # filled once the page tree exists
+    pages_obj = add(b"")
+    regular = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>")
+    bold = add(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica-Bold /Encoding /WinAnsiEncoding >>")
+
+    image_objects = {}
+    page_ids = []
+    for page_no in range(1, pages + 1):
+        if page_no == 1:
+            heading = f"Informe {seed}: {_sentence(rng)[:60]}"
+        else:
+            heading = f"{page_no - 1}. {rng.choice(WORDS).capitalize()} y {rng.choice(WORDS)}"
+
+        figures = {}
+        for i in range(images_per_page):
+            figure_seed = rng.randrange(image_pool)
+            if figure_seed not in image_objects:
+                jpeg = _figure(figure_seed)
+                image_objects[figure_seed] = add(
+                    b"<< /Type /XObject /Subtype /Image /Width 480 /Height 320 "
+                    b"/ColorSpace /DeviceRGB /BitsPerComponent 8 /Filter /DCTDecode "
+                    b"/Length " + str(len(jpeg)).encode() + b" >>\nstream\n" + jpeg + b"\nendstream"
+                )
+            figures[f"Im{i}"] = image_objects[figure_seed]
+
+        content = _page_content(rng, heading, list(figures))
+        content_id = add(
+            b"<< /Length " + str(len(content)).encode() + b" >>\nstream\n" + content + b"\nendstream"
+        )
+        xobjects = " ".join(f"/{name} {obj} 0 R" for name, obj in figures.items())
+        page_ids.append(add(
+            f"<< /Type /Page /Parent {pages_obj} 0 R /MediaBox [0 0 {PAGE_WIDTH} {PAGE_HEIGHT}] "
+            f"/Resources << /Font << /F1 {regular} 0 R /F2 {bold} 0 R >> "
+            f"/XObject << {xobjects} >> >> /Contents {content_id} 0 R >>".encode()
+        ))
+
+    objects[catalog - 1] = f"<< /Type /Catalog /Pages {pages_obj} 0 R >>".encode()
+    kids = " ".join(f"{page_id} 0 R" for page_id in page_ids)
+    objects[pages_obj - 1] = f"<< /Type /Pages /Kids [{kids}] /Count {len(page_ids)} >>".encode()
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(f"{number} 0 obj\n".encode() + body + b"\nendobj\n")
+    xref = out.tell()
+    out.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode())
+    for offset in offsets:
+        out.write(f"{offset:010d} 00000 n \n".encode())
+    out.write(
+        f"trailer\n<< /Size {len(objects) + 1} /Root {catalog} 0 R >>\n"
+        f"startxref\n{xref}\n%%EOF\n".encode()
+    )
+
+    path = Path(path)
+    path.write_bytes(out.getvalue())
+    return path
+
+
+def generate_corpus(folder: Path, documents: int = 20, pages: int = 10,
+                    images_per_page: int = 0, seed: int = 0) -> List[Path]:
+    """
+    Writes `documents` PDFs into `folder`. Page counts vary from half to one
+    and a half times `pages`, so a batch has a few long outliers. The same
+    arguments always produce the same files, which are reused when present.
+    """
+    folder = Path(folder)
+    folder.mkdir(parents=True, exist_ok=True)
+    rng = random.Random(seed)
+    paths = []
+    for i in range(documents):
+        doc_pages = max(1, rng.randint(pages // 2, pages + pages // 2))
+        path = folder / f"synthetic_{seed}_{i:04d}_{doc_pages}p.pdf"
+        if not path.exists():
+            write_pdf(path, seed * 100000 + i, doc_pages, images_per_page)
+        paths.append(path)
+    return paths
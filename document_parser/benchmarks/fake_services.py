@@ -0,0 +1,306 @@
+"""
+Local stand-ins for the remote services the parser talks to.
+
+FakeServices runs one threaded HTTP server speaking just enough of the OpenAI
+API (embeddings and chat completions) and of the backend API (token, document
+hash check, create and update) for the parser, with a configurable latency per
+service. InMemoryVectorStore replaces the Pinecone index handle.
+"""
+import base64
+import hashlib
+import json
+import logging
+import random
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+import numpy as np
+
+_log = logging.getLogger(__name__)
+
+FAKE_DESCRIPTION = (
+    "Gráfico de barras que muestra la evolución mensual de un indicador del "
+    "sector construcción."
+)
+
+
+@dataclass
+class Latency:
+    """
+    Seconds added to each request, per service. Every delay is scaled by a
+    random factor in [1 - jitter, 1 + jitter].
+    """
+    embeddings: float = 0.05
+    vision: float = 0.5
+    backend: float = 0.02
+    jitter: float = 0.2
+
+    def sleep(self, service: str):
+        base = getattr(self, service)
+        if base > 0:
+            time.sleep(base * random.uniform(1 - self.jitter, 1 + self.jitter))
+
+
+def fake_embedding(text: str, dimension: int = 1536) -> np.ndarray:
+    """
+    Deterministic unit vector built with the hashing trick, so texts sharing
+    words get similar vectors and the semantic chunker finds real breakpoints.
+    """
+    vector = np.zeros(dimension, dtype=np.float32)
+    for word in text.lower().split():
+        digest = hashlib.blake2b(word.encode("utf-8"), digest_size=8).digest()
+        value = int.from_bytes(digest, "little")
+        vector[value % dimension] += 1.0 if value & (1 << 63) else -1.0
+    norm = np.linalg.norm(vector)
+    if not norm:
+        vector[0] = 1.0
+        return vector
+    return vector / norm
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        _log.debug(format % args)
+
+    def _read_body(self) -> bytes:
+        length = int(self.headers.get("Content-Length") or 0)
+        return self.rfile.read(length) if length else b""
+
+    def _send_json(self, status: int, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        path = urlparse(self.path).path
+        body = self._read_body()
+        services = self.server.services
+
+        if path.endswith("/embeddings"):
+            services.latency.sleep("embeddings")
+            return self._send_json(200, services.embeddings_response(json.loads(body)))
+        if path.endswith("/chat/completions"):
+            services.latency.sleep("vision")
+            return self._send_json(200, services.chat_response(json.loads(body)))
+        if path.endswith("/token"):
+            services.latency.sleep("backend")
+            return self._send_json(
+                200, {"access_token": "benchmark", "token_type": "bearer", "expires_in": 3600}
+            )
+        if path.endswith("/documents"):
+            services.latency.sleep("backend")
+            document = json.loads(body)
+            services.store_document(document)
+            return self._send_json(201, document)
+        if path.endswith("/chunks"):
+            services.latency.sleep("backend")
+            return self._send_json(200, {"indexed": len(json.loads(body))})
+        self._send_json(404, {"detail": "Not Found"})
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        services = self.server.services
+        if "/document/hash/" in path:
+            services.latency.sleep("backend")
+            doc_hash = path.rsplit("/", 1)[-1]
+            if services.has_document(doc_hash):
+                return self._send_json(200, {"exists": True})
+            return self._send_json(404, {"detail": "Document not found"})
+        self._send_json(404, {"detail": "Not Found"})
+
+    def do_PUT(self):
+        path = urlparse(self.path).path
+        body = self._read_body()
+        services = self.server.services
+        if "/document/hash/" in path:
+            services.latency.sleep("backend")
+            document = json.loads(body)
+            services.store_document(document)
+            return self._send_json(200, document)
+        self._send_json(404, {"detail": "Not Found"})
+
+
+class FakeServices:
+    """
+    Serves the fake OpenAI and backend APIs on 127.0.0.1 from a background
+    thread. Use as a context manager, or call start() and stop().
+    """
+
+    def __init__(self, latency: Latency = None, dimension: int = 1536, port: int = 0):
+        self.latency = latency or Latency()
+        self.dimension = dimension
+        self.requests = {"embeddings": 0, "embedded_texts": 0, "vision": 0}
+        self._documents = {}
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), _Handler)
+        self._server.daemon_threads = True
+        self._server.services = self
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def openai_base_url(self) -> str:
+        return f"{self.base_url}/v1"
+
+    @property
+    def backend_auth_url(self) -> str:
+        return f"{self.base_url}/api/token"
+
+    @property
+    def backend_api_url(self) -> str:
+        return f"{self.base_url}/api/v1"
+
+    def start(self) -> "FakeServices":
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="fake-services", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def embeddings_response(self, request: dict) -> dict:
+        texts = request["input"]
+        if isinstance(texts, str):
+            texts = [texts]
+        as_base64 = request.get("encoding_format") == "base64"
+        data = []
+        tokens = 0
+        for index, text in enumerate(texts):
+            # Token ids may be sent instead of text; they still get a vector
+            text = text if isinstance(text, str) else " ".join(map(str, text))
+            vector = fake_embedding(text, self.dimension)
+            tokens += len(text.split())
+            data.append({
+                "object": "embedding",
+                "index": index,
+                "embedding": (
+                    base64.b64encode(vector.astype("<f4").tobytes()).decode("ascii")
+                    if as_base64 else vector.tolist()
+                ),
+            })
+        with self._lock:
+            self.requests["embeddings"] += 1
+            self.requests["embedded_texts"] += len(texts)
+        return {
+            "object": "list",
+            "data": data,
+            "model": request.get("model", "text-embedding-3-small"),
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+        }
+
+    def chat_response(self, request: dict) -> dict:
+        with self._lock:
+            self.requests["vision"] += 1
+        return {
+            "id": "chatcmpl-benchmark",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "gpt-4o"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": FAKE_DESCRIPTION},
+                "finish_reason": "stop",
+            }],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        }
+
+    def store_document(self, document: dict):
+        with self._lock:
+            self._documents[document.get("doc_hash")] = document
+
+    def has_document(self, doc_hash: str) -> bool:
+        with self._lock:
+            return doc_hash in self._documents
+
+
+class _Match:
+    def __init__(self, id: str, score: float, values, metadata: dict):
+        self.id = id
+        self.score = score
+        self.values = values
+        self.metadata = metadata
+
+
+class _QueryResponse:
+    def __init__(self, matches: list):
+        self.matches = matches
+
+
+class InMemoryVectorStore:
+    """
+    Brute force cosine similarity store with the subset of the Pinecone index
+    API that PineconeClient uses: upsert, query and delete.
+    """
+
+    def __init__(self):
+        self._namespaces = {}
+        self._lock = threading.Lock()
+
+    def upsert(self, vectors, namespace: str = ""):
+        with self._lock:
+            records = self._namespaces.setdefault(namespace, {})
+            for vector in vectors:
+                values = np.asarray(vector["values"], dtype=np.float32)
+                norm = np.linalg.norm(values)
+                records[vector["id"]] = (
+                    values / norm if norm else values, vector.get("metadata", {})
+                )
+        return {"upserted_count": len(vectors)}
+
+    def query(self, vector, top_k: int = 10, namespace: str = "",
+              include_values: bool = False, include_metadata: bool = False, **kwargs):
+        with self._lock:
+            records = list(self._namespaces.get(namespace, {}).items())
+        if not records:
+            return _QueryResponse([])
+
+        query = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm:
+            query = query / norm
+        matrix = np.vstack([values for _, (values, _) in records])
+        scores = matrix @ query
+        top = np.argsort(-scores)[:top_k]
+        return _QueryResponse([
+            _Match(
+                records[i][0],
+                float(scores[i]),
+                records[i][1][0].tolist() if include_values else None,
+                records[i][1][1] if include_metadata else None,
+            )
+            for i in top
+        ])
+
+    def delete(self, ids=None, delete_all: bool = False, namespace: str = "", **kwargs):
+        with self._lock:
+            if delete_all:
+                self._namespaces.pop(namespace, None)
+            else:
+                records = self._namespaces.get(namespace, {})
+                for id in ids or []:
+                    records.pop(id, None)
+
+    def count(self, namespace: str = "") -> int:
+        with self._lock:
+            return len(self._namespaces.get(namespace, {}))
@@ -0,0 +1,395 @@
+"""
+Parser pipeline benchmark.
+
+Generates (or reuses) a synthetic PDF corpus, starts the fake OpenAI and
+backend services, then runs every configuration in a fresh process against
+its own SQLite database and an in-memory vector store. For each configuration
+it reports docs/min, pages/s, chunks/s, stage utilization and the peak RSS
+seen while each stage was running, stores the results as JSON and optionally
+compares them with a previous results file.
+
+    python -m benchmarks.run --documents 20 --pages 10 --compare benchmarks/results/baseline.json
+"""
+import argparse
+import json
+import logging
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict
+from datetime import datetime
+from multiprocessing import get_context
+from pathlib import Path
+
+from .corpus import generate_corpus
+from .fake_services import FakeServices, InMemoryVectorStore, Latency
+
+_log = logging.getLogger(__name__)
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+# name: (conversion_workers, embedding_workers)
+DEFAULT_CONFIGS = {
+    "serial": (1, 1),
+    "default": (1, 2),
+    "wide": (2, 4),
+}
+
+# Span names whose running time is attributed to each stage
+STAGE_SPANS = {
+    "convert": "pipeline.convert",
+    "embed": "pipeline.embed",
+    "write": "pipeline.write",
+    "sync": "sync.push",
+}
+
+# Metrics compared against a baseline, and whether higher is better
+COMPARED_METRICS = {
+    "docs_per_min": True,
+    "pages_per_s": True,
+    "chunks_per_s": True,
+    "peak_rss_mb": False,
+}
+
+
+def current_rss() -> int:
+    """
+    Resident set size of this process in bytes.
+    """
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        # Not Linux: fall back to the peak so far
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+class RssSampler:
+    """
+    Samples the process RSS every `interval` seconds on a background thread.
+    """
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.samples = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="rss-sampler", daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.samples.append((time.perf_counter(), current_rss()))
+            self._stop.wait(self.interval)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.samples.append((time.perf_counter(), current_rss()))
+
+    def peak_during(self, intervals: list) -> int:
+        """
+        Highest RSS sampled while any of the (start, end) intervals was open.
+        """
+        return max(
+            (rss for t, rss in self.samples if any(start <= t <= end for start, end in intervals)),
+            default=0,
+        )
+
+
+def run_config(name: str, config: dict, corpus: list, services: dict, work_dir: str) -> dict:
+    """
+    Runs one configuration. Meant to run in a fresh process, so the peak RSS and
+    the SQLAlchemy event listeners of one configuration do not leak into the next.
+    """
+    os.environ["OPENAI_BASE_URL"] = services["openai"]
+    os.environ["OPENAI_API_KEY"] = "benchmark"
+    logging.basicConfig(level=logging.WARNING)
+
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    from src.backend_client import BackendClient
+    from src.controller import DocumentController
+    from src.database_sync_service import DatabaseSyncService
+    from src.docling_integration import DoclingIntegration
+    from src.document_models import Base
+    from src.document_parser import DocumentParser
+    from src.metrics import MetricsObserver
+    from src.pinecone_client import PineconeClient
+    from src.pipeline import DocumentPipeline
+    from src.tracing import tracer
+    from src.validation_events import ValidationEvents
+
+    BackendClient.AUTH_URL = services["auth"]
+    BackendClient.BASE_API_URL = services["api"]
+
+    work_dir = Path(work_dir)
+    engine = create_engine(f"sqlite:///{work_dir / 'benchmark.db'}", future=True)
+    Base.metadata.create_all(bind=engine)
+    controller = DocumentController(sessionmaker(bind=engine)())
+
+    metrics = MetricsObserver()
+    ValidationEvents(observers=[metrics])
+    docling_integration = DoclingIntegration()
+    # Load the Docling models outside the measured run
+    docling_integration.parse_pdf(Path(corpus[0]), work_dir / "warmup")
+
+    parser = DocumentParser(
+        openai_api_key="benchmark",
+        docling_integration=docling_integration,
+        observers=[metrics],
+        chunk_threshold=0.5,
+        chunk_size=512,
+        min_sentences=1,
+        controller=controller,
+        describe_workers=config["describe_workers"],
+    )
+    parser.set_flags(config["chunk"], config["describe"], False)
+
+    tracer.reset()
+    tracer.enabled = True
+    sampler = RssSampler()
+    sampler.start()
+
+    pipeline = DocumentPipeline(
+        parser,
+        conversion_workers=config["conversion_workers"],
+        embedding_workers=config["embedding_workers"],
+        queue_size=config["queue_size"],
+        description_workers=config["description_workers"],
+    )
+    start = time.perf_counter()
+    document_objects = pipeline.run([Path(path) for path in corpus], work_dir / "parsed")
+    elapsed = time.perf_counter() - start
+
+    vector_store = InMemoryVectorStore()
+    sync_service = DatabaseSyncService(
+        controller, observers=[metrics], pinecone_client=PineconeClient(index=vector_store)
+    )
+    sync_start = time.perf_counter()
+    sync_service.push()
+    sync_elapsed = time.perf_counter() - sync_start
+
+    sampler.stop()
+    tracer.enabled = False
+
+    intervals = {stage: [] for stage in STAGE_SPANS}
+    span_stages = {span_name: stage for stage, span_name in STAGE_SPANS.items()}
+    for span in tracer.spans:
+        stage = span_stages.get(span.name)
+        if stage:
+            intervals[stage].append((span.start, span.end))
+
+    pages = sum(doc.page_count or 0 for doc in document_objects)
+    outcomes = list(pipeline.outcomes.values())
+    stages = {
+        stage: {
+            "workers": stats.workers,
+            "busy_seconds": round(stats.busy_seconds, 3),
+            "utilization": round(stats.utilization(elapsed), 3),
+            "peak_rss_mb": round(sampler.peak_during(intervals[stage]) / 2**20, 1),
+        }
+        for stage, stats in pipeline.stats.items()
+    }
+    stages["sync"] = {
+        "seconds": round(sync_elapsed, 3),
+        "vectors": vector_store.count("cchc-chunks"),
+        "peak_rss_mb": round(sampler.peak_during(intervals["sync"]) / 2**20, 1),
+    }
+    return {
+        "name": name,
+        **config,
+        "documents": len(document_objects),
+        "failed": outcomes.count("failed"),
+        "pages": pages,
+        "chunks": pipeline.chunks_stored,
+        "seconds": round(elapsed, 3),
+        "docs_per_min": round(len(document_objects) / elapsed * 60, 3) if elapsed else 0,
+        "pages_per_s": round(pages / elapsed, 3) if elapsed else 0,
+        "chunks_per_s": round(pipeline.chunks_stored / elapsed, 3) if elapsed else 0,
+        "peak_rss_mb": round(max(rss for _, rss in sampler.samples) / 2**20, 1),
+        "stages": stages,
+        "counters": dict(metrics.counters),
+    }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True, cwd=Path(__file__).parent,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def print_results(results: list):
+    print(
+        f"{'config':<12}{'conv':>5}{'emb':>5}{'docs':>6}{'pages':>7}{'chunks':>8}"
+        f"{'docs/min':>10}{'pages/s':>9}{'chunks/s':>10}{'rss (MB)':>10}"
+    )
+    for result in results:
+        print(
+            f"{result['name']:<12}{result['conversion_workers']:>5}{result['embedding_workers']:>5}"
+            f"{result['documents']:>6}{result['pages']:>7}{result['chunks']:>8}"
+            f"{result['docs_per_min']:>10.1f}{result['pages_per_s']:>9.2f}"
+            f"{result['chunks_per_s']:>10.1f}{result['peak_rss_mb']:>10.0f}"
+        )
+        stages = ", ".join(
+            f"{stage} "
+            + (f"{values['utilization']:.0%} util" if "utilization" in values else f"{values['seconds']:.1f}s")
+            + f" / {values['peak_rss_mb']:.0f} MB"
+            for stage, values in result["stages"].items()
+        )
+        print(f"  {stages}")
+
+
+def compare(results: list, baseline: dict, threshold: float) -> bool:
+    """
+    Prints the relative change of each compared metric against the baseline
+    and returns False when any of them got worse by more than `threshold`.
+    """
+    baseline_results = {result["name"]: result for result in baseline["results"]}
+    ok = True
+    print(f"\nCompared with {baseline.get('git_commit', '?')} ({baseline.get('created', '?')}):")
+    for result in results:
+        previous = baseline_results.get(result["name"])
+        if previous is None:
+            print(f"  {result['name']}: not in baseline")
+            continue
+        changes = []
+        for metric, higher_is_better in COMPARED_METRICS.items():
+            before, after = previous.get(metric), result.get(metric)
+            if not before or after is None:
+                continue
+            change = (after - before) / before
+            worse = -change if higher_is_better else change
+            flag = ""
+            if worse > threshold:
+                flag = " REGRESSION"
+                ok = False
+            changes.append(f"{metric} {change:+.1%}{flag}")
+        print(f"  {result['name']}: " + ", ".join(changes))
+    return ok
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Benchmark the parser pipeline with local stand-ins.")
+    parser.add_argument("--documents", type=int, default=20, help="PDFs in the corpus")
+    parser.add_argument("--pages", type=int, default=10, help="Average pages per PDF")
+    parser.add_argument("--images-per-page", type=int, default=0, help="Figures per page")
+    parser.add_argument("--seed", type=int, default=0, help="Corpus seed")
+    parser.add_argument("--corpus-dir", type=str, help="Where the corpus is written (default: a temp dir)")
+    parser.add_argument("--configs", type=str, default=",".join(DEFAULT_CONFIGS),
+                        help="Comma separated names from the default set, or CONV:EMB pairs")
+    parser.add_argument("--queue-size", type=int, default=4)
+    parser.add_argument("--no-chunk", action="store_true", help="Skip chunking and embedding")
+    parser.add_argument("--describe", action="store_true", help="Describe images with the fake vision API")
+    parser.add_argument("--describe-workers", type=int, default=4)
+    parser.add_argument("--description-workers", type=int, default=1)
+    parser.add_argument("--embeddings-latency", type=float, default=Latency.embeddings)
+    parser.add_argument("--vision-latency", type=float, default=Latency.vision)
+    parser.add_argument("--backend-latency", type=float, default=Latency.backend)
+    parser.add_argument("--jitter", type=float, default=Latency.jitter)
+    parser.add_argument("--output", type=str, help="Results file (default: benchmarks/results/<time>-<commit>.json)")
+    parser.add_argument("--compare", type=str, help="Previous results file to compare with")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Relative slowdown reported as a regression")
+    return parser
+
+
+def parse_configs(value: str, args) -> dict:
+    configs = {}
+    for item in value.split(","):
+        item = item.strip()
+        if item in DEFAULT_CONFIGS:
+            conversion_workers, embedding_workers = DEFAULT_CONFIGS[item]
+        else:
+            conversion_workers, embedding_workers = (int(n) for n in item.split(":"))
+        configs[item] = {
+            "conversion_workers": conversion_workers,
+            "embedding_workers": embedding_workers,
+            "queue_size": args.queue_size,
+            "chunk": not args.no_chunk,
+            "describe": args.describe,
+            "describe_workers": args.describe_workers,
+            "description_workers": args.description_workers,
+        }
+    return configs
+
+
+def main(argv=None) -> int:
+    args = build_arg_parser().parse_args(argv)
+    logging.basicConfig(level=logging.INFO)
+    configs = parse_configs(args.configs, args)
+
+    corpus_dir = Path(args.corpus_dir or Path(tempfile.gettempdir()) / "parser_benchmark_corpus")
+    corpus = generate_corpus(
+        corpus_dir, args.documents, args.pages, args.images_per_page, args.seed
+    )
+    _log.info(f"Corpus: {len(corpus)} PDFs in {corpus_dir}")
+
+    latency = Latency(
+        embeddings=args.embeddings_latency,
+        vision=args.vision_latency,
+        backend=args.backend_latency,
+        jitter=args.jitter,
+    )
+    results = []
+    with FakeServices(latency) as services:
+        urls = {
+            "openai": services.openai_base_url,
+            "auth": services.backend_auth_url,
+            "api": services.backend_api_url,
+        }
+        for name, config in configs.items():
+            _log.info(f"Running {name}: {config}")
+            with tempfile.TemporaryDirectory() as work_dir, ProcessPoolExecutor(
+                max_workers=1, mp_context=get_context("spawn")
+            ) as executor:
+                future = executor.submit(
+                    run_config, name, config, [str(p) for p in corpus], urls, work_dir
+                )
+                results.append(future.result())
+
+    report = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "git_commit": git_commit(),
+        "corpus": {
+            "documents": args.documents,
+            "pages": args.pages,
+            "images_per_page": args.images_per_page,
+            "seed": args.seed,
+        },
+        "latency": asdict(latency),
+        "results": results,
+    }
+    output = Path(
+        args.output
+        or RESULTS_DIR / f"{datetime.now():%Y%m%d-%H%M%S}-{report['git_commit']}.json"
+    )
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+
+    print()
+    print_results(results)
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        if not compare(results, baseline, args.threshold):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,12 @@
 import logging
-from src.parser_cli import run
+import sys
 
-def main():
+from src.parser_cli import main as cli_main
+
+def main() -> int:
+    # Same arguments and subcommands as `python -m src.parser_cli`
     logging.basicConfig(level=logging.INFO)
-    run()
+    return cli_main()
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,37 @@
+"""Make image perceptual hash nullable
+
+Revision ID: e7b20c4d91a3
+Revises: d41a7c3e9f58
+Create Date: 2026-10-19 16:05:31.402117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7b20c4d91a3'
+down_revision: Union[str, None] = 'd41a7c3e9f58'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table('image_descriptions') as batch_op:
+        batch_op.alter_column('perceptual_hash', existing_type=sa.String(), nullable=True)
+    # Blank and solid images all hash to 0; they now only match exactly
+    op.execute(
+        "UPDATE image_descriptions SET perceptual_hash = NULL "
+        "WHERE perceptual_hash = '0000000000000000'"
+    )
+
+
+def downgrade() -> None:
+    op.execute(
+        "UPDATE image_descriptions SET perceptual_hash = '0000000000000000' "
+        "WHERE perceptual_hash IS NULL"
+    )
+    with op.batch_alter_table('image_descriptions') as batch_op:
+        batch_op.alter_column('perceptual_hash', existing_type=sa.String(), nullable=False)
@@ -85,6 +85,29 @@ class BackendClient(Session):
         response.raise_for_status()
         return response.json()
     
+    def index_chunks(self, chunks: list):
+        """
+        Call the endpoint: POST /api/v1/chunks
+        Indexes the chunk texts ({"id", "text", "metadata"}) for lexical search.
+        Raises HTTPError if status code != 200.
+        """
+        response = self.post("/chunks", json=chunks)
+        response.raise_for_status()
+        return response.json()
+
+    def delete_document_by_hash(self, doc_hash: str):
+        """
+        Call the endpoint: DELETE /api/v1/document/hash/{doc_hash}
+        Deletes the document and its indexed chunks. A document that is
+        already gone counts as deleted.
+        Raises HTTPError for any other status code != 200.
+        """
+        response = self.delete(f"/document/hash/{doc_hash}")
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        return response.json()
+
     def update_document_by_hash(self, doc_hash: str, doc_data: dict):
         """
         Call the endpoint: PUT /api/v1/document/hash/{doc_hash}
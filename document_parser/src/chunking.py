@@ -1,18 +1,155 @@
 import logging
-from chonkie import SemanticChunker
-from chonkie import OpenAIEmbeddings
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Iterator, List, Optional
+
+from .tracing import span
+
+# numpy, chonkie and docling_core are imported on first use to keep startup fast
+if TYPE_CHECKING:
+    from docling_core.types.doc import DoclingDocument
 
 _log = logging.getLogger(__name__)
 
+# Values of docling_core's DocItemLabel.TITLE and DocItemLabel.SECTION_HEADER
+HEADING_LABELS = ("title", "section_header")
+
+
+@dataclass
+class DocumentSection:
+    """
+    Text of the items under one heading of a DoclingDocument.
+    `spans` holds (start, end, page_no) character ranges of each item in `text`.
+    `complete` is False when the section was cut because it grew too large and
+    more text under the same heading follows.
+    """
+    heading: Optional[str] = None
+    text: str = ""
+    spans: List[tuple] = field(default_factory=list)
+    complete: bool = True
+
+    def append(self, text: str, page_no: Optional[int]):
+        if self.text:
+            self.text += "\n\n"
+        start = len(self.text)
+        self.text += text
+        self.spans.append((start, len(self.text), page_no))
+
+    def extend(self, other: "DocumentSection") -> "DocumentSection":
+        """
+        Returns a new section with the text of `other` appended to this one.
+        """
+        merged = DocumentSection(
+            heading=self.heading, text=self.text, spans=list(self.spans),
+            complete=other.complete
+        )
+        if other.text:
+            offset = len(merged.text) + (2 if merged.text else 0)
+            merged.text += ("\n\n" if merged.text else "") + other.text
+            merged.spans += [(s + offset, e + offset, p) for s, e, p in other.spans]
+        return merged
+
+    def tail(self, start: int) -> "DocumentSection":
+        """
+        Returns the part of this section from character `start` onwards.
+        """
+        spans = [
+            (max(s - start, 0), e - start, p) for s, e, p in self.spans if e > start
+        ]
+        return DocumentSection(
+            heading=self.heading, text=self.text[start:], spans=spans,
+            complete=self.complete
+        )
+
+    def page_range(self, start: int, end: int) -> tuple:
+        """
+        Returns the (first, last) page of the items overlapping text[start:end].
+        """
+        pages = [
+            page_no for span_start, span_end, page_no in self.spans
+            if page_no is not None and span_start < end and span_end > start
+        ]
+        if not pages:
+            return None, None
+        return min(pages), max(pages)
+
+
+@dataclass
+class SectionChunk:
+    text: str
+    embedding: object = None
+    page_number: Optional[int] = None
+    last_page_number: Optional[int] = None
+    section: Optional[str] = None
+    token_count: int = 0
+
+
+def iter_document_sections(
+    document: "DoclingDocument", max_chars: Optional[int] = None
+) -> Iterator[DocumentSection]:
+    """
+    Walks the DoclingDocument items in reading order and yields one section per
+    heading, keeping the page provenance of every text and table item.
+    Pictures are skipped. When `max_chars` is set, sections growing past it are
+    yielded early with `complete=False` and continued in the next section.
+    """
+    from docling_core.types.doc import TableItem, TextItem
+
+    section = DocumentSection()
+    for item, _level in document.iterate_items():
+        if isinstance(item, TextItem) and item.label in HEADING_LABELS:
+            if section.text or not section.complete:
+                section.complete = True
+                yield section
+            section = DocumentSection(heading=item.text)
+            continue
+
+        if isinstance(item, TableItem):
+            text = item.export_to_markdown(document)
+        elif isinstance(item, TextItem):
+            text = item.text
+        else:
+            continue
+
+        if not text.strip():
+            continue
+        page_no = item.prov[0].page_no if item.prov else None
+        section.append(text, page_no)
+
+        if max_chars and len(section.text) >= max_chars:
+            section.complete = False
+            yield section
+            section = DocumentSection(heading=section.heading, complete=False)
+
+    if section.text or not section.complete:
+        section.complete = True
+        yield section
+
+
 class DocumentChunker:
 
     def __init__(self, api_key: str, embedding_model: str = "text-embedding-3-small",
-                 threshold: float = 0.5, chunk_size: int = 512, min_sentences: int = 1):
+                 threshold: float = 0.5, chunk_size: int = 512, min_sentences: int = 1,
+                 exact_chunk_embeddings: bool = False, window_chars: int = 20000,
+                 window_overlap: int = 2000):
+        """
+        :param exact_chunk_embeddings: Embed every chunk again with the embeddings API
+            instead of pooling the sentence embeddings computed while chunking.
+        :param window_chars: Maximum characters handed to the semantic chunker at once.
+        :param window_overlap: Characters at the end of a window whose chunks are
+            held back and chunked again with the next window.
+        """
+        if window_overlap >= window_chars:
+            raise ValueError("window_overlap must be smaller than window_chars.")
         self.openai_api_key = api_key
         self.embedding_model = embedding_model
         self.threshold = threshold
         self.chunk_size = chunk_size
         self.min_sentences = min_sentences
+        self.exact_chunk_embeddings = exact_chunk_embeddings
+        self.window_chars = window_chars
+        self.window_overlap = window_overlap
+
+        from chonkie import OpenAIEmbeddings, SemanticChunker
 
         self._chunker = SemanticChunker(
             embedding_model=self.embedding_model,
@@ -29,14 +166,103 @@ class DocumentChunker:
         self.embedding_size = self._embedder._dimension
 
     def chunk_and_embed(self, text: str):
-        chunks = self._chunker.chunk(text)
-        _log.info(f"Document chunked into {len(chunks)} segments.")
-        for chunk in chunks:
-            chunk.embedding = self._embedder.embed(chunk.text)
+        with span("chunker.chunk_and_embed", chars=len(text)) as chunk_span:
+            with span("chunker.chunk", chars=len(text)):
+                chunks = self._chunker.chunk(text)
+            chunk_span.set(chunks=len(chunks))
+            _log.info(f"Document chunked into {len(chunks)} segments.")
+            for chunk, embedding in zip(chunks, self._embed_chunks(chunks)):
+                chunk.embedding = embedding
         _log.info("Document chunks embedded.")
         return chunks
-    
+
+    def chunk_and_embed_document(self, document: "DoclingDocument") -> List[SectionChunk]:
+        """
+        Chunks a DoclingDocument section by section, so every chunk knows the
+        heading it belongs to and the pages its text comes from.
+        """
+        section_chunks = list(self.iter_chunks(document))
+        _log.info(f"Document chunked and embedded into {len(section_chunks)} segments.")
+        return section_chunks
+
+    def iter_chunks(self, document: "DoclingDocument") -> Iterator[SectionChunk]:
+        """
+        Streams the embedded chunks of a DoclingDocument.
+
+        The document is fed to the semantic chunker in windows of at most
+        `window_chars` characters. Chunks ending inside the last `window_overlap`
+        characters of a window that is not the end of its section may still move
+        once more text is seen, so they are held back and chunked again together
+        with the next window. Every other chunk is embedded and yielded right away.
+        """
+        carry = None
+        for section in iter_document_sections(document, max_chars=self.window_chars):
+            if carry is not None:
+                section = carry.extend(section)
+                carry = None
+            if not section.text.strip():
+                continue
+
+            with span("chunker.chunk", chars=len(section.text), section=section.heading):
+                chunks = self._chunker.chunk(section.text)
+            if not section.complete and chunks:
+                cutoff = len(section.text) - self.window_overlap
+                # Always release at least one chunk so every window makes progress
+                chunks = [c for c in chunks if c.end_index <= cutoff] or chunks[:1]
+                carry = section.tail(chunks[-1].end_index)
+
+            for chunk, embedding in zip(chunks, self._embed_chunks(chunks)):
+                first_page, last_page = section.page_range(
+                    chunk.start_index, chunk.end_index
+                )
+                yield SectionChunk(
+                    text=chunk.text,
+                    embedding=embedding,
+                    page_number=first_page,
+                    last_page_number=last_page,
+                    section=section.heading,
+                    token_count=getattr(chunk, "token_count", 0),
+                )
+
+    def _embed_chunks(self, chunks) -> list:
+        """
+        Returns one embedding per chunk.
+
+        The semantic chunker already embedded every sentence to find the
+        breakpoints, so by default each chunk vector is the token weighted mean of
+        its sentence embeddings. Chunks without sentence embeddings, or every
+        chunk when `exact_chunk_embeddings` is set, are embedded in one batch.
+        """
+        import numpy as np
+
+        embeddings = [
+            None if self.exact_chunk_embeddings else self._pooled_embedding(chunk)
+            for chunk in chunks
+        ]
+        missing = [i for i, embedding in enumerate(embeddings) if embedding is None]
+        if missing:
+            with span("chunker.embed_batch", texts=len(missing)):
+                batch = self._embedder.embed_batch([chunks[i].text for i in missing])
+            for i, embedding in zip(missing, batch):
+                embeddings[i] = np.asarray(embedding)
+        _log.info(f"Embedded {len(missing)} of {len(chunks)} chunks through the API.")
+        return embeddings
+
+    def _pooled_embedding(self, chunk):
+        import numpy as np
+
+        sentences = getattr(chunk, "sentences", None) or []
+        vectors = [getattr(sentence, "embedding", None) for sentence in sentences]
+        if not vectors or any(vector is None for vector in vectors):
+            return None
+
+        weights = [max(getattr(sentence, "token_count", 1), 1) for sentence in sentences]
+        pooled = np.average(np.vstack(vectors), axis=0, weights=weights)
+        # Keep unit length like the embeddings API does
+        norm = np.linalg.norm(pooled)
+        return pooled / norm if norm else pooled
+
     def embed(self, text: str):
         embedded_text = self._embedder.embed(text)
         _log.info("Text embedded.")
-        return embedded_text
\ No newline at end of file
+        return embedded_text
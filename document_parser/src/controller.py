@@ -1,6 +1,7 @@
 from typing import List, Optional
 from sqlalchemy.orm import Session
-from .document_models import Document, Chunk, Tag
+from .document_models import Document, Chunk, Tag, ImageDescription, IndexedFile
+from .tracing import span
 
 class DocumentController:
 	"""
@@ -13,13 +14,22 @@ class DocumentController:
 		"""
 		self.db_session = db_session
 
-	def push(self, content: Document | Chunk | Tag):
-		self.db_session.add(content)
-		self.db_session.commit()
-		self.db_session.refresh(content)
+	def push(self, content: Document | Chunk | Tag | ImageDescription | IndexedFile):
+		with span("controller.commit", type=type(content).__name__):
+			self.db_session.add(content)
+			self.db_session.commit()
+			self.db_session.refresh(content)
 
 		return content
 
+	def push_all(self, contents: List[Document | Chunk | Tag | ImageDescription | IndexedFile]):
+		"""
+		Add several objects and commit them in a single transaction.
+		"""
+		with span("controller.commit", type="batch", objects=len(contents)):
+			self.db_session.add_all(contents)
+			self.db_session.commit()
+
 	def create_document(
 		self,
 		doc_hash: str,
@@ -82,6 +92,8 @@ class DocumentController:
 		text: str,
 		embedding=None,
 		page_number: Optional[int] = None,
+		last_page_number: Optional[int] = None,
+		section: Optional[str] = None,
 		auto_commit: bool = False,
 	) -> Chunk:
 		"""
@@ -90,14 +102,18 @@ class DocumentController:
 		:param document_id: Existing Document's primary key
 		:param text: Chunk text
 		:param embedding: Optional embedding data
-		:param page_number: Optional page number
+		:param page_number: Optional first page the chunk appears on
+		:param last_page_number: Optional last page the chunk appears on
+		:param section: Optional heading of the section the chunk belongs to
 		:return: The created Chunk object
 		"""
 		chunk = Chunk(
 			document_id=document_id,
 			text=text,
 			embedding=embedding,
-			page_number=page_number
+			page_number=page_number,
+			last_page_number=last_page_number,
+			section=section
 		)
 
 		if auto_commit:
@@ -130,6 +146,75 @@ class DocumentController:
 			tag = self.create_tag(tag_name, auto_commit=True)
 		return tag
 
+	def create_image_description(
+		self,
+		content_hash: str,
+		perceptual_hash: Optional[str],
+		description: str,
+		auto_commit: bool = False,
+	) -> ImageDescription:
+		"""
+		Create a new cached ImageDescription.
+
+		:param content_hash: sha256 of the image file
+		:param perceptual_hash: Hex encoded perceptual hash of the image, or None
+		:param description: Description returned by the vision model
+		:return: The created ImageDescription object
+		"""
+		image_description = ImageDescription(
+			content_hash=content_hash,
+			perceptual_hash=perceptual_hash,
+			description=description,
+		)
+
+		if auto_commit:
+			image_description = self.push(image_description)
+
+		return image_description
+
+	def list_image_descriptions(self) -> List[ImageDescription]:
+		"""
+		List all cached image descriptions.
+		"""
+		return self.db_session.query(ImageDescription).all()
+
+	def list_indexed_files(self) -> List[IndexedFile]:
+		"""
+		List all entries of the documents folder index.
+		"""
+		return self.db_session.query(IndexedFile).all()
+
+	def index_file(
+		self,
+		path: str,
+		size: int,
+		mtime: float,
+		content_hash: str,
+		status: str,
+	) -> IndexedFile:
+		"""
+		Create or update the index entry of a file and commit it.
+
+		:param path: Absolute path of the file
+		:param size: Size in bytes
+		:param mtime: Modification time (seconds since the epoch)
+		:param content_hash: sha256 of the file content
+		:param status: "processed" or "failed"
+		:return: The stored IndexedFile object
+		"""
+		indexed_file = (
+			self.db_session.query(IndexedFile)
+			.filter(IndexedFile.path == path)
+			.one_or_none()
+		)
+		if not indexed_file:
+			indexed_file = IndexedFile(path=path)
+		indexed_file.size = size
+		indexed_file.mtime = mtime
+		indexed_file.content_hash = content_hash
+		indexed_file.status = status
+		return self.push(indexed_file)
+
 	def get_document_by_id(self, document_id: int) -> Optional[Document]:
 		"""
 		Retrieve a Document by its primary key ID.
@@ -152,6 +237,12 @@ class DocumentController:
 			.one_or_none()
 		)
 
+	def list_document_hashes(self) -> List[str]:
+		"""
+		Return the doc_hash of every stored document.
+		"""
+		return [doc_hash for (doc_hash,) in self.db_session.query(Document.doc_hash)]
+
 	def get_document_by_title(self, title: str) -> Optional[Document]:
 		"""
 		Retrieve a Document by its unique title.
@@ -213,6 +304,13 @@ class DocumentController:
 			raise ValueError(f"Document with id={document_hash} not found.")
 		return self.add_tag_to_document(document, tag_name)
 
+	def delete_document(self, document: Document):
+		"""
+		Delete a document and its chunks.
+		"""
+		self.db_session.delete(document)
+		self.db_session.commit()
+
 	def delete_all_documents(self):
 		"""
 		Delete all documents.
@@ -1,35 +1,72 @@
+import time
 from typing import Optional, List
 
 from .backend_client import BackendClient
 from .controller import DocumentController
 from .document_models import Document, Chunk
+from .observer import IObserver
 from .pinecone_client import PineconeClient
+from .tracing import span
 import pdb
 class DatabaseSyncService:
     """
     Synchronizes local documents with the hosted (remote) database.
     """
 
-    def __init__(self, controller: DocumentController):
+    def __init__(
+        self,
+        controller: DocumentController,
+        observers: list[IObserver] = None,
+        pinecone_client: Optional[PineconeClient] = None
+    ):
         """
-        :param controller:    An instance of DocumentController for local DB operations.
-        :param backend_client:An instance of BackendClient for remote API calls.
+        :param controller:      An instance of DocumentController for local DB operations.
+        :param observers:       Observers notified with the duration of each sync step.
+        :param pinecone_client: Optional PineconeClient to use instead of the default one.
         """
         self.controller = controller
+        self.observers = observers if observers else []
         self.backend_client = BackendClient()
-        self.pinecone_client = PineconeClient()
+        self._pinecone_client = pinecone_client
+
+    @property
+    def pinecone_client(self) -> PineconeClient:
+        # Connecting to Pinecone lists (and may create) the index, so it is
+        # deferred until chunks are actually upserted.
+        if self._pinecone_client is None:
+            self._pinecone_client = PineconeClient()
+        return self._pinecone_client
 
     def push(self, merge: bool = False):
         """
         Push local documents to the remote backend. 
         If the Pinecone client is set, also upsert the chunks into Pinecone.
         """
-        newest_docs = self._update_newest_docs(merge=merge)
-        
-        # If we have a Pinecone client and the newest docs are not None/empty, do the upsert.
-        if self.pinecone_client and newest_docs:
-            self._upsert_docs_with_chunks(newest_docs)
+        with span("sync.push", merge=merge):
+            start = time.perf_counter()
+            with span("sync.backend") as backend_span:
+                newest_docs = self._update_newest_docs(merge=merge)
+                backend_span.set(documents=len(newest_docs or []))
+            if newest_docs:
+                self._notify_observers(
+                    "BACKEND_SYNCED",
+                    {"documents": len(newest_docs), "seconds": time.perf_counter() - start},
+                )
+
+            # If we have a Pinecone client and the newest docs are not None/empty, do the upsert.
+            if newest_docs and self.pinecone_client:
+                self._upsert_docs_with_chunks(newest_docs)
     
+    def remove(self, doc: Document):
+        """
+        Removes a pushed document from the remote backend, with its indexed
+        chunks, and its chunk vectors from Pinecone.
+        """
+        with span("sync.remove", doc_hash=doc.doc_hash):
+            self.pinecone_client.delete_documents([doc], namespace="cchc-chunks")
+            print(f"Deleting doc_hash='{doc.doc_hash}' from the remote server...")
+            self.backend_client.delete_document_by_hash(doc.doc_hash)
+
     def _update_newest_docs(self, merge: bool = False):
         """
         Pushes local documents (is_uploaded = 0) to the remote backend.
@@ -61,7 +98,8 @@ class DatabaseSyncService:
                 if merge:
                     # Update on the backend
                     print(f"Updating doc_hash='{doc.doc_hash}' on the remote server...")
-                    self.backend_client.update_document_by_hash(doc.doc_hash, doc_data)
+                    with span("sync.backend_request", action="update", doc_hash=doc.doc_hash):
+                        self.backend_client.update_document_by_hash(doc.doc_hash, doc_data)
                     self._mark_as_uploaded(doc)
                     self._no_local_update(doc)
                 else:
@@ -70,7 +108,8 @@ class DatabaseSyncService:
             else:
                 # local_update == 0 => doc is brand new on the backend
                 print(f"Creating doc_hash='{doc.doc_hash}' on the remote server...")
-                self.backend_client.create_document(doc_data)
+                with span("sync.backend_request", action="create", doc_hash=doc.doc_hash):
+                    self.backend_client.create_document(doc_data)
                 self._mark_as_uploaded(doc)
         
         return newest_docs
@@ -98,10 +137,41 @@ class DatabaseSyncService:
             return
 
         print("Upserting document chunks into Pinecone...")
-        self.pinecone_client.upsert_documents(
-            documents_with_embeddings, namespace="cchc-chunks"
+        chunks_count = sum(len(doc.chunks) for doc in documents_with_embeddings)
+        start = time.perf_counter()
+        with span(
+            "sync.pinecone_upsert",
+            documents=len(documents_with_embeddings),
+            chunks=chunks_count,
+        ):
+            self.pinecone_client.upsert_documents(
+                documents_with_embeddings, namespace="cchc-chunks"
+            )
+        self._notify_observers(
+            "CHUNKS_UPSERTED",
+            {
+                "documents": len(documents_with_embeddings),
+                "chunks": chunks_count,
+                "seconds": time.perf_counter() - start,
+            },
         )
         print("Upsert complete.")
+        self._index_chunks(documents_with_embeddings)
+
+    def _index_chunks(self, docs: List[Document], batch_size: int = 500):
+        """
+        Sends the chunk texts to the backend, which indexes them for the
+        lexical half of its hybrid search. Embeddings stay in Pinecone.
+        """
+        chunks = []
+        for record in self.pinecone_client.vector_records(docs):
+            metadata = dict(record["metadata"])
+            chunks.append(
+                {"id": record["id"], "text": metadata.pop("text"), "metadata": metadata}
+            )
+        with span("sync.backend_chunks", chunks=len(chunks)):
+            for start in range(0, len(chunks), batch_size):
+                self.backend_client.index_chunks(chunks[start:start + batch_size])
 
     def _mark_as_uploaded(self, doc: Document):
         """
@@ -122,3 +192,7 @@ class DatabaseSyncService:
         self.controller.db_session.commit()
         self.controller.db_session.refresh(doc)
         print(f"Document id={doc.id} (hash={doc.doc_hash}) marked as no local update.")
+
+    def _notify_observers(self, event_name: str, event_data: dict):
+        for obs in self.observers:
+            obs.notify(event_name, event_data)
@@ -1,16 +1,16 @@
 import logging
+import threading
 from pathlib import Path
 from io import BytesIO
 from typing import TYPE_CHECKING, Iterable, List, Optional, Union
 
-from docling_core.types.doc import ImageRefMode
-from docling.datamodel.base_models import InputFormat
-from docling.datamodel.pipeline_options import PdfPipelineOptions
-from docling.document_converter import DocumentConverter, PdfFormatOption
-from docling.backend.docling_parse_v2_backend import DoclingParseV2DocumentBackend
+from .tracing import span
 
+# docling is imported on first use: importing it and loading its models takes
+# seconds, which the shell and most CLI commands never need.
 if TYPE_CHECKING:
     from docling.datamodel.document import InputDocument
+    from docling.document_converter import DocumentConverter
 
 _log = logging.getLogger(__name__)
 
@@ -22,9 +22,21 @@ class DoclingIntegration:
     def __init__(self, images_scale=IMAGE_RESOLUTION_SCALE, generate_picture_images=True):
         self.images_scale = images_scale
         self.generate_picture_images = generate_picture_images
-        self.doc_converter = self._initialize_converter()
+        self._doc_converter = None
+        self._converter_lock = threading.Lock()
+
+    @property
+    def doc_converter(self) -> "DocumentConverter":
+        with self._converter_lock:
+            if self._doc_converter is None:
+                self._doc_converter = self._initialize_converter()
+        return self._doc_converter
+
+    def _initialize_converter(self) -> "DocumentConverter":
+        from docling.datamodel.base_models import InputFormat
+        from docling.datamodel.pipeline_options import PdfPipelineOptions
+        from docling.document_converter import DocumentConverter, PdfFormatOption
 
-    def _initialize_converter(self) -> DocumentConverter:
         # Set up any pipeline options
         pipeline_options = PdfPipelineOptions()
         pipeline_options.images_scale = self.images_scale
@@ -36,17 +48,27 @@ class DoclingIntegration:
         return DocumentConverter(format_options=format_options)
 
     def parse_pdf(self, input_pdf_path: Path, output_dir: Path) -> Path:
-        conv_res = self.doc_converter.convert(input_pdf_path)
-        output_dir.mkdir(parents=True, exist_ok=True)
-        doc_filename = conv_res.input.file.stem
-        markdown_filename = output_dir / f"{doc_filename}.markdown"
+        from docling_core.types.doc import ImageRefMode
 
-        # Save Markdown with externally referenced pictures
-        conv_res.document.save_as_markdown(markdown_filename, image_mode=ImageRefMode.REFERENCED)
+        with span("docling.parse_pdf", path=str(input_pdf_path)) as parse_span:
+            with span("docling.convert"):
+                conv_res = self.doc_converter.convert(input_pdf_path)
+            parse_span.set(pages=len(conv_res.pages))
+            output_dir.mkdir(parents=True, exist_ok=True)
+            doc_filename = conv_res.input.file.stem
+            markdown_filename = output_dir / f"{doc_filename}.markdown"
+
+            # Save Markdown with externally referenced pictures
+            with span("docling.save_markdown"):
+                conv_res.document.save_as_markdown(
+                    markdown_filename, image_mode=ImageRefMode.REFERENCED
+                )
 
         return conv_res, markdown_filename
     
     def get_page_count(self, path_or_stream: Union[BytesIO, Path]) -> int:
+        from docling.backend.docling_parse_v2_backend import DoclingParseV2DocumentBackend
+
         doc_backend = DoclingParseV2DocumentBackend(in_doc=None, path_or_stream=path_or_stream)
         return doc_backend.get_page_count()
 
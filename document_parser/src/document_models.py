@@ -1,5 +1,6 @@
 from sqlalchemy import (
     Column,
+    Float,
     Integer,
     String,
     Text,
@@ -59,6 +60,8 @@ class Chunk(Base):
     text = Column(Text, nullable=False)
     embedding = Column(PickleType, nullable=True)
     page_number = Column(Integer, nullable=True)
+    last_page_number = Column(Integer, nullable=True)
+    section = Column(String, nullable=True)
 
     # Relationship back to Document
     document = relationship("Document", back_populates="chunks")
@@ -77,3 +80,33 @@ class Tag(Base):
 
     def __repr__(self):
         return f"<Tag(id={self.id}, name='{self.name}')>"
+
+class ImageDescription(Base):
+    __tablename__ = "image_descriptions"
+
+    id = Column(Integer, primary_key=True, index=True)
+    # sha256 of the image file, for exact matches
+    content_hash = Column(String, index=True, unique=True, nullable=False)
+    # 64 bit difference hash (hex encoded), for near-identical matches. None
+    # for near-uniform images, which only match exactly
+    perceptual_hash = Column(String, index=True, nullable=True)
+    description = Column(Text, nullable=False)
+
+    def __repr__(self):
+        return f"<ImageDescription(id={self.id}, perceptual_hash='{self.perceptual_hash}')>"
+
+
+class IndexedFile(Base):
+    __tablename__ = "indexed_files"
+
+    id = Column(Integer, primary_key=True, index=True)
+    path = Column(String, index=True, unique=True, nullable=False)
+    size = Column(Integer, nullable=False)
+    mtime = Column(Float, nullable=False)
+    # sha256 of the file content
+    content_hash = Column(String, nullable=False)
+    # "processed" or "failed"
+    status = Column(String, nullable=False)
+
+    def __repr__(self):
+        return f"<IndexedFile(id={self.id}, path='{self.path}', status='{self.status}')>"
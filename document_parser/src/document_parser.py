@@ -1,17 +1,27 @@
+import html
 import logging
+import threading
+import time
 import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from pathlib import Path
 import re
 
 from .docling_integration import DoclingIntegration
 from .openai_client import OpenAIVisionClient
+from .image_description_cache import ImageDescriptionCache
 from .chunking import DocumentChunker
 from .observer import IObserver
 from .controller import DocumentController
-import pdb
+from .document_models import Document
+from .pipeline import ConvertedDocument, DocumentPipeline
+from .tracing import span
 
 _log = logging.getLogger(__name__)
 
+# Matches a whole <img ...> tag and captures its src attribute
+IMG_TAG_PATTERN = re.compile(r'<img\s+[^>]*?src="([^"]+)"[^>]*>')
+
 class DocumentParser:
     def __init__(
         self,
@@ -25,7 +35,12 @@ class DocumentParser:
         describe_flag: bool = False,
         allow_reprocessing_flag: bool = False,
         controller: DocumentController = None,
-        base_output_dir: Path = Path("parsed_docs")
+        base_output_dir: Path = Path("parsed_docs"),
+        describe_workers: int = 4,
+        describe_timeout: float = 60.0,
+        describe_retries: int = 2,
+        exact_chunk_embeddings: bool = False,
+        chunk_commit_size: int = 50
     ):
         self.observers = observers if observers is not None else []
         self.docling_integration = docling_integration
@@ -36,9 +51,22 @@ class DocumentParser:
         self.chunk_threshold = chunk_threshold
         self.chunk_size = chunk_size
         self.min_sentences = min_sentences
+        self.exact_chunk_embeddings = exact_chunk_embeddings
+        self.chunk_commit_size = chunk_commit_size
+        self.describe_workers = describe_workers
+        self.describe_timeout = describe_timeout
+        self.describe_retries = describe_retries
+        self._description_cache = None
+        self.vision_calls = 0
+        self.vision_calls_avoided = 0
+        # Several documents can be described at once
+        self._vision_lock = threading.Lock()
 
         # Build our Vision client
-        self.vision_client = OpenAIVisionClient(api_key=self.openai_api_key)
+        self.vision_client = OpenAIVisionClient(
+            api_key=self.openai_api_key,
+            timeout=self.describe_timeout
+        )
 
     def _notify_observers(self, event_name: str, event_data: dict):
         for obs in self.observers:
@@ -47,14 +75,6 @@ class DocumentParser:
     def _load_document_paths(self, directory):
         return list(Path(directory).glob("*.pdf"))
     
-    def _repeated_document(self, doc_hash: str):
-        if (
-            self.controller.get_document_by_hash(doc_hash)
-            and not self.allow_reprocessing_flag
-        ):
-            return True
-        return False
-
     def set_flags(
         self, chunk_flag=False, describe_flag=False, allow_reprocessing_flag=False
     ):
@@ -68,109 +88,151 @@ class DocumentParser:
         base_output_dir: Path,
         chunk_flag=False,
         describe_flag=False,
-        allow_reprocessing_flag=False
+        allow_reprocessing_flag=False,
+        conversion_workers: int = 1,
+        embedding_workers: int = 2,
+        queue_size: int = 4,
+        description_workers: int = 1
     ):
-        self.set_flags(chunk_flag, describe_flag, allow_reprocessing_flag)
+        """
+        Parses every PDF in `documents_folder` through a DocumentPipeline, which
+        overlaps Docling conversion, image description, chunking/embedding and
+        database writes.
 
-        document_objects = []
+        :param conversion_workers:  Threads converting PDFs with Docling.
+        :param embedding_workers:   Threads chunking and embedding converted documents.
+        :param queue_size:          Capacity of the queues between stages.
+        :param description_workers: Documents having their images described at once.
+        :return: The stored Document objects.
+        """
+        self.set_flags(chunk_flag, describe_flag, allow_reprocessing_flag)
 
         document_paths = self._load_document_paths(documents_folder)
 
-        for doc_path in document_paths:
-            doc_path_id = str(uuid.uuid4())  # or any other unique ID
-            title = doc_path.stem
-            doc_output_dir = base_output_dir / f"{title}_{doc_path_id}"
+        pipeline = DocumentPipeline(
+            self,
+            conversion_workers=conversion_workers,
+            embedding_workers=embedding_workers,
+            queue_size=queue_size,
+            description_workers=description_workers
+        )
+        return pipeline.run(document_paths, Path(base_output_dir))
 
-            doc_obj = self.controller.create_document(
-                title=title,
-                doc_path=str(doc_path),
-                output_dir=str(doc_output_dir),
-                doc_hash=None
-            )
+    def _convert_document(self, doc_path: Path, base_output_dir: Path) -> ConvertedDocument:
+        """
+        Converts a PDF with Docling into its own output directory.
+        """
+        doc_path_id = str(uuid.uuid4())  # or any other unique ID
+        doc_output_dir = base_output_dir / f"{doc_path.stem}_{doc_path_id}"
 
-            conversion_result, markdown_path = self.docling_integration.parse_pdf(
-                doc_path, 
-                doc_output_dir
-            )
+        conversion_result, markdown_path = self.docling_integration.parse_pdf(
+            doc_path,
+            doc_output_dir
+        )
+        return ConvertedDocument(
+            doc_path=doc_path,
+            doc_path_id=doc_path_id,
+            output_dir=doc_output_dir,
+            conversion_result=conversion_result,
+            markdown_path=markdown_path
+        )
 
-            doc_obj.markdown_path = str(markdown_path)
-            markdown_file_name = markdown_path.stem
-            doc_obj.images_path = str(
-                doc_output_dir / f"{markdown_file_name}_artifacts"
-            )
-            doc_obj.page_count = len(conversion_result.pages)
-            doc_obj.doc_hash = str(conversion_result.document.origin.binary_hash) # This is the hash of the binary content of the document
+    def _new_chunker(self) -> DocumentChunker:
+        return DocumentChunker(
+            api_key=self.openai_api_key,
+            threshold=self.chunk_threshold,
+            chunk_size=self.chunk_size,
+            min_sentences=self.min_sentences,
+            exact_chunk_embeddings=self.exact_chunk_embeddings
+        )
 
-            if self._repeated_document(doc_obj.doc_hash):
-                _log.info(f"Document {title} has already been processed. Skipping.")
-                continue
+    def _describe_document(self, converted: ConvertedDocument) -> dict:
+        """
+        Writes the described markdown of a converted PDF, with the descriptions
+        of its images as alt text. Runs on a description worker and leaves the
+        new cache entries for the writer to commit.
 
-            self._notify_observers(
-                "PDF_PARSED",
-                {"doc_path_id": doc_path_id, "markdown_path": str(markdown_path)},
+        :return: The IMAGES_DESCRIBED event data of the document.
+        """
+        markdown_path = converted.markdown_path
+        described_markdown_path = (
+            converted.output_dir / f"{converted.title}_described_images.markdown"
+        )
+        start = time.perf_counter()
+        usage = {}
+        with span("parser.describe_images") as describe_span:
+            image_refs = self._extract_image_references(markdown_path, converted.output_dir)
+            describe_span.set(images=len(image_refs))
+            self._describe_images_in_markdown(
+                markdown_path, image_refs, described_markdown_path, usage
             )
 
-            if self.describe_flag:
-                # TODO: "Implement image description"
-                # [!] Use the OpenAI Vision endpoint to describe each image
-                # described_markdown_path = doc_output_dir / f"{title}_described_images.markdown"
-                # described_markdown_content = self._describe_images_in_markdown(markdown_path)
-                # with open(described_markdown_path, "w", encoding="utf-8") as f:
-                #     f.write(described_markdown_content)
-                # doc_obj.described_markdown_path = described_markdown_path
-                pass
-
-                self._notify_observers(
-                    "IMAGES_DESCRIBED",
-                    {
-                        "doc_path_id": doc_path_id,
-                        "described_markdown_path": str("Here is the path"),
-                    },
-                )
+        return {
+            "doc_path_id": converted.doc_path_id,
+            "described_markdown_path": str(described_markdown_path),
+            "images_count": len(image_refs),
+            "vision_calls": usage.get("vision_calls", 0),
+            "vision_calls_avoided": usage.get("vision_calls_avoided", 0),
+            "seconds": time.perf_counter() - start,
+        }
 
-            if self.chunk_flag:
-                self.chunker = DocumentChunker(
-                    api_key=self.openai_api_key,
-                    threshold=self.chunk_threshold,
-                    chunk_size=self.chunk_size,
-                    min_sentences=self.min_sentences
-                )
-                with open(markdown_path, "r", encoding="utf-8") as f:
-                    markdown_content = f.read()
-                    text_content = self._strip_markdown_tags(markdown_content)
-
-                    chunks = self.chunker.chunk_and_embed(text_content)
-                    chunks_objects = []
-
-                    for chunk in chunks:
-                        chunk_o = self.controller.create_chunk(
-                            document_id=doc_obj.id,
-                            text = chunk.text,
-                            embedding = chunk.embedding
-                        )
-                        if self.controller.chunk_exist(chunk_o.text):
-                            Warning(f"Chunk {chunk_o.text} already exists in the database")
-                            continue
-                        chunks_objects.append(chunk_o)
-                    doc_obj.chunks = chunks_objects
+    def _store_document(self, converted: ConvertedDocument) -> Document:
+        """
+        Creates and commits the Document row of a converted PDF, along with the
+        image descriptions found while describing it.
+        """
+        conversion_result = converted.conversion_result
+        markdown_path = converted.markdown_path
+        doc_obj = self.controller.create_document(
+            title=converted.title,
+            doc_path=str(converted.doc_path),
+            output_dir=str(converted.output_dir),
+            markdown_path=str(markdown_path),
+            images_path=str(converted.output_dir / f"{markdown_path.stem}_artifacts"),
+            page_count=len(conversion_result.pages),
+            doc_hash=converted.doc_hash
+        )
 
-                self._notify_observers(
-                    "DOCUMENT_CHUNKED",
-                    {"doc_path_id": doc_path_id, "chunks_count": len(chunks)},
-                )
+        self._notify_observers(
+            "PDF_PARSED",
+            {
+                "doc_path_id": converted.doc_path_id,
+                "markdown_path": str(markdown_path),
+                "pages": doc_obj.page_count,
+            },
+        )
+
+        if converted.images_described is not None:
+            self._get_description_cache().commit()
+            self._notify_observers("IMAGES_DESCRIBED", converted.images_described)
 
-            self.controller.push(doc_obj) # Done, store doc_obj in the database
-            document_objects.append(doc_obj)
-        
-        return document_objects
+        # The document row must exist before its chunks are committed in batches
+        return self.controller.push(doc_obj)
 
-    def _strip_markdown_tags(self, markdown_content: str) -> str:
+    def _store_chunks(self, doc_obj: Document, chunks) -> int:
         """
-        Very naive markdown to text. 
-        Improve with a parser like BeautifulSoup for real use.
+        Commits a batch of embedded chunks of a stored document in one transaction,
+        skipping chunks whose text is already in the database.
+
+        :return: The number of stored chunks.
         """
-        text = re.sub('<[^<]+?>', '', markdown_content)
-        return text
+        chunk_objects = []
+        for chunk in chunks:
+            if self.controller.chunk_exist(chunk.text):
+                _log.warning(f"Chunk {chunk.text[:50]!r} already exists in the database")
+                continue
+            chunk_objects.append(
+                self.controller.create_chunk(
+                    document_id=doc_obj.id,
+                    text=chunk.text,
+                    embedding=chunk.embedding,
+                    page_number=chunk.page_number,
+                    last_page_number=chunk.last_page_number,
+                    section=chunk.section
+                )
+            )
+        self.controller.push_all(chunk_objects)
+        return len(chunk_objects)
 
     def _extract_image_references(self, markdown_path: Path, doc_output_dir: Path):
         """
@@ -181,29 +243,159 @@ class DocumentParser:
         if not markdown_path.exists():
             return []
 
+        image_paths = []
         with open(markdown_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+            for line in f:
+                image_paths.extend(IMG_TAG_PATTERN.findall(line))
 
-        # A simple regex to get <img src="...">
-        image_paths = re.findall(r'<img\s+[^>]*src="([^"]+)"', content)
         resolved_paths = []
         for p in image_paths:
             resolved_paths.append((doc_output_dir / p).resolve())
         return resolved_paths
 
-    def _describe_images_in_markdown(self, markdown_path: Path, image_refs):
+    def _describe_images_in_markdown(
+        self, markdown_path: Path, image_refs, described_markdown_path: Path,
+        usage: dict = None
+    ):
         """
-        Loads the markdown file, replaces each <img src="..."> with a figure or alt text
-        containing the description from the OpenAI Vision endpoint.
+        Streams the markdown file into `described_markdown_path`, replacing each
+        <img src="..."> with one carrying the description from the OpenAI Vision
+        endpoint as alt text.
+        Images are described first, then every tag is rewritten in a single pass
+        over the file, line by line, so time and memory stay linear in the size of
+        the document. Images that could not be described are left untouched.
+        `usage` is passed on to `_describe_images`.
         """
-        with open(markdown_path, 'r', encoding='utf-8') as f:
-            markdown_content = f.read()
+        descriptions = self._describe_images(image_refs, usage)
+        base_dir = markdown_path.parent
+
+        def replace_tag(match: re.Match) -> str:
+            src = match.group(1)
+            description = descriptions.get((base_dir / src).resolve())
+            if description is None:
+                return match.group(0)
+            return f'<img src="{src}" alt="{html.escape(description, quote=True)}">'
+
+        with open(markdown_path, 'r', encoding='utf-8') as source, \
+                open(described_markdown_path, 'w', encoding='utf-8') as target:
+            for line in source:
+                target.write(IMG_TAG_PATTERN.sub(replace_tag, line))
 
-        for img_path in image_refs:
-            if img_path.exists():
-                description = self.vision_client.describe_image(str(img_path))
-                pattern = rf'<img\s+[^>]*src="{re.escape(str(img_path.name))}"'
-                replacement = fr'<img src="{img_path.name}" alt="{description}"'
-                markdown_content = re.sub(pattern, replacement, markdown_content)
+        return described_markdown_path
+
+    def _get_description_cache(self) -> ImageDescriptionCache:
+        if self._description_cache is None:
+            self._description_cache = ImageDescriptionCache(self.controller)
+        return self._description_cache
+
+    def _describe_images(self, image_refs, usage: dict = None) -> dict[Path, str]:
+        """
+        Describes the given images, paying one vision call per distinct image.
+
+        Images found in the persistent description cache (same file or a
+        near-identical one) reuse the stored description. Near-identical images
+        within the batch are grouped and only one of them is sent to the vision
+        endpoint. New descriptions are stored in the cache.
+
+        :param image_refs: Resolved image paths found in the markdown.
+        :param usage:      Optional dict that receives the "vision_calls" and
+                           "vision_calls_avoided" counts of this call.
+        :return: A dict mapping each described image path to its description.
+        """
+        cache = self._get_description_cache()
+        descriptions = {}
+        keys = {}
+        # Images sent to the vision endpoint, by content and by perceptual hash
+        by_content_hash = {}
+        by_perceptual_hash = {}
+        followers = {}
+        avoided = 0
+
+        for img_path in dict.fromkeys(p for p in image_refs if p.exists()):
+            keys[img_path] = cache.keys(img_path)
+            exact, phash = keys[img_path]
+            cached = cache.lookup(keys[img_path])
+            if cached is not None:
+                descriptions[img_path] = cached
+                avoided += 1
+                continue
+            representative = by_content_hash.get(exact) or cache.nearest(
+                phash, by_perceptual_hash
+            )
+            if representative is None:
+                by_content_hash[exact] = img_path
+                if phash is not None:
+                    by_perceptual_hash[phash] = img_path
+                followers[img_path] = []
+            else:
+                followers[representative].append(img_path)
+
+        for img_path, description in self._describe_concurrently(list(followers)).items():
+            cache.store(keys[img_path], description)
+            descriptions[img_path] = description
+            for follower in followers[img_path]:
+                descriptions[follower] = description
+            # Followers of a failed call were left without description
+            avoided += len(followers[img_path])
+
+        with self._vision_lock:
+            self.vision_calls += len(followers)
+            self.vision_calls_avoided += avoided
+        if usage is not None:
+            usage["vision_calls"] = usage.get("vision_calls", 0) + len(followers)
+            usage["vision_calls_avoided"] = usage.get("vision_calls_avoided", 0) + avoided
+        _log.info(
+            f"Described {len(descriptions)} image(s) with {len(followers)} vision call(s); "
+            f"{avoided} call(s) avoided."
+        )
+        return descriptions
+
+    def _describe_concurrently(self, image_paths) -> dict[Path, str]:
+        """
+        Describes the given images with a bounded pool of worker threads.
+
+        The vision client gives each request `describe_timeout` seconds, so every
+        call ends, with a description or an error. An image whose call failed is
+        resubmitted right away, up to `describe_retries` times. Images that still
+        fail are logged and omitted from the result instead of aborting the document.
+
+        :param image_paths: Image paths to send to the vision endpoint.
+        :return: A dict mapping each described image path to its description.
+        """
+        descriptions = {}
+        if not image_paths:
+            return descriptions
+
+        attempts = dict.fromkeys(image_paths, 1)
+        failed = 0
+        with ThreadPoolExecutor(max_workers=self.describe_workers) as executor:
+            futures = {
+                executor.submit(self.vision_client.describe_image, str(p)): p
+                for p in image_paths
+            }
+            while futures:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    img_path = futures.pop(future)
+                    try:
+                        descriptions[img_path] = future.result()
+                    except Exception as e:
+                        if attempts[img_path] > self.describe_retries:
+                            _log.warning(f"Could not describe image {img_path.name}: {e}")
+                            failed += 1
+                            continue
+                        attempts[img_path] += 1
+                        _log.info(
+                            f"Retrying image {img_path.name} (attempt "
+                            f"{attempts[img_path]}/{self.describe_retries + 1}): {e}"
+                        )
+                        retry = executor.submit(self.vision_client.describe_image, str(img_path))
+                        futures[retry] = img_path
+
+        if failed:
+            _log.warning(
+                f"{failed} image(s) left without description after "
+                f"{self.describe_retries + 1} attempts."
+            )
 
-        return markdown_content
+        return descriptions
@@ -0,0 +1,145 @@
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Optional
+
+from .controller import DocumentController
+
+_log = logging.getLogger(__name__)
+
+# Side of the grayscale grid used for the difference hash (hash has HASH_SIZE**2 bits)
+HASH_SIZE = 8
+
+# Thumbnails whose gray levels span less than this have no perceptual hash
+MIN_CONTRAST = 16
+
+
+def content_hash(image_path: Path) -> str:
+    """
+    Exact sha256 of the image file.
+    """
+    digest = hashlib.sha256()
+    with open(image_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 16), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def perceptual_hash(image_path: Path) -> Optional[int]:
+    """
+    Difference hash: each bit tells whether a pixel is brighter than its right
+    neighbour on a tiny grayscale thumbnail. Re-encoded, rescaled or slightly
+    retouched copies of an image end up a few bits apart.
+
+    Returns None for near-uniform images (blank areas, solid fills, faint
+    scans), which all hash to about 0 whatever they show.
+    """
+    from PIL import Image
+
+    with Image.open(image_path) as img:
+        small = img.convert("L").resize((HASH_SIZE + 1, HASH_SIZE), Image.LANCZOS)
+        pixels = list(small.getdata())
+    if max(pixels) - min(pixels) < MIN_CONTRAST:
+        return None
+
+    value = 0
+    for row in range(HASH_SIZE):
+        for col in range(HASH_SIZE):
+            left = pixels[row * (HASH_SIZE + 1) + col]
+            right = pixels[row * (HASH_SIZE + 1) + col + 1]
+            value = (value << 1) | (left > right)
+    return value
+
+
+class ImageDescriptionCache:
+    """
+    Persistent cache of vision descriptions keyed by the exact content hash and
+    the perceptual hash of each image.
+
+    Lookups first try the exact hash, then any cached perceptual hash within
+    `max_distance` bits. Images without a perceptual hash only match exactly.
+    The perceptual hashes are loaded once into memory; new entries are kept
+    pending until `commit` writes them through the controller.
+    Lookups and stores are thread-safe; loading and `commit` use the controller's
+    session and belong to the thread that owns it.
+    """
+
+    def __init__(self, controller: DocumentController, max_distance: int = 4):
+        """
+        :param controller:   DocumentController used to read and store descriptions.
+        :param max_distance: Maximum Hamming distance between perceptual hashes
+                             for two images to be considered the same.
+        """
+        self.controller = controller
+        self.max_distance = max_distance
+
+        self._by_content_hash = {}
+        self._by_perceptual_hash = {}
+        # Stored entries waiting for `commit`
+        self._pending = []
+        self._lock = threading.Lock()
+        for entry in self.controller.list_image_descriptions():
+            self._by_content_hash[entry.content_hash] = entry.description
+            if entry.perceptual_hash is not None:
+                self._by_perceptual_hash[int(entry.perceptual_hash, 16)] = entry.description
+
+    def keys(self, image_path: Path) -> tuple[str, Optional[int]]:
+        """
+        Returns the (content hash, perceptual hash) pair for an image.
+        """
+        return content_hash(image_path), perceptual_hash(image_path)
+
+    def lookup(self, keys: tuple[str, Optional[int]]) -> Optional[str]:
+        """
+        Returns the cached description for the given keys, or None on a miss.
+        """
+        exact, phash = keys
+        with self._lock:
+            if exact in self._by_content_hash:
+                return self._by_content_hash[exact]
+            return self.nearest(phash, self._by_perceptual_hash)
+
+    def nearest(self, phash: Optional[int], candidates: dict) -> Optional[object]:
+        """
+        Returns the value of the closest perceptual hash in `candidates`
+        within `max_distance` bits, or None.
+        """
+        if phash is None:
+            return None
+        best, best_distance = None, self.max_distance + 1
+        for other, value in candidates.items():
+            distance = bin(phash ^ other).count("1")
+            if distance < best_distance:
+                best, best_distance = value, distance
+        return best
+
+    def store(self, keys: tuple[str, Optional[int]], description: str):
+        """
+        Caches a new description for the given keys until the next `commit`.
+        """
+        exact, phash = keys
+        with self._lock:
+            if exact in self._by_content_hash:
+                return
+            self._by_content_hash[exact] = description
+            if phash is not None:
+                self._by_perceptual_hash[phash] = description
+            self._pending.append((exact, phash, description))
+
+    def commit(self):
+        """
+        Persists the descriptions stored since the last commit in one transaction.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if not pending:
+            return
+        self.controller.push_all([
+            self.controller.create_image_description(
+                content_hash=exact,
+                perceptual_hash=None if phash is None else f"{phash:0{HASH_SIZE * HASH_SIZE // 4}x}",
+                description=description,
+            )
+            for exact, phash, description in pending
+        ])
@@ -0,0 +1,229 @@
+import logging
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional
+
+from .controller import DocumentController
+from .database_sync_service import DatabaseSyncService
+from .document_models import Document
+from .document_parser import DocumentParser
+from .image_description_cache import content_hash
+from .pipeline import DocumentPipeline
+
+_log = logging.getLogger(__name__)
+
+
+@dataclass
+class FileState:
+    path: Path
+    size: int
+    mtime: float
+    content_hash: str
+    # True when an older version of the file was already indexed
+    modified: bool = False
+
+
+class FolderIndex:
+    """
+    Persistent index of the PDFs in a documents folder, keyed by path and
+    holding each file's size, modification time and content hash.
+
+    A scan only stats the files; a file is hashed only when its size or mtime
+    differs from the index, and reported as changed only when its hash does.
+    """
+
+    def __init__(self, controller: DocumentController):
+        self.controller = controller
+
+    def scan(self, documents_folder: Path) -> List[FileState]:
+        """
+        Returns the PDFs that are new or whose content changed since they were
+        last indexed. Files that were only touched get their mtime refreshed.
+        """
+        indexed = {entry.path: entry for entry in self.controller.list_indexed_files()}
+        changed = []
+        for doc_path in Path(documents_folder).glob("*.pdf"):
+            path = str(doc_path.resolve())
+            stat = doc_path.stat()
+            entry = indexed.get(path)
+            if entry and entry.size == stat.st_size and entry.mtime == stat.st_mtime:
+                continue
+
+            state = FileState(
+                doc_path, stat.st_size, stat.st_mtime, content_hash(doc_path),
+                modified=entry is not None
+            )
+            if entry and entry.content_hash == state.content_hash:
+                self.mark(state, entry.status)
+                continue
+            changed.append(state)
+        return changed
+
+    def mark(self, state: FileState, status: str):
+        self.controller.index_file(
+            path=str(state.path.resolve()),
+            size=state.size,
+            mtime=state.mtime,
+            content_hash=state.content_hash,
+            status=status,
+        )
+
+
+class IngestionDaemon:
+    """
+    Polls a documents folder and feeds new or changed PDFs through the parser
+    pipeline, then pushes the results to the backend.
+
+    Files that fail are indexed as "failed" and are retried only once their
+    content changes. A changed file replaces the document with the same title
+    only once its new version is parsed: until then the previous version is
+    kept under another title, and it gets its title back if the parse fails.
+    """
+
+    def __init__(
+        self,
+        parser: DocumentParser,
+        documents_folder: Path,
+        base_output_dir: Path,
+        sync_service: Optional[DatabaseSyncService] = None,
+        poll_interval: float = 30.0,
+        chunk_flag: bool = True,
+        describe_flag: bool = False,
+        merge: bool = False,
+        conversion_workers: int = 1,
+        embedding_workers: int = 2,
+        queue_size: int = 4,
+        description_workers: int = 1
+    ):
+        """
+        :param parser:           Configured DocumentParser.
+        :param documents_folder: Folder to watch for PDFs.
+        :param base_output_dir:  Output folder for parsed documents.
+        :param sync_service:     Optional DatabaseSyncService used after each batch.
+        :param poll_interval:    Seconds between folder scans.
+        :param merge:            Passed to DatabaseSyncService.push.
+        """
+        self.parser = parser
+        self.documents_folder = Path(documents_folder)
+        self.base_output_dir = Path(base_output_dir)
+        self.sync_service = sync_service
+        self.poll_interval = poll_interval
+        self.chunk_flag = chunk_flag
+        self.describe_flag = describe_flag
+        self.merge = merge
+        self.conversion_workers = conversion_workers
+        self.embedding_workers = embedding_workers
+        self.queue_size = queue_size
+        self.description_workers = description_workers
+
+        self.index = FolderIndex(parser.controller)
+        self._stop = threading.Event()
+
+    def run_once(self) -> List[Document]:
+        """
+        Scans the folder once and processes what changed.
+        """
+        changed = self.index.scan(self.documents_folder)
+        if not changed:
+            return []
+        _log.info(f"{len(changed)} new or changed document(s) found.")
+
+        # Titles are unique, so previous versions make way for the new ones
+        previous_versions = {}
+        for state in changed:
+            if state.modified:
+                previous = self._set_aside(state.path.stem)
+                if previous is not None:
+                    previous_versions[state.path] = previous
+
+        self.parser.set_flags(self.chunk_flag, self.describe_flag, False)
+        pipeline = DocumentPipeline(
+            self.parser,
+            conversion_workers=self.conversion_workers,
+            embedding_workers=self.embedding_workers,
+            queue_size=self.queue_size,
+            description_workers=self.description_workers
+        )
+        try:
+            document_objects = pipeline.run(
+                [state.path for state in changed], self.base_output_dir
+            )
+        except BaseException:
+            for doc_path, previous in previous_versions.items():
+                self._restore(previous, doc_path.stem)
+            raise
+
+        replaced = []
+        for state in changed:
+            outcome = pipeline.outcomes.get(state.path, "failed")
+            self.index.mark(state, "failed" if outcome == "failed" else "processed")
+            previous = previous_versions.get(state.path)
+            if previous is None:
+                continue
+            if outcome == "done":
+                replaced.append(previous)
+            else:
+                self._restore(previous, state.path.stem)
+
+        if self.sync_service and document_objects:
+            self.sync_service.push(merge=self.merge)
+        for previous in replaced:
+            self._retire(previous)
+        return document_objects
+
+    def _set_aside(self, title: str) -> Optional[Document]:
+        """
+        Renames the local document titled `title`, if any, and returns it.
+        """
+        previous = self.parser.controller.get_document_by_title(title)
+        if previous is not None:
+            previous.title = f"{title} (previous version {previous.id})"
+            self.parser.controller.push(previous)
+        return previous
+
+    def _restore(self, previous: Document, title: str):
+        _log.warning(f"Keeping the previous version of {title}.")
+        previous.title = title
+        self.parser.controller.push(previous)
+
+    def _retire(self, previous: Document):
+        """
+        Deletes a replaced version, from the backend and Pinecone first when
+        it was pushed. If that fails it is kept locally, under its new title.
+        """
+        if previous.is_uploaded:
+            if self.sync_service is None:
+                _log.warning(
+                    f"Keeping {previous.title}: it is on the backend and there "
+                    "is no sync service to remove it."
+                )
+                return
+            try:
+                self.sync_service.remove(previous)
+            except Exception as e:
+                _log.exception(f"Could not remove {previous.title} from the backend: {e}")
+                return
+        _log.info(f"Replaced {previous.title}.")
+        self.parser.controller.delete_document(previous)
+
+    def run_forever(self):
+        """
+        Polls the folder every `poll_interval` seconds until `stop` is called
+        or the process is interrupted.
+        """
+        _log.info(
+            f"Watching {self.documents_folder.resolve()} every {self.poll_interval}s."
+        )
+        try:
+            while not self._stop.is_set():
+                try:
+                    self.run_once()
+                except Exception as e:
+                    _log.exception(f"Ingestion pass failed: {e}")
+                self._stop.wait(self.poll_interval)
+        except KeyboardInterrupt:
+            _log.info("Ingestion daemon interrupted.")
+
+    def stop(self):
+        self._stop.set()
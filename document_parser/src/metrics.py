@@ -0,0 +1,278 @@
+import bisect
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+
+from .observer import IObserver
+
+_log = logging.getLogger(__name__)
+
+# Upper bounds, in seconds, of the histogram buckets
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+
+# Counters exported as parser_<name>_total, in the order they are reported
+COUNTERS = (
+    "documents_stored", "documents_failed", "pages", "chunks", "tokens",
+    "images", "vision_calls", "vision_calls_avoided", "documents_synced",
+    "chunks_upserted",
+)
+
+
+class Histogram:
+    """
+    Fixed bucket histogram, as Prometheus exposes them.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.bucket_counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.buckets):
+            self.bucket_counts[index] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def quantile(self, q: float) -> float:
+        """
+        Upper bound of the bucket holding the q-quantile, capped at the largest
+        observed value.
+        """
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        cumulative = 0
+        for bound, bucket_count in zip(self.buckets, self.bucket_counts):
+            cumulative += bucket_count
+            if cumulative >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+
+class MetricsObserver(IObserver):
+    """
+    Aggregates the timing and count data carried by the parser, pipeline and
+    sync events into per-stage histograms and run totals.
+
+    Stages are "convert" (Docling), "embed" (semantic chunking plus the
+    embeddings API), "describe" (vision calls), "write" (SQLite commits),
+    "backend_sync" and "pinecone_upsert". The observer is thread safe, since
+    pipeline workers notify concurrently.
+
+    When `textfile_path` is set, the Prometheus text file is rewritten at most
+    every `textfile_interval` seconds while events arrive, so a long running
+    watcher can be scraped mid-run. Call `flush` to write it at the end.
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS, textfile_path=None, textfile_interval=10.0):
+        self.buckets = buckets
+        self.textfile_path = textfile_path
+        self.textfile_interval = textfile_interval
+        self.stage_seconds = defaultdict(lambda: Histogram(self.buckets))
+        self.document_seconds = Histogram(self.buckets)
+        self.counters = Counter()
+        # One record per stored document: title, pages, chunks and stage seconds
+        self.documents = []
+        self._lock = threading.Lock()
+        # Serializes text file writes; guards the two attributes below
+        self._write_lock = threading.Lock()
+        self._written_at = None
+        self._write_timer = None
+
+    def notify(self, event_name: str, event_data: dict):
+        handler = getattr(self, f"_on_{event_name.lower()}", None)
+        if handler is None:
+            return
+        with self._lock:
+            handler(event_data)
+        if self.textfile_path:
+            self._schedule_write()
+
+    def _schedule_write(self):
+        """
+        Writes the text file now if the last write is `textfile_interval`
+        seconds old, else once that interval is over, from a timer thread.
+        """
+        with self._write_lock:
+            if self._write_timer is not None:
+                # The pending write will include this event
+                return
+            delay = 0.0
+            if self._written_at is not None:
+                delay = self._written_at + self.textfile_interval - time.monotonic()
+            if delay <= 0:
+                self._write_textfile()
+                return
+            self._write_timer = threading.Timer(delay, self._timed_write)
+            self._write_timer.daemon = True
+            self._write_timer.start()
+
+    def _timed_write(self):
+        with self._write_lock:
+            self._write_timer = None
+            self._write_textfile()
+
+    def flush(self):
+        """
+        Writes the text file right away, when `textfile_path` is set.
+        """
+        if not self.textfile_path:
+            return
+        with self._write_lock:
+            if self._write_timer is not None:
+                self._write_timer.cancel()
+                self._write_timer = None
+            self._write_textfile()
+
+    def _write_textfile(self):
+        # Called with _write_lock held
+        try:
+            self.write_prometheus(self.textfile_path)
+        except OSError as e:
+            _log.error(f"Failed to write metrics to {self.textfile_path}: {e}")
+        self._written_at = time.monotonic()
+
+    def _on_pdf_parsed(self, data: dict):
+        self.counters["pages"] += data.get("pages") or 0
+
+    def _on_images_described(self, data: dict):
+        # The describe time is observed with the other stages on DOCUMENT_STORED
+        self.counters["images"] += data.get("images_count", 0)
+        self.counters["vision_calls"] += data.get("vision_calls", 0)
+        self.counters["vision_calls_avoided"] += data.get("vision_calls_avoided", 0)
+
+    def _on_document_chunked(self, data: dict):
+        self.counters["chunks"] += data.get("chunks_count", 0)
+        self.counters["tokens"] += data.get("tokens_count", 0)
+
+    def _on_document_stored(self, data: dict):
+        stage_seconds = data.get("stage_seconds", {})
+        for stage, seconds in stage_seconds.items():
+            self.stage_seconds[stage].observe(seconds)
+        total = sum(stage_seconds.values())
+        self.document_seconds.observe(total)
+        self.counters["documents_stored"] += 1
+        self.documents.append({
+            "title": data.get("title"),
+            "pages": data.get("pages"),
+            "chunks": data.get("chunks_count", 0),
+            "seconds": total,
+            "stage_seconds": stage_seconds,
+        })
+
+    def _on_document_failed(self, data: dict):
+        self.counters["documents_failed"] += 1
+
+    def _on_backend_synced(self, data: dict):
+        self.stage_seconds["backend_sync"].observe(data.get("seconds", 0.0))
+        self.counters["documents_synced"] += data.get("documents", 0)
+
+    def _on_chunks_upserted(self, data: dict):
+        self.stage_seconds["pinecone_upsert"].observe(data.get("seconds", 0.0))
+        self.counters["chunks_upserted"] += data.get("chunks", 0)
+
+    @property
+    def empty(self) -> bool:
+        return not self.counters and not self.stage_seconds
+
+    def to_prometheus(self) -> str:
+        """
+        Renders the metrics in the Prometheus text exposition format.
+        """
+        with self._lock:
+            lines = [
+                "# HELP parser_stage_seconds Seconds spent in each pipeline stage per document or call.",
+                "# TYPE parser_stage_seconds histogram",
+            ]
+            for stage, histogram in sorted(self.stage_seconds.items()):
+                lines += _histogram_lines("parser_stage_seconds", histogram, f'stage="{stage}"')
+            lines += [
+                "# HELP parser_document_seconds Seconds spent on each stored document across stages.",
+                "# TYPE parser_document_seconds histogram",
+            ]
+            lines += _histogram_lines("parser_document_seconds", self.document_seconds)
+            for name in COUNTERS:
+                lines += [
+                    f"# TYPE parser_{name}_total counter",
+                    f"parser_{name}_total {self.counters[name]}",
+                ]
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        """
+        Writes the metrics to `path` for the node_exporter textfile collector.
+        The file is replaced atomically so a scrape never reads half of it,
+        through a temporary file of its own so concurrent writers don't clash.
+        """
+        path = Path(path)
+        content = self.to_prometheus()
+        fd, tmp_name = tempfile.mkstemp(
+            dir=path.parent, prefix=f".{path.name}.", suffix=".tmp"
+        )
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as tmp_file:
+                tmp_file.write(content)
+            # mkstemp creates the file readable by its owner only
+            os.chmod(tmp_name, 0o644)
+            os.replace(tmp_name, path)
+        except BaseException:
+            try:
+                os.unlink(tmp_name)
+            except OSError:
+                pass
+            raise
+
+    def summary_table(self, slowest: int = 5) -> str:
+        with self._lock:
+            lines = [
+                f"  {'stage':<16}{'count':>7}{'total (s)':>11}{'mean':>9}"
+                f"{'p50':>9}{'p95':>9}{'max':>9}"
+            ]
+            for stage, histogram in sorted(self.stage_seconds.items()):
+                lines.append(
+                    f"  {stage:<16}{histogram.count:>7}{histogram.sum:>11.1f}"
+                    f"{histogram.mean():>9.2f}{histogram.quantile(0.5):>9.2f}"
+                    f"{histogram.quantile(0.95):>9.2f}{histogram.max:>9.2f}"
+                )
+            lines.append("  " + ", ".join(f"{name}={self.counters[name]}" for name in COUNTERS))
+            documents = sorted(self.documents, key=lambda d: d["seconds"], reverse=True)
+            if documents:
+                lines.append("  slowest documents:")
+            for doc in documents[:slowest]:
+                stages = " ".join(f"{k}={v:.1f}s" for k, v in doc["stage_seconds"].items())
+                lines.append(
+                    f"    {doc['seconds']:>8.1f}s  {doc['title']} "
+                    f"({doc['pages']} pages, {doc['chunks']} chunks; {stages})"
+                )
+        return "\n".join(lines)
+
+    def print_summary(self, file=None):
+        print("Run metrics:", file=file or sys.stdout)
+        print(self.summary_table(), file=file or sys.stdout)
+
+
+def _histogram_lines(name: str, histogram: Histogram, labels: str = "") -> list:
+    prefix = f"{labels}," if labels else ""
+    lines = []
+    cumulative = 0
+    for bound, bucket_count in zip(histogram.buckets, histogram.bucket_counts):
+        cumulative += bucket_count
+        lines.append(f'{name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+    lines.append(f'{name}_bucket{{{prefix}le="+Inf"}} {histogram.count}')
+    suffix = f"{{{labels}}}" if labels else ""
+    lines.append(f"{name}_sum{suffix} {histogram.sum}")
+    lines.append(f"{name}_count{suffix} {histogram.count}")
+    return lines
@@ -1,5 +1,11 @@
+import atexit
+import json
 import logging
+import queue
+import threading
+import time
 from abc import ABC, abstractmethod
+from datetime import datetime, timezone
 
 _log = logging.getLogger(__name__)
 
@@ -9,6 +15,12 @@ class IObserver(ABC):
     def notify(self, event_name: str, event_data: dict):
         pass
 
+    def close(self):
+        """
+        Releases whatever the observer holds. Called once the run is over.
+        """
+        pass
+
 
 class LoggingObserver(IObserver):
 
@@ -20,3 +32,81 @@ class LoggingObserver(IObserver):
         _log.info(message)
         with open(self.log_file_path, "a", encoding="utf-8") as f:
             f.write(message + "\n")
+
+
+class BufferedLoggingObserver(IObserver):
+    """
+    Writes events as JSON lines from a background thread.
+
+    `notify` only timestamps the event and puts it on a queue, so pipeline
+    workers never wait on the log file. The writer keeps the file open and
+    flushes every `batch_size` events or every `flush_interval` seconds,
+    whichever comes first. `close` (also registered with atexit) drains the
+    queue and flushes before returning.
+    """
+
+    _STOP = object()
+
+    def __init__(self, log_file_path, batch_size: int = 100, flush_interval: float = 1.0):
+        self.log_file_path = log_file_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self._queue = queue.SimpleQueue()
+        self._closed = False
+        self._writer = threading.Thread(
+            target=self._write_loop, name="observer-writer", daemon=True
+        )
+        self._writer.start()
+        atexit.register(self.close)
+
+    def notify(self, event_name: str, event_data: dict):
+        if self._closed:
+            _log.warning(f"Observer closed, dropping event {event_name}.")
+            return
+        self._queue.put((datetime.now(timezone.utc), event_name, event_data))
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(self._STOP)
+        self._writer.join()
+        atexit.unregister(self.close)
+
+    def _write_loop(self):
+        with open(self.log_file_path, "a", encoding="utf-8") as f:
+            stopping = False
+            while not stopping:
+                batch = []
+                deadline = time.monotonic() + self.flush_interval
+                while len(batch) < self.batch_size:
+                    timeout = deadline - time.monotonic()
+                    if timeout <= 0:
+                        break
+                    try:
+                        item = self._queue.get(timeout=timeout)
+                    except queue.Empty:
+                        break
+                    if item is self._STOP:
+                        stopping = True
+                        break
+                    batch.append(item)
+
+                if batch:
+                    self._write_batch(f, batch)
+
+    def _write_batch(self, f, batch: list):
+        lines = []
+        for timestamp, event_name, event_data in batch:
+            _log.info(f"Event: {event_name}, Data: {event_data}")
+            lines.append(json.dumps(
+                {"time": timestamp.isoformat(), "event": event_name, "data": event_data},
+                default=str,
+                ensure_ascii=False,
+            ))
+        try:
+            f.write("\n".join(lines) + "\n")
+            f.flush()
+        except OSError as e:
+            _log.error(f"Failed to write {len(batch)} event(s) to {self.log_file_path}: {e}")
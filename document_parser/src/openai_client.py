@@ -1,17 +1,63 @@
 import logging
-from openai import OpenAI
+import threading
+from functools import lru_cache
+from typing import TYPE_CHECKING
 import base64
 import io
-from PIL import Image
-import tiktoken
+import math
+
+# openai, PIL and tiktoken are imported on first use to keep startup fast
+if TYPE_CHECKING:
+    from openai import OpenAI
+    from PIL import Image
 
 _log = logging.getLogger(__name__)
 
+DESCRIBE_PROMPT = "Describe the content of this image."
+
+# Largest side (in pixels) sent to the vision endpoint, applied before compressing
+MAX_IMAGE_DIMENSION = 2048
+
+# Conservative estimate of how many base64 characters fit in one token
+BASE64_CHARS_PER_TOKEN = 2.0
+
+
+@lru_cache(maxsize=None)
+def _get_encoding(model: str):
+    """
+    Loading a tiktoken encoding is expensive, so it is done once per model.
+    """
+    import tiktoken
+
+    return tiktoken.encoding_for_model(model)
+
+
 class OpenAIVisionClient:
 
-    def __init__(self, api_key: str, model: str = "gpt-4o"):
-        self.client = OpenAI( api_key= api_key)
+    def __init__(self, api_key: str, model: str = "gpt-4o", timeout: float = 60.0):
+        """
+        :param api_key: OpenAI API key.
+        :param model:   Vision capable chat model.
+        :param timeout: Seconds to wait for a single description request.
+        """
+        self.api_key = api_key
         self.model = model
+        self.timeout = timeout
+        self._client = None
+        self._client_lock = threading.Lock()
+
+    @property
+    def client(self) -> "OpenAI":
+        with self._client_lock:
+            if self._client is None:
+                from openai import OpenAI
+
+                # Bounded here so a hung request ends with an error instead of
+                # occupying a worker; retries are left to the caller
+                self._client = OpenAI(
+                    api_key=self.api_key, timeout=self.timeout, max_retries=0
+                )
+        return self._client
 
     def describe_image(self, image_path: str) -> str:
         try:
@@ -25,7 +71,7 @@ class OpenAIVisionClient:
             messages = [
                 {
                     "role": "user",
-                    "content": f"![image](data:image/jpeg;base64,{base64_image})\nDescribe the content of this image."
+                    "content": self._build_prompt(base64_image)
                 }
             ]
 
@@ -33,7 +79,8 @@ class OpenAIVisionClient:
             response = self.client.chat.completions.create(
                 model=self.model,
                 messages=messages,
-                max_tokens=300
+                max_tokens=300,
+                timeout=self.timeout
             )
 
             # Extract and return the description from the response
@@ -45,64 +92,96 @@ class OpenAIVisionClient:
             _log.error(f"Error during image description: {e}")
             raise
 
+    def _build_prompt(self, base64_image: str) -> str:
+        return f"![image](data:image/jpeg;base64,{base64_image})\n{DESCRIBE_PROMPT}"
+
     def _encode_image_to_base64_within_token_limit(
         self,
         image_path: str,
         token_limit: int = 25000,
         model: str = "gpt-4o",
-        quality_step: int = 10,
-        resize_step: float = 0.9
+        max_dimension: int = MAX_IMAGE_DIMENSION,
+        min_quality: int = 10,
+        max_quality: int = 85
     ) -> str:
+        """
+        Encodes an image as a base64 JPEG whose prompt fits within `token_limit`.
 
-        # Load the image once
-        with Image.open(image_path) as img:
-            # We'll start with a moderate JPEG quality
-            quality = 85
+        The image is first bounded to `max_dimension` pixels. The token budget is
+        turned into a byte budget from the base64 expansion ratio, and the JPEG
+        quality is binary searched against it. The prompt is tokenized once to
+        confirm the estimate; only if it was too optimistic is the budget
+        tightened and the search repeated.
+        """
+        from PIL import Image
 
-            while True:
-                # 1) Compress (save) to an in-memory buffer with current quality
-                buffer = io.BytesIO()
-                img.save(buffer, format="JPEG", quality=quality)
-                buffer.seek(0)
+        encoding = _get_encoding(model)
+        prompt_tokens = len(encoding.encode(self._build_prompt("")))
+        char_budget = (token_limit - prompt_tokens) * BASE64_CHARS_PER_TOKEN
 
-                # 2) Convert to base64
-                base64_image = base64.b64encode(buffer.read()).decode("utf-8")
+        with Image.open(image_path) as img:
+            # JPEG has no alpha channel or palette
+            img = img.convert("RGB")
+            img.thumbnail((max_dimension, max_dimension))
 
-                # 3) Build a minimal prompt with the base64-encoded image
-                content = (
-                    f"![image](data:image/jpeg;base64,{base64_image})\n"
-                    "Describe the content of this image."
+            while True:
+                # base64 turns every 3 bytes into 4 characters
+                byte_budget = int(char_budget * 3 / 4)
+                jpeg_bytes = self._compress_to_byte_budget(
+                    img, byte_budget, min_quality, max_quality
                 )
+                base64_image = base64.b64encode(jpeg_bytes).decode("utf-8")
 
-                # 4) Count tokens
-                encoding = tiktoken.encoding_for_model(model)
-                token_count = len(encoding.encode(content))
-
-                # 5) Check if we are within the limit
+                token_count = len(encoding.encode(self._build_prompt(base64_image)))
                 if token_count <= token_limit:
-                    print(f"[INFO] Final prompt size: {token_count} tokens.")
+                    _log.info(f"Final prompt size: {token_count} tokens.")
                     return base64_image
 
-                # Otherwise, compress more
-                print(
-                    f"[INFO] Current token count {token_count} exceeds {token_limit}. "
-                    f"Trying to reduce size (quality={quality}, size={img.size})."
+                _log.info(
+                    f"Prompt size {token_count} exceeds {token_limit} tokens. "
+                    "Tightening the byte budget."
                 )
+                char_budget = len(base64_image) * (token_limit - prompt_tokens) \
+                    / (token_count - prompt_tokens) * 0.95
 
-                # Lower the JPEG quality
-                new_quality = quality - quality_step
-                if new_quality < 10:
-                    # If reducing quality alone isn't enough, start resizing
-                    new_width = int(img.width * resize_step)
-                    new_height = int(img.height * resize_step)
-                    # If the image is already very small, bail out
-                    if new_width < 10 or new_height < 10:
-                        raise ValueError(
-                            f"Unable to compress the image enough to fit within {token_limit} tokens."
-                        )
-                    img = img.resize((new_width, new_height))
-                    # Reset quality to a moderate range again to see if resizing helps
-                    quality = 85
+    def _compress_to_byte_budget(
+        self,
+        img: "Image.Image",
+        byte_budget: int,
+        min_quality: int,
+        max_quality: int
+    ) -> bytes:
+        """
+        Returns the highest quality JPEG encoding of `img` within `byte_budget`.
+        When even `min_quality` is too large, the image is scaled down by the
+        square root of the size ratio and the search is repeated.
+        """
+        while True:
+            best = None
+            low, high = min_quality, max_quality
+            smallest = None
+            while low <= high:
+                quality = (low + high) // 2
+                buffer = io.BytesIO()
+                img.save(buffer, format="JPEG", quality=quality)
+                data = buffer.getvalue()
+                if len(data) <= byte_budget:
+                    best = data
+                    low = quality + 1
                 else:
-                    # Just reduce quality further
-                    quality = new_quality
\ No newline at end of file
+                    smallest = data
+                    high = quality - 1
+
+            if best is not None:
+                return best
+
+            # The byte size scales roughly with the pixel count
+            scale = math.sqrt(byte_budget / len(smallest)) * 0.95
+            new_width = int(img.width * scale)
+            new_height = int(img.height * scale)
+            if new_width < 10 or new_height < 10:
+                raise ValueError(
+                    f"Unable to compress the image enough to fit within {byte_budget} bytes."
+                )
+            _log.info(f"Resizing image from {img.size} to {(new_width, new_height)}.")
+            img = img.resize((new_width, new_height))
@@ -1,25 +1,77 @@
+import time
+
+_IMPORT_START = time.perf_counter()
+
 import logging
 import argparse
+import json
 import sys
+from contextlib import redirect_stdout
+from datetime import datetime
 from pathlib import Path
 
-from IPython import embed  # IPython interactive shell
-
+# Heavy dependencies (IPython, docling, openai, chonkie, pinecone) are imported
+# where they are first used, so starting the CLI stays under a second.
 from .database import SessionLocal, init_db
 from .controller import DocumentController
 from .document_models import Document, Chunk, Tag
 
-from .observer import LoggingObserver
+from .observer import BufferedLoggingObserver
+from .metrics import MetricsObserver
+from .tracing import tracer
 from .validation_events import ValidationEvents
 from .docling_integration import DoclingIntegration
 from .document_parser import DocumentParser
 from .database_sync_service import DatabaseSyncService
+from .ingestion_daemon import IngestionDaemon
+from .pipeline import DocumentPipeline
 
 from .config import (
     OPENAI_API_KEY,
     TEST_PARSE_FOLDER
 )
 
+_log = logging.getLogger(__name__)
+
+# Rough number of characters per embedding token, used for dry-run estimates
+CHARS_PER_TOKEN = 4
+
+
+class StartupTimer:
+    """
+    Records how long each startup phase takes. The breakdown is printed to
+    stderr once, right before the real work starts, when --startup-times is set.
+    """
+
+    def __init__(self, start: float):
+        self.start = start
+        self.enabled = False
+        self.phases = []
+        self._last = start
+        self._reported = False
+
+    def mark(self, phase: str):
+        now = time.perf_counter()
+        self.phases.append((phase, now - self._last))
+        self._last = now
+
+    def report(self):
+        if not self.enabled or self._reported:
+            return
+        self._reported = True
+        print("Startup time breakdown:", file=sys.stderr)
+        for phase, seconds in self.phases:
+            print(f"  {phase:<16}{seconds * 1000:>9.1f} ms", file=sys.stderr)
+        total = self._last - self.start
+        print(f"  {'total':<16}{total * 1000:>9.1f} ms", file=sys.stderr)
+
+
+startup_timer = StartupTimer(_IMPORT_START)
+startup_timer.mark("imports")
+
+# Collects stage timings and counts of the parser and sync services built here
+metrics_observer = MetricsObserver()
+
 
 def resolve_documents_folder(folder_str: str | None) -> Path:
     """
@@ -36,6 +88,55 @@ def resolve_documents_folder(folder_str: str | None) -> Path:
     return folder
 
 
+def resolve_base_output_dir(base_output_dir: str | None) -> Path:
+    """
+    Resolves (and creates) the output folder, defaulting to parsed_docs.
+    """
+    if base_output_dir is None:
+        base_output_dir = "parsed_docs"
+    base_output_dir = Path(base_output_dir)
+    base_output_dir.mkdir(parents=True, exist_ok=True)
+    return base_output_dir
+
+
+def open_controller() -> DocumentController:
+    """
+    Initializes the database and returns a DocumentController on a new session.
+    """
+    init_db()
+    controller = DocumentController(SessionLocal())
+    startup_timer.mark("database")
+    return controller
+
+
+def build_parser(
+    controller: DocumentController, base_output_dir: Path, **parser_options
+) -> DocumentParser:
+    """
+    Builds a DocumentParser logging events as JSON lines to
+    base_output_dir/processing.jsonl from a background thread, with the
+    backend validation events registered on the same observer. Stage timings
+    are also recorded by `metrics_observer`.
+    """
+    docling_integration = DoclingIntegration()
+    log_file_path = base_output_dir / "processing.jsonl"
+    observer = BufferedLoggingObserver(log_file_path=str(log_file_path))
+    ValidationEvents(observers=[observer])
+
+    parser = DocumentParser(
+        openai_api_key=OPENAI_API_KEY,
+        docling_integration=docling_integration,
+        observers=[observer, metrics_observer],
+        chunk_threshold=0.5,
+        chunk_size=512,
+        min_sentences=1,
+        controller=controller,
+        **parser_options
+    )
+    startup_timer.mark("parser")
+    return parser
+
+
 def run(documents_folder: str = None, base_output_dir: str = None) -> None:
     """
     Launches an IPython CLI that provides:
@@ -53,34 +154,20 @@ def run(documents_folder: str = None, base_output_dir: str = None) -> None:
     logging.basicConfig(level=logging.INFO)
 
     # --- Initialize the Database and Session ---
-    init_db()
-    session = SessionLocal()
-    controller = DocumentController(session)
+    controller = open_controller()
+    session = controller.db_session
 
     # --- Determine/Validate the Documents Folder ---
     doc_folder = resolve_documents_folder(documents_folder)
 
     # --- Determine the Base Output Directory ---
-    if base_output_dir is None:
-        base_output_dir = "parsed_docs"
-    base_output_dir = Path(base_output_dir)
-    base_output_dir.mkdir(parents=True, exist_ok=True)
+    base_output_dir = resolve_base_output_dir(base_output_dir)
 
     # --- Set up Observers and Parser ---
-    docling_integration = DoclingIntegration()
-    log_file_path = base_output_dir / "processing.log"
-    observer = LoggingObserver(log_file_path=str(log_file_path))
-    data_validator = ValidationEvents(observers=[observer])
+    parser = build_parser(controller, base_output_dir)
 
-    parser = DocumentParser(
-        openai_api_key=OPENAI_API_KEY,
-        docling_integration=docling_integration,
-        observers=[observer],
-        chunk_threshold=0.5,
-        chunk_size=512,
-        min_sentences=1,
-        controller=controller
-    )
+    backend_sync = DatabaseSyncService(controller, observers=[metrics_observer])
+    startup_timer.mark("sync service")
 
     # --- Provide a helper function to change folder interactively ---
     def set_documents_folder(new_folder: str):
@@ -115,7 +202,12 @@ def run(documents_folder: str = None, base_output_dir: str = None) -> None:
         "documents_folder": doc_folder,   # Initially set
         "base_output_dir": base_output_dir,
         "set_documents_folder": set_documents_folder,  # Our new function
-        "backend_sync": DatabaseSyncService(controller),
+        "backend_sync": backend_sync,
+        "metrics": metrics_observer,
+        "tracer": tracer,
+        "ingest_once": lambda: IngestionDaemon(
+            parser, local_ns["documents_folder"], base_output_dir, sync_service=backend_sync
+        ).run_once(),
     }
 
     # --- Print Usage Instructions ---
@@ -127,7 +219,10 @@ def run(documents_folder: str = None, base_output_dir: str = None) -> None:
     print(" - documents_folder:    Current path to documents to parse")
     print(" - base_output_dir:     Output path for logs & parsed docs")
     print(" - set_documents_folder(new_folder): changes 'documents_folder' after checks\n")
-    print(" - backend_sync:        DatabaseSyncService(controller) instance for syncing\n")
+    print(" - backend_sync:        DatabaseSyncService(controller) instance for syncing")
+    print(" - ingest_once():       Parse and sync only new or changed files in 'documents_folder'")
+    print(" - metrics:             Stage timings and counts, see metrics.print_summary()")
+    print(" - tracer:              Set tracer.enabled = True, then tracer.write_chrome_trace('run.json')\n")
     print("Commands you can use inside IPython:")
     print("  1) session.query(Document).all()")
     print("  2) parser.parse_documents(documents_folder, base_output_dir)")
@@ -135,11 +230,192 @@ def run(documents_folder: str = None, base_output_dir: str = None) -> None:
     print("  4) exit / Ctrl-D to exit the shell\n")
 
     # --- Start IPython Session ---
+    from IPython import embed  # IPython interactive shell
+
+    startup_timer.mark("IPython")
+    startup_timer.report()
     embed(user_ns=local_ns)
 
 
-if __name__ == "__main__":
-    parser_cli = argparse.ArgumentParser(description="Parser CLI")
+def apply_memory_limit(max_memory_mb: int):
+    """
+    Caps the address space of the process, so an oversized document makes the
+    run fail with MemoryError instead of exhausting the machine.
+    """
+    try:
+        import resource
+    except ImportError:
+        _log.warning("--max-memory is only supported on POSIX systems. Ignoring it.")
+        return
+
+    limit = max_memory_mb * 1024 * 1024
+    _, hard = resource.getrlimit(resource.RLIMIT_AS)
+    if hard != resource.RLIM_INFINITY:
+        limit = min(limit, hard)
+    resource.setrlimit(resource.RLIMIT_AS, (limit, hard))
+
+
+def select_document_paths(documents_folder: Path, since: datetime | None = None) -> list[Path]:
+    """
+    Lists the PDFs of the folder, keeping only those modified at or after `since`.
+    """
+    document_paths = sorted(Path(documents_folder).glob("*.pdf"))
+    if since is not None:
+        threshold = since.timestamp()
+        document_paths = [p for p in document_paths if p.stat().st_mtime >= threshold]
+    return document_paths
+
+
+def estimate_documents(document_paths: list[Path], exact_chunk_embeddings: bool = False) -> dict:
+    """
+    Estimates the work of parsing the given PDFs from their text layer, without
+    running Docling or calling any API. Scanned pages without a text layer
+    count as pages but contribute no tokens.
+    """
+    import pypdfium2 as pdfium
+
+    pages = 0
+    characters = 0
+    for doc_path in document_paths:
+        pdf = pdfium.PdfDocument(str(doc_path))
+        try:
+            pages += len(pdf)
+            for page in pdf:
+                textpage = page.get_textpage()
+                characters += len(textpage.get_text_range())
+                textpage.close()
+                page.close()
+        finally:
+            pdf.close()
+
+    text_tokens = characters // CHARS_PER_TOKEN
+    # The semantic chunker embeds every sentence once; exact chunk embeddings
+    # embed the whole text a second time.
+    embedding_passes = 2 if exact_chunk_embeddings else 1
+    return {
+        "pages": pages,
+        "text_tokens": text_tokens,
+        "expected_embedding_tokens": text_tokens * embedding_passes,
+    }
+
+
+def parse_command(args) -> dict:
+    doc_folder = resolve_documents_folder(args.documents_folder)
+    document_paths = select_document_paths(doc_folder, args.since)
+
+    if args.dry_run:
+        startup_timer.report()
+        estimate = estimate_documents(document_paths, args.exact_embeddings)
+        return {"command": "parse", "dry_run": True, "documents": len(document_paths), **estimate}
+
+    base_output_dir = resolve_base_output_dir(args.output_dir)
+    controller = open_controller()
+    parser = build_parser(
+        controller, base_output_dir, exact_chunk_embeddings=args.exact_embeddings
+    )
+    parser.set_flags(args.chunk, args.describe, args.reprocess)
+
+    pipeline = DocumentPipeline(
+        parser,
+        conversion_workers=args.conversion_workers,
+        embedding_workers=args.embedding_workers,
+        queue_size=args.queue_size,
+        description_workers=args.description_workers
+    )
+    startup_timer.report()
+    start = time.perf_counter()
+    document_objects = pipeline.run(document_paths, base_output_dir)
+    elapsed = time.perf_counter() - start
+
+    outcomes = list(pipeline.outcomes.values())
+    pages = sum(doc.page_count or 0 for doc in document_objects)
+    return {
+        "command": "parse",
+        "documents": len(document_objects),
+        "skipped": outcomes.count("skipped"),
+        "failed": outcomes.count("failed"),
+        "pages": pages,
+        "chunks": pipeline.chunks_stored,
+        "seconds": round(elapsed, 3),
+        "docs_per_min": round(len(document_objects) / elapsed * 60, 3) if elapsed else 0,
+        "pages_per_s": round(pages / elapsed, 3) if elapsed else 0,
+        "chunks_per_s": round(pipeline.chunks_stored / elapsed, 3) if elapsed else 0,
+        "stages": {
+            name: {
+                "workers": stats.workers,
+                "busy_seconds": round(stats.busy_seconds, 3),
+                "utilization": round(stats.utilization(elapsed), 3),
+            }
+            for name, stats in pipeline.stats.items()
+        },
+    }
+
+
+def sync_command(args) -> dict:
+    controller = open_controller()
+    pending = len(controller.get_newest_documents())
+    startup_timer.report()
+
+    start = time.perf_counter()
+    DatabaseSyncService(controller, observers=[metrics_observer]).push(merge=args.merge)
+    elapsed = time.perf_counter() - start
+
+    remaining = len(controller.get_newest_documents())
+    return {
+        "command": "sync",
+        "pending": pending,
+        "uploaded": pending - remaining,
+        "seconds": round(elapsed, 3),
+    }
+
+
+def reindex_command(args) -> dict:
+    controller = open_controller()
+    backend_sync = DatabaseSyncService(controller, observers=[metrics_observer])
+    startup_timer.report()
+
+    start = time.perf_counter()
+    if args.purge:
+        backend_sync.pinecone_client.purge_namespace()
+    controller.mark_document_as_not_uploaded()
+    documents = len(controller.get_newest_documents())
+    backend_sync.push(merge=True)
+    elapsed = time.perf_counter() - start
+
+    return {
+        "command": "reindex",
+        "documents": documents,
+        "purged": args.purge,
+        "seconds": round(elapsed, 3),
+    }
+
+
+def watch_command(args) -> dict:
+    doc_folder = resolve_documents_folder(args.documents_folder)
+    base_output_dir = resolve_base_output_dir(args.output_dir)
+    controller = open_controller()
+    parser = build_parser(controller, base_output_dir)
+    startup_timer.report()
+
+    start = time.perf_counter()
+    IngestionDaemon(
+        parser,
+        doc_folder,
+        base_output_dir,
+        sync_service=DatabaseSyncService(controller, observers=[metrics_observer]),
+        poll_interval=args.interval,
+        conversion_workers=args.conversion_workers,
+        embedding_workers=args.embedding_workers,
+        queue_size=args.queue_size,
+        description_workers=args.description_workers
+    ).run_forever()
+    return {"command": "watch", "seconds": round(time.perf_counter() - start, 3)}
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    parser_cli = argparse.ArgumentParser(
+        description="Parser CLI. Without a command, opens the IPython shell."
+    )
     parser_cli.add_argument(
         "--documents_folder",
         type=str,
@@ -150,13 +426,107 @@ if __name__ == "__main__":
         type=str,
         help="Base output directory for parsed docs and logs"
     )
-    args = parser_cli.parse_args()
+    parser_cli.add_argument(
+        "--max-memory",
+        type=int,
+        metavar="MB",
+        help="Address space ceiling for the process, in megabytes"
+    )
+    parser_cli.add_argument(
+        "--metrics",
+        type=str,
+        metavar="FILE",
+        help="Keep a Prometheus text file with the stage timing histograms up to date"
+    )
+    parser_cli.add_argument(
+        "--trace",
+        type=str,
+        metavar="FILE",
+        help="Write a Chrome trace-event JSON of the run to FILE"
+    )
+    parser_cli.add_argument(
+        "--startup-times",
+        action="store_true",
+        help="Print how long each startup phase took to stderr"
+    )
+    commands = parser_cli.add_subparsers(dest="command")
+
+    workers = argparse.ArgumentParser(add_help=False)
+    workers.add_argument("--conversion-workers", type=int, default=1,
+                         help="Threads converting PDFs with Docling")
+    workers.add_argument("--embedding-workers", type=int, default=2,
+                         help="Threads chunking and embedding documents")
+    workers.add_argument("--queue-size", type=int, default=4,
+                         help="Capacity of the queues between pipeline stages")
+    workers.add_argument("--description-workers", type=int, default=1,
+                         help="Documents having their images described at once")
+
+    parse = commands.add_parser("parse", parents=[workers], help="Parse the documents folder")
+    parse.add_argument("--chunk", action="store_true", help="Chunk and embed the documents")
+    parse.add_argument("--describe", action="store_true", help="Describe images with the vision model")
+    parse.add_argument("--reprocess", action="store_true", help="Parse documents already stored")
+    parse.add_argument("--exact-embeddings", action="store_true",
+                       help="Embed chunks again instead of pooling sentence embeddings")
+    parse.add_argument("--since", type=datetime.fromisoformat,
+                       help="Only parse files modified at or after this ISO date")
+    parse.add_argument("--dry-run", action="store_true",
+                       help="Print the pages and expected embedding tokens, then exit")
+    parse.set_defaults(handler=parse_command)
+
+    sync = commands.add_parser("sync", help="Push new local documents to the backend and Pinecone")
+    sync.add_argument("--merge", action="store_true", help="Update documents already on the backend")
+    sync.set_defaults(handler=sync_command)
+
+    reindex = commands.add_parser("reindex", help="Push every local document again")
+    reindex.add_argument("--purge", action="store_true", help="Purge the Pinecone namespace first")
+    reindex.set_defaults(handler=reindex_command)
+
+    watch = commands.add_parser("watch", parents=[workers],
+                                help="Keep ingesting new or changed files of the documents folder")
+    watch.add_argument("--interval", type=float, default=30.0, help="Seconds between folder scans")
+    watch.set_defaults(handler=watch_command)
+
+    return parser_cli
 
+
+def main(argv=None) -> int:
+    args = build_arg_parser().parse_args(argv)
+    startup_timer.mark("arguments")
+    startup_timer.enabled = args.startup_times
+    metrics_observer.textfile_path = args.metrics
+    tracer.enabled = bool(args.trace)
+    if args.max_memory:
+        apply_memory_limit(args.max_memory)
+
+    if args.command is None:
+        try:
+            run(documents_folder=args.documents_folder, base_output_dir=args.output_dir)
+        finally:
+            metrics_observer.flush()
+            if args.trace:
+                tracer.write_chrome_trace(args.trace)
+        return 0
+
+    # Logs and progress messages go to stderr, so stdout only carries the
+    # JSON summary printed at exit
+    logging.basicConfig(level=logging.INFO, stream=sys.stderr)
+    with redirect_stdout(sys.stderr):
+        try:
+            summary = args.handler(args)
+        finally:
+            # Also written when the run fails, since that is when it helps most
+            metrics_observer.flush()
+            if args.trace:
+                tracer.write_chrome_trace(args.trace)
+        if not metrics_observer.empty:
+            metrics_observer.print_summary()
+    print(json.dumps(summary), flush=True)
+    return 1 if summary.get("failed") else 0
+
+
+if __name__ == "__main__":
     try:
-        run(
-            documents_folder=args.documents_folder,
-            base_output_dir=args.output_dir
-        )
+        sys.exit(main())
     except Exception as ex:
         print(f"Error: {ex}")
         sys.exit(1)
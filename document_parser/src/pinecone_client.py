@@ -1,9 +1,6 @@
 from typing import List
 import itertools
 
-from pinecone.grpc import PineconeGRPC as Pinecone
-from pinecone import ServerlessSpec
-
 from .chunking import DocumentChunker
 
 from .document_models import Document, Chunk
@@ -19,9 +16,14 @@ class PineconeClient:
         metric: str = "cosine",
         deletion_protection: str = "disabled",
         batch_size: int = 200,  # <--- default batch size for upserts
+        index=None,
     ):
         """
         Initializes the Pinecone client and sets up (or creates) a Pinecone index.
+
+        :param index: Optional index handle with Pinecone's upsert/query/delete
+                      methods (e.g. an in-memory store). When given, Pinecone
+                      is not contacted at all.
         """
         self.api_key = PINECONE_API_KEY
         self.index_name = index_name
@@ -31,6 +33,15 @@ class PineconeClient:
         self.deletion_protection = deletion_protection
         self.batch_size = batch_size
 
+        if index is not None:
+            self.pc = None
+            self.index = index
+            return
+
+        # Imported here: the gRPC client is slow to import and only needed for syncing
+        from pinecone.grpc import PineconeGRPC as Pinecone
+        from pinecone import ServerlessSpec
+
         # Initialize Pinecone
         self.pc = Pinecone(api_key=self.api_key)
 
@@ -59,32 +70,49 @@ class PineconeClient:
             yield chunk
             chunk = tuple(itertools.islice(it, batch_size))
 
-    def upsert_documents(
-        self, documents: List[Document], namespace: str = "cchc-chunks"
-    ):
+    def vector_records(self, documents: List[Document]) -> List[dict]:
         """
-        Upsert the chunks of given documents into Pinecone in batches.
-
-        :param documents: List of Document objects (with associated chunks).
-        :param namespace: Pinecone namespace to upsert vectors into.
+        Builds the Pinecone records ({"id", "values", "metadata"}) of the
+        chunks of the given documents that have an embedding.
         """
-        # Accumulate all vectors to upsert
-        vectors_to_upsert = []
+        vector_records = []
         for doc in documents:
             for chunk in doc.chunks:
                 if chunk.embedding is None:
                     continue
+                metadata = {
+                    "document_id": doc.id,
+                    # The backend joins hits to its documents by hash
+                    "doc_hash": doc.doc_hash,
+                    "document_title": doc.title,
+                    "text": chunk.text,
+                    "markdown_path": doc.markdown_path,
+                }
+                # Pinecone rejects null metadata values
+                if chunk.page_number is not None:
+                    metadata["page_number"] = chunk.page_number
+                if chunk.last_page_number is not None:
+                    metadata["last_page_number"] = chunk.last_page_number
+                if chunk.section:
+                    metadata["section"] = chunk.section
                 vector_record = {
                     "id": f"doc_{doc.id}_chunk_{chunk.id}",
                     "values": chunk.embedding,  # the embedding array
-                    "metadata": {
-                        "document_id": doc.id,
-                        "document_title": doc.title,
-                        "text": chunk.text,
-                        "markdown_path": doc.markdown_path,
-                    },
+                    "metadata": metadata,
                 }
-                vectors_to_upsert.append(vector_record)
+                vector_records.append(vector_record)
+        return vector_records
+
+    def upsert_documents(
+        self, documents: List[Document], namespace: str = "cchc-chunks"
+    ):
+        """
+        Upsert the chunks of given documents into Pinecone in batches.
+
+        :param documents: List of Document objects (with associated chunks).
+        :param namespace: Pinecone namespace to upsert vectors into.
+        """
+        vectors_to_upsert = self.vector_records(documents)
 
         if not vectors_to_upsert:
             print("No valid embeddings found to upsert.")
@@ -108,6 +136,18 @@ class PineconeClient:
             f"Done! Upserted a total of {total_vectors} vectors into namespace '{namespace}'."
         )
 
+    def delete_documents(
+        self, documents: List[Document], namespace: str = "cchc-chunks"
+    ):
+        """
+        Delete the vectors upserted for the chunks of the given documents,
+        in batches.
+        """
+        ids = [record["id"] for record in self.vector_records(documents)]
+        for batch in self._chunked(ids, self.batch_size):
+            self.index.delete(ids=list(batch), namespace=namespace)
+        print(f"Deleted {len(ids)} vectors from namespace '{namespace}'.")
+
     def query_text(
         self, query_text: str, top_k: int = 3, namespace: str = "cchc-chunks"
     ):
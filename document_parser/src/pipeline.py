@@ -0,0 +1,398 @@
+import logging
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import TYPE_CHECKING, List, Optional
+
+from .document_models import Document
+from .tracing import span
+
+if TYPE_CHECKING:
+    from .document_parser import DocumentParser
+
+_log = logging.getLogger(__name__)
+
+
+@dataclass
+class ConvertedDocument:
+    """
+    A PDF converted by Docling, on its way from the conversion stage to the writer.
+    """
+    doc_path: Path
+    doc_path_id: str
+    output_dir: Path
+    conversion_result: object
+    markdown_path: Path
+    # Seconds this document spent in each pipeline stage
+    stage_seconds: dict = field(default_factory=dict)
+    # Conversion span, parent of the document's embed and write spans
+    trace_span_id: Optional[int] = None
+    # IMAGES_DESCRIBED event data, sent by the writer when the document is stored
+    images_described: Optional[dict] = None
+
+    @property
+    def title(self) -> str:
+        return self.doc_path.stem
+
+    @property
+    def doc_hash(self) -> str:
+        # This is the hash of the binary content of the document
+        return str(self.conversion_result.document.origin.binary_hash)
+
+
+class StageStats:
+    """
+    Accumulates the time the workers of one pipeline stage spend doing work.
+    """
+
+    def __init__(self, name: str, workers: int):
+        self.name = name
+        self.workers = workers
+        self.busy_seconds = 0.0
+        self.documents = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def busy(self, stage_seconds: dict = None):
+        """
+        Times the block. The time is also added to `stage_seconds[name]` when
+        given, to keep per-document stage timings.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.busy_seconds += elapsed
+            if stage_seconds is not None:
+                stage_seconds[self.name] = stage_seconds.get(self.name, 0.0) + elapsed
+
+    def done(self):
+        with self._lock:
+            self.documents += 1
+
+    def utilization(self, wall_seconds: float) -> float:
+        if wall_seconds <= 0:
+            return 0.0
+        return self.busy_seconds / (wall_seconds * self.workers)
+
+
+class DocumentPipeline:
+    """
+    Runs DocumentParser stages concurrently:
+
+        conversion pool -> [converted queue] -> (description pool -> [described queue])
+            -> embedding pool -> [write queue] -> writer
+
+    Docling conversion runs on `conversion_workers` threads and chunking plus
+    embedding, which mostly waits on the embeddings API, on `embedding_workers`
+    threads. When the parser describes images, `description_workers` threads
+    make the vision calls of converted documents before they are embedded.
+    Every database operation happens on the calling thread, which is the single
+    writer owning the controller's session. All queues are bounded, so a slow
+    stage makes the stages before it wait instead of piling up converted
+    documents in memory.
+    """
+
+    def __init__(
+        self,
+        parser: "DocumentParser",
+        conversion_workers: int = 1,
+        embedding_workers: int = 2,
+        queue_size: int = 4,
+        description_workers: int = 1
+    ):
+        self.parser = parser
+        self.conversion_workers = conversion_workers
+        self.embedding_workers = embedding_workers
+        self.queue_size = queue_size
+        self.description_workers = description_workers if parser.describe_flag else 0
+
+        self.stats = {"convert": StageStats("convert", conversion_workers)}
+        if self.description_workers:
+            self.stats["describe"] = StageStats("describe", self.description_workers)
+        self.stats["embed"] = StageStats("embed", embedding_workers)
+        self.stats["write"] = StageStats("write", 1)
+        self._converted = queue.Queue(maxsize=queue_size)
+        # Without a description stage, converted documents go straight to embedding
+        self._described = (
+            queue.Queue(maxsize=queue_size) if self.description_workers else self._converted
+        )
+        self._written = queue.Queue(maxsize=queue_size)
+        self._known_hashes = set()
+        self._hash_lock = threading.Lock()
+        # Final state ("done", "skipped" or "failed") of each processed path
+        self.outcomes = {}
+        self.chunks_stored = 0
+        self._run_span_id = None
+
+    def run(self, document_paths: List[Path], base_output_dir: Path) -> List[Document]:
+        """
+        Processes the given PDFs and returns the stored Document objects.
+        Documents that fail at any stage are logged, removed from the database
+        and reported with a DOCUMENT_FAILED event; the others carry on.
+        """
+        if not self.parser.allow_reprocessing_flag:
+            self._known_hashes = set(self.parser.controller.list_document_hashes())
+        if self.description_workers:
+            # Loaded here, the description workers only read it from memory
+            self.parser._get_description_cache()
+
+        start = time.perf_counter()
+        with span("pipeline.run", documents=len(document_paths)) as run_span:
+            self._run_span_id = run_span.span_id
+            threads = [
+                threading.Thread(
+                    target=self._convert_all, args=(document_paths, base_output_dir),
+                    name="convert-feeder", daemon=True
+                )
+            ]
+            if self.description_workers:
+                threads.append(
+                    threading.Thread(target=self._describe_all, name="describe-feeder", daemon=True)
+                )
+            threads += [
+                threading.Thread(target=self._embed_worker, name=f"embed-{i}", daemon=True)
+                for i in range(self.embedding_workers)
+            ]
+            for thread in threads:
+                thread.start()
+
+            document_objects = self._write_all(len(document_paths))
+
+            for thread in threads:
+                thread.join()
+        self.print_utilization(time.perf_counter() - start)
+        return document_objects
+
+    def _convert_all(self, document_paths: List[Path], base_output_dir: Path):
+        with ThreadPoolExecutor(
+            max_workers=self.conversion_workers, thread_name_prefix="convert"
+        ) as executor:
+            for doc_path in document_paths:
+                executor.submit(self._convert, doc_path, base_output_dir)
+        # One sentinel per worker of the next stage
+        for _ in range(self.description_workers or self.embedding_workers):
+            self._converted.put(None)
+
+    def _convert(self, doc_path: Path, base_output_dir: Path):
+        stage_seconds = {}
+        try:
+            with span(
+                "pipeline.convert", parent_id=self._run_span_id, document=doc_path.name
+            ) as convert_span, self.stats["convert"].busy(stage_seconds):
+                converted = self.parser._convert_document(doc_path, base_output_dir)
+                repeated = self._is_repeated(converted.doc_hash)
+        except Exception as e:
+            self._written.put(("failed", doc_path, e))
+            return
+        converted.stage_seconds.update(stage_seconds)
+        converted.trace_span_id = convert_span.span_id
+        self.stats["convert"].done()
+        if repeated:
+            # Not described nor embedded again
+            self._written.put(("skipped", converted, None))
+            return
+        self._converted.put(converted)
+
+    def _is_repeated(self, doc_hash: str) -> bool:
+        if self.parser.allow_reprocessing_flag:
+            return False
+        with self._hash_lock:
+            if doc_hash in self._known_hashes:
+                return True
+            self._known_hashes.add(doc_hash)
+            return False
+
+    def _describe_all(self):
+        workers = [
+            threading.Thread(target=self._describe_worker, name=f"describe-{i}", daemon=True)
+            for i in range(self.description_workers)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        # One sentinel per embedding worker
+        for _ in range(self.embedding_workers):
+            self._described.put(None)
+
+    def _describe_worker(self):
+        while True:
+            converted = self._converted.get()
+            if converted is None:
+                return
+
+            try:
+                with span(
+                    "pipeline.describe", parent_id=converted.trace_span_id,
+                    document=converted.title
+                ), self.stats["describe"].busy(converted.stage_seconds):
+                    converted.images_described = self.parser._describe_document(converted)
+            except Exception as e:
+                self._written.put(("failed", converted, e))
+                continue
+            self.stats["describe"].done()
+            self._described.put(converted)
+
+    def _embed_worker(self):
+        chunker, chunker_error = None, None
+        if self.parser.chunk_flag:
+            try:
+                chunker = self.parser._new_chunker()
+            except Exception as e:
+                # The worker keeps taking documents and fails them, otherwise
+                # the conversion stage and the writer would wait for it forever
+                _log.error(f"Could not create the chunker: {e}")
+                chunker_error = e
+        while True:
+            converted = self._described.get()
+            if converted is None:
+                return
+
+            if chunker_error is not None:
+                self._written.put(("failed", converted, chunker_error))
+                continue
+
+            self._written.put(("document", converted, None))
+            if chunker is None:
+                self._written.put(("done", converted, None))
+                continue
+
+            try:
+                with span(
+                    "pipeline.embed", parent_id=converted.trace_span_id,
+                    document=converted.title
+                ) as embed_span:
+                    chunks = chunker.iter_chunks(converted.conversion_result.document)
+                    batch = []
+                    chunks_count = 0
+                    while True:
+                        with self.stats["embed"].busy(converted.stage_seconds):
+                            chunk = next(chunks, None)
+                        if chunk is None:
+                            break
+                        batch.append(chunk)
+                        chunks_count += 1
+                        if len(batch) >= self.parser.chunk_commit_size:
+                            self._written.put(("chunks", converted, batch))
+                            batch = []
+                    if batch:
+                        self._written.put(("chunks", converted, batch))
+                    embed_span.set(chunks=chunks_count)
+            except Exception as e:
+                self._written.put(("failed", converted, e))
+                continue
+            self.stats["embed"].done()
+            self._written.put(("done", converted, None))
+
+    def _write_all(self, expected: int) -> List[Document]:
+        """
+        Consumes the write queue until every document reached a final state
+        (done, skipped or failed).
+        """
+        document_objects = []
+        stored = {}
+        chunk_counts = {}
+        token_counts = {}
+        dropped = set()
+        finished = 0
+
+        while finished < expected:
+            kind, job, payload = self._written.get()
+            key = job.doc_path_id if isinstance(job, ConvertedDocument) else str(job)
+            if kind in ("done", "skipped", "failed"):
+                finished += 1
+                doc_path = job.doc_path if isinstance(job, ConvertedDocument) else job
+                if key in dropped or kind == "failed":
+                    self.outcomes[doc_path] = "failed"
+                else:
+                    self.outcomes[doc_path] = kind
+
+            if key in dropped:
+                continue
+            if kind == "failed":
+                self._drop(key, job, payload, stored)
+                continue
+
+            stage_seconds = job.stage_seconds if isinstance(job, ConvertedDocument) else None
+            parent_id = job.trace_span_id if isinstance(job, ConvertedDocument) else self._run_span_id
+            try:
+                with span(
+                    "pipeline.write", parent_id=parent_id, kind=kind, document=job.title
+                ), self.stats["write"].busy(stage_seconds):
+                    if kind == "skipped":
+                        _log.info(f"Document {job.title} has already been processed. Skipping.")
+                    elif kind == "document":
+                        stored[key] = self.parser._store_document(job)
+                        chunk_counts[key] = 0
+                        token_counts[key] = 0
+                    elif kind == "chunks":
+                        stored_count = self.parser._store_chunks(stored[key], payload)
+                        chunk_counts[key] += stored_count
+                        token_counts[key] += sum(chunk.token_count for chunk in payload)
+                        self.chunks_stored += stored_count
+                    elif kind == "done":
+                        # Left in `stored` until pushed, so a failed push drops it
+                        doc_obj = stored[key]
+                        chunks_count = chunk_counts.pop(key)
+                        tokens_count = token_counts.pop(key)
+                        if self.parser.chunk_flag:
+                            self.parser._notify_observers(
+                                "DOCUMENT_CHUNKED",
+                                {
+                                    "doc_path_id": key,
+                                    "chunks_count": chunks_count,
+                                    "tokens_count": tokens_count,
+                                },
+                            )
+                        self.parser.controller.push(doc_obj) # Done, store doc_obj in the database
+                        del stored[key]
+                        document_objects.append(doc_obj)
+                        self.stats["write"].done()
+            except Exception as e:
+                self._drop(key, job, e, stored)
+                if kind == "done":
+                    self.outcomes[job.doc_path] = "failed"
+                else:
+                    dropped.add(key)
+            else:
+                if kind == "done":
+                    # Sent after the timed block, so the write time is complete
+                    self.parser._notify_observers(
+                        "DOCUMENT_STORED",
+                        {
+                            "doc_path_id": key,
+                            "title": job.title,
+                            "pages": doc_obj.page_count,
+                            "chunks_count": chunks_count,
+                            "stage_seconds": dict(job.stage_seconds),
+                        },
+                    )
+
+        return document_objects
+
+    def _drop(self, key: str, job, error: Exception, stored: dict):
+        doc_path = job.doc_path if isinstance(job, ConvertedDocument) else job
+        _log.error(f"Failed to process {doc_path}: {error}")
+        self.parser.controller.db_session.rollback()
+        doc_obj = stored.pop(key, None)
+        if doc_obj is not None and doc_obj.id is not None:
+            self.parser.controller.delete_document(doc_obj)
+        self.parser._notify_observers(
+            "DOCUMENT_FAILED", {"doc_path": str(doc_path), "error": str(error)}
+        )
+
+    def print_utilization(self, wall_seconds: float):
+        print(f"Pipeline finished in {wall_seconds:.1f}s")
+        print(f"  {'stage':<10}{'workers':>8}{'docs':>6}{'busy (s)':>10}{'utilization':>13}")
+        for stats in self.stats.values():
+            print(
+                f"  {stats.name:<10}{stats.workers:>8}{stats.documents:>6}"
+                f"{stats.busy_seconds:>10.1f}{stats.utilization(wall_seconds):>13.0%}"
+            )
@@ -0,0 +1,163 @@
+import itertools
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Optional
+
+_log = logging.getLogger(__name__)
+
+
+class Span:
+    """
+    A timed operation. `parent_id` links it to the span it ran under, which
+    may live on another thread (e.g. embedding a document converted elsewhere).
+    """
+    __slots__ = (
+        "name", "span_id", "parent_id", "start", "end", "thread_id", "thread_name",
+        "attributes",
+    )
+
+    def __init__(self, name: str, span_id: int, parent_id: Optional[int], attributes: dict):
+        thread = threading.current_thread()
+        self.name = name
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.thread_id = thread.ident
+        self.thread_name = thread.name
+        self.attributes = attributes
+        self.start = time.perf_counter()
+        self.end = None
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+
+class _NoopSpan:
+    span_id = None
+
+    def set(self, **attributes):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Tracer:
+    """
+    Collects spans in memory and exports them in the Chrome trace-event
+    format, which chrome://tracing and https://ui.perfetto.dev can open.
+
+    Tracing is off until `enabled` is set; a disabled tracer hands out a shared
+    no-op span, so instrumented code costs next to nothing. At most `max_spans`
+    spans are kept, further ones are counted in `dropped`.
+    """
+
+    def __init__(self, max_spans: int = 1_000_000):
+        self.enabled = False
+        self.max_spans = max_spans
+        self.spans = []
+        self.dropped = 0
+        self._ids = itertools.count(1)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._origin = time.perf_counter()
+
+    @contextmanager
+    def span(self, name: str, parent_id: Optional[int] = None, **attributes):
+        """
+        Times the block as a child of `parent_id`, or of the innermost span
+        open on the current thread.
+        """
+        if not self.enabled:
+            yield _NOOP_SPAN
+            return
+
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        if parent_id is None and stack:
+            parent_id = stack[-1].span_id
+
+        span = Span(name, next(self._ids), parent_id, attributes)
+        stack.append(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.set(error=repr(e))
+            raise
+        finally:
+            span.end = time.perf_counter()
+            stack.pop()
+            with self._lock:
+                if len(self.spans) < self.max_spans:
+                    self.spans.append(span)
+                else:
+                    self.dropped += 1
+
+    def reset(self):
+        with self._lock:
+            self.spans = []
+            self.dropped = 0
+        self._origin = time.perf_counter()
+
+    def to_chrome_trace(self) -> dict:
+        with self._lock:
+            spans = list(self.spans)
+
+        pid = os.getpid()
+        by_id = {span.span_id: span for span in spans}
+        events = []
+        thread_names = {}
+        for span in spans:
+            thread_names[span.thread_id] = span.thread_name
+            events.append({
+                "name": span.name,
+                "cat": span.name.split(".")[0],
+                "ph": "X",
+                "ts": self._micros(span.start),
+                "dur": (span.end - span.start) * 1e6,
+                "pid": pid,
+                "tid": span.thread_id,
+                "args": {**span.attributes, "span_id": span.span_id, "parent_id": span.parent_id},
+            })
+
+            # Parents on another thread are linked with a flow arrow
+            parent = by_id.get(span.parent_id)
+            if parent is not None and parent.thread_id != span.thread_id:
+                flow = {"name": "parent", "cat": "flow", "id": span.span_id, "pid": pid}
+                events.append({**flow, "ph": "s", "ts": self._micros(parent.start), "tid": parent.thread_id})
+                events.append({**flow, "ph": "f", "bp": "e", "ts": self._micros(span.start), "tid": span.thread_id})
+
+        events += [
+            {"name": "thread_name", "ph": "M", "pid": pid, "tid": tid, "args": {"name": name}}
+            for tid, name in thread_names.items()
+        ]
+        return {
+            "traceEvents": events,
+            "displayTimeUnit": "ms",
+            "otherData": {"dropped_spans": self.dropped},
+        }
+
+    def write_chrome_trace(self, path):
+        path = Path(path)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_chrome_trace(), f, default=str)
+        _log.info(f"Trace with {len(self.spans)} spans written to {path}")
+
+    def _micros(self, timestamp: float) -> float:
+        return (timestamp - self._origin) * 1e6
+
+
+# Process wide tracer used by the parser modules
+tracer = Tracer()
+
+
+def span(name: str, parent_id: Optional[int] = None, **attributes):
+    """
+    Shortcut for `tracer.span`.
+    """
+    return tracer.span(name, parent_id, **attributes)
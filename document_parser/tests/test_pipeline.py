@@ -0,0 +1,101 @@
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+
+from src.pipeline import ConvertedDocument, DocumentPipeline
+
+
+class FakeController:
+    def __init__(self):
+        self.db_session = SimpleNamespace(rollback=lambda: None)
+
+    def list_document_hashes(self):
+        return []
+
+    def delete_document(self, document):
+        pass
+
+    def push(self, content):
+        return content
+
+
+class FakeParser:
+    """
+    Stands in for DocumentParser: conversion returns a fake Docling result
+    and nothing touches the OpenAI API or the database.
+    """
+
+    allow_reprocessing_flag = False
+    chunk_flag = True
+    describe_flag = False
+    chunk_commit_size = 50
+
+    def __init__(self):
+        self.controller = FakeController()
+        self.events = []
+
+    def _convert_document(self, doc_path, base_output_dir):
+        origin = SimpleNamespace(binary_hash=f"hash-{doc_path.stem}")
+        return ConvertedDocument(
+            doc_path=doc_path,
+            doc_path_id=doc_path.stem,
+            output_dir=base_output_dir,
+            conversion_result=SimpleNamespace(document=SimpleNamespace(origin=origin)),
+            markdown_path=base_output_dir / f"{doc_path.stem}.md",
+        )
+
+    def _new_chunker(self):
+        raise RuntimeError("invalid OpenAI key")
+
+    def _notify_observers(self, event_name, event_data):
+        self.events.append((event_name, event_data))
+
+
+def test_run_fails_every_document_when_the_chunker_cannot_be_built(tmp_path):
+    parser = FakeParser()
+    # More documents than the queues hold, so a dead embedding stage would
+    # leave the conversion stage blocked
+    document_paths = [Path(f"document-{i}.pdf") for i in range(12)]
+    pipeline = DocumentPipeline(parser, embedding_workers=2, queue_size=2)
+
+    assert pipeline.run(document_paths, tmp_path) == []
+
+    assert pipeline.outcomes == {path: "failed" for path in document_paths}
+    failed = [data for name, data in parser.events if name == "DOCUMENT_FAILED"]
+    assert len(failed) == len(document_paths)
+    assert all("invalid OpenAI key" in data["error"] for data in failed)
+
+
+class DescribingParser(FakeParser):
+    chunk_flag = False
+    describe_flag = True
+
+    def __init__(self):
+        super().__init__()
+        self.described_on = []
+        self.stored_on = []
+
+    def _get_description_cache(self):
+        pass
+
+    def _describe_document(self, converted):
+        self.described_on.append(threading.current_thread().name)
+        return {"doc_path_id": converted.doc_path_id, "images_count": 0}
+
+    def _store_document(self, converted):
+        self.stored_on.append(threading.current_thread().name)
+        return SimpleNamespace(id=converted.doc_path_id, page_count=1)
+
+
+def test_images_are_described_before_the_writer(tmp_path):
+    parser = DescribingParser()
+    document_paths = [Path(f"document-{i}.pdf") for i in range(6)]
+    pipeline = DocumentPipeline(parser, description_workers=2, queue_size=2)
+
+    assert len(pipeline.run(document_paths, tmp_path)) == len(document_paths)
+
+    assert set(pipeline.outcomes.values()) == {"done"}
+    assert len(parser.described_on) == len(document_paths)
+    assert all(name.startswith("describe-") for name in parser.described_on)
+    assert set(parser.stored_on) == {threading.current_thread().name}
+    assert pipeline.stats["describe"].documents == len(document_paths)